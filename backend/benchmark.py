@@ -0,0 +1,257 @@
+"""
+End-to-end API benchmark
+Seeds a synthetic dataset at one or more scales, drives every route of server.py
+through an in-process ASGI client and records latency percentiles, requests/sec
+and MongoDB round trips per route. Results are written as JSON so runs from
+different commits can be compared.
+
+Usage:
+    python benchmark.py --scales 0.01,0.05 --iterations 20                 # local mongod (MONGO_URL)
+    python benchmark.py --scales 0.002 --backend mongomock --iterations 5  # in-process stand-in
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+from fastapi.routing import APIRoute
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+import server
+from synthetic_data import build_hierarchy, synthetic_streams
+from seed_data import seed_collections, utc_now
+
+# Routes exercised by the benchmark; ids match the synthetic dataset
+BENCHMARK_CASES = [
+    {"name": "health", "method": "GET", "path": "/api/health"},
+    {"name": "states", "method": "GET", "path": "/api/states"},
+    {"name": "state_districts", "method": "GET", "path": "/api/states/mh_001/districts"},
+    {"name": "district_blocks", "method": "GET", "path": "/api/districts/dist_001/blocks"},
+    {"name": "block_schools", "method": "GET", "path": "/api/blocks/block_001_001/schools"},
+    {"name": "block_schools_page", "method": "GET", "path": "/api/blocks/block_001_001/schools",
+     "params": {"limit": 20, "sort": "percentage", "fields": "name,percentage"}},
+    {"name": "school", "method": "GET", "path": "/api/schools/school_001_001_001"},
+    {"name": "district", "method": "GET", "path": "/api/districts/dist_001"},
+    {"name": "block", "method": "GET", "path": "/api/blocks/block_001_001"},
+    {"name": "metrics", "method": "GET", "path": "/api/metrics/district/dist_001"},
+    {"name": "insights", "method": "GET", "path": "/api/insights/district/dist_001"},
+    {"name": "metrics_batch", "method": "POST", "path": "/api/metrics/batch",
+     "json": {"level": "block", "entity_ids": [f"block_001_{j:03d}" for j in range(1, 9)]}},
+    {"name": "insights_batch", "method": "POST", "path": "/api/insights/batch",
+     "json": {"level": "block", "entity_ids": [f"block_001_{j:03d}" for j in range(1, 9)]}},
+    {"name": "generate_insights", "method": "POST", "path": "/api/generate-insights/district/dist_001"},
+    {"name": "job_status_missing", "method": "GET", "path": "/api/jobs/00000000-0000-0000-0000-000000000000"},
+    {"name": "precompute_insights_state", "method": "POST", "path": "/api/precompute-insights", "params": {"levels": "state"}},
+    {"name": "domain_insights_state", "method": "POST", "path": "/api/generate-domain-insights/learning_outcomes"},
+    {"name": "domain_insights_district", "method": "POST", "path": "/api/generate-domain-insights/learning_outcomes",
+     "params": {"level": "district", "entity_id": "dist_001"}},
+    {"name": "dashboard_overview", "method": "GET", "path": "/api/dashboard-overview"},
+    {"name": "export_district", "method": "GET", "path": "/api/export-data/district"},
+    {"name": "export_school", "method": "GET", "path": "/api/export-data/school"},
+    {"name": "export_schools_page", "method": "GET", "path": "/api/export-data/school",
+     "params": {"collection": "schools", "limit": 500, "fields": "name,block_id"}},
+    {"name": "export_school_ndjson", "method": "GET", "path": "/api/export-data/school", "params": {"format": "ndjson"}},
+    {"name": "export_indicators_school", "method": "GET", "path": "/api/export-indicators/school"},
+    {"name": "pgi_framework", "method": "GET", "path": "/api/pgi-framework"},
+    {"name": "pgi_domains", "method": "GET", "path": "/api/pgi-framework/domains"},
+    {"name": "pgi_domain_indicators", "method": "GET", "path": "/api/pgi-framework/domains/learning_outcomes/indicators"},
+    {"name": "pgi_score_state", "method": "GET", "path": "/api/pgi-score/state/mh_001"},
+    {"name": "pgi_score_school", "method": "GET", "path": "/api/pgi-score/school/school_001_001_001"},
+    {"name": "pgi_score_batch", "method": "POST", "path": "/api/pgi-score/batch",
+     "json": {"level": "district", "entity_ids": [f"dist_{i:03d}" for i in range(1, 37)]}},
+    {"name": "pgi_score_updates", "method": "GET", "path": "/api/pgi-score-updates/school"},
+    {"name": "pgi_score_calculate", "method": "POST", "path": "/api/pgi-score/school/school_001_001_001/calculate",
+     "json": {"lo_language_class3": 61.5, "lo_math_class3": 57.0, "inf_drinking_water": 97.0}},
+    # $dateTrunc needs MongoDB 5.0+; mongomock does not implement it
+    {"name": "score_history_school", "method": "GET", "path": "/api/score-history/school/school_001_001_001",
+     "mongod_only": True},
+    # Rescores every entity; mongomock scans the collection for each upsert, which takes hours
+    {"name": "rollup_all", "method": "POST", "path": "/api/rollup", "mongod_only": True},
+    {"name": "rollup_block", "method": "POST", "path": "/api/rollup/block/block_001_001"},
+    {"name": "cache_stats", "method": "GET", "path": "/api/cache/stats"},
+    {"name": "pgi_comparison", "method": "GET", "path": "/api/pgi-comparison/district"},
+    {"name": "drilldown_state", "method": "POST", "path": "/api/indicator-drilldown",
+     "json": {"level": "state", "entity_id": "mh_001", "indicator_code": "LO-L3", "domain_name": "learning_outcomes"}},
+    {"name": "drilldown_district", "method": "POST", "path": "/api/indicator-drilldown",
+     "json": {"level": "district", "entity_id": "dist_001", "indicator_code": "LO-L3", "domain_name": "learning_outcomes"}},
+]
+
+# Routes deliberately not benchmarked, with the reason
+SKIPPED_ROUTES = {
+    ("POST", "/api/reinitialize-data"): "drops the benchmark dataset and reseeds the small sample data"
+}
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Counts MongoDB commands sent by the client"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def uncovered_routes():
+    """Return the API routes that are neither benchmarked nor explicitly skipped"""
+    covered = {(case["method"], route.path) for case in BENCHMARK_CASES for route in server.app.routes
+               if isinstance(route, APIRoute) and route.path_regex.match(case["path"]) and case["method"] in route.methods}
+    return sorted(
+        (method, route.path)
+        for route in server.app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+        if (method, route.path) not in covered and (method, route.path) not in SKIPPED_ROUTES
+    )
+
+def connect(backend: str, counter: RoundTripCounter):
+    """Return the benchmark database for the chosen backend"""
+    db_name = os.environ.get("DB_NAME", "maharashtra_education") + "_bench"
+    if backend == "mongomock":
+        # Optional in-process stand-in; it sends no wire commands, so round trips are not recorded
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()[db_name]
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), event_listeners=[counter])
+    return client[db_name]
+
+async def prepare_dataset(db, backend: str, scale: float, seed: int) -> dict:
+    """Replace the benchmark database contents with a synthetic dataset and materialize it"""
+    for collection_name in await db.list_collection_names():
+        await db[collection_name].drop()
+
+    hierarchy = build_hierarchy(scale, seed)
+    streams = synthetic_streams(hierarchy, seed, utc_now())
+    state_stream = streams.pop("states")
+    seed_stats = await seed_collections(db, streams)
+    await db.states.insert_many(list(state_stream))
+
+    server.db = db
+    server.dataset_replaced()
+    if backend == "mongod":
+        await server.startup_db()
+    else:
+        # mongomock does not use indexes for queries and checks unique ones by scanning, so skip them
+        server.start_materialization()
+    started = time.perf_counter()
+    await server.materialization_task
+    return {
+        "districts": len(hierarchy["districts"]),
+        "blocks": len(hierarchy["blocks"]),
+        "schools": hierarchy["school_count"],
+        "rows": seed_stats["rows"] + 1,
+        "seed_rows_per_sec": seed_stats["rows_per_sec"],
+        "materialize_seconds": round(time.perf_counter() - started, 3)
+    }
+
+async def run_case(client: httpx.AsyncClient, case: dict, iterations: int, counter: RoundTripCounter,
+                   count_round_trips: bool) -> dict:
+    """Time one route; the first (warm-up) request is not recorded"""
+    async def send():
+        return await client.request(case["method"], case["path"], params=case.get("params"), json=case.get("json"))
+
+    await send()
+    latencies, statuses = [], {}
+    counter.count = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        request_started = time.perf_counter()
+        response = await send()
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist()
+    return {
+        "method": case["method"],
+        "path": case["path"],
+        "iterations": iterations,
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "requests_per_sec": round(iterations / elapsed, 2) if elapsed > 0 else None,
+        "db_round_trips": round(counter.count / iterations, 2) if count_round_trips else None,
+        "statuses": {str(status): count for status, count in statuses.items()}
+    }
+
+def current_commit():
+    """Git commit of the benchmarked tree, if available"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_benchmark(scales, seed: int, iterations: int, backend: str, route_filter=None) -> dict:
+    """Benchmark every selected route at every scale"""
+    counter = RoundTripCounter()
+    db = connect(backend, counter)
+    cases = [
+        case for case in BENCHMARK_CASES
+        if (not route_filter or any(name in case["name"] for name in route_filter))
+        and (backend == "mongod" or not case.get("mongod_only"))
+    ]
+
+    results = {
+        "commit": current_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "backend": backend,
+        "seed": seed,
+        "iterations": iterations,
+        "skipped_routes": [f"{method} {path}: {reason}" for (method, path), reason in SKIPPED_ROUTES.items()],
+        "scales": {}
+    }
+
+    transport = httpx.ASGITransport(app=server.app)
+    for scale in scales:
+        print(f"Preparing dataset at scale {scale}...")
+        dataset = await prepare_dataset(db, backend, scale, seed)
+        routes = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for case in cases:
+                routes[case["name"]] = await run_case(client, case, iterations, counter, backend == "mongod")
+                route = routes[case["name"]]
+                print(f"  {case['name']:<28} p50 {route['p50_ms']:>9.2f}ms  p95 {route['p95_ms']:>9.2f}ms  "
+                      f"p99 {route['p99_ms']:>9.2f}ms  {route['requests_per_sec']:>8} req/s  "
+                      f"round trips {route['db_round_trips']}")
+        results["scales"][str(scale)] = {"dataset": dataset, "routes": routes}
+
+    return results
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard API routes")
+    parser.add_argument("--scales", default="0.01", help="comma separated synthetic data scale factors")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=20, help="timed requests per route")
+    parser.add_argument("--backend", choices=["mongod", "mongomock"], default="mongod",
+                        help="mongod uses MONGO_URL (database <DB_NAME>_bench); mongomock needs mongomock-motor")
+    parser.add_argument("--routes", help="comma separated substrings selecting benchmark cases by name")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    missing = uncovered_routes()
+    if missing:
+        print(f"WARNING: routes without a benchmark case: {missing}")
+
+    scales = [float(scale) for scale in args.scales.split(",")]
+    route_filter = args.routes.split(",") if args.routes else None
+    results = asyncio.run(run_benchmark(scales, args.seed, args.iterations, args.backend, route_filter))
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
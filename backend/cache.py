@@ -0,0 +1,229 @@
+"""
+Response caching
+PGIScoreCache: a bounded in-memory LRU backed by an optional on-disk SQLite tier
+that receives entries evicted from memory. Keys are (level, entity_id, framework version).
+DataVersions: per-scope data versions used to build ETags for conditional GETs.
+Writes made outside the server (the CLIs, mongoimport) are announced through the
+data_versions collection; `python cache.py` does that after a manual import.
+"""
+
+import os
+import json
+import time
+import uuid
+import atexit
+import asyncio
+import sqlite3
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from pgi_framework import FRAMEWORK_VERSION
+from serialization import dumps
+
+# Entries kept in memory
+PGI_CACHE_SIZE = int(os.environ.get("PGI_CACHE_SIZE", "10000"))
+# Directory of the on-disk tier; disabled when unset
+PGI_CACHE_DIR = os.environ.get("PGI_CACHE_DIR")
+# Seconds between checks for writes made outside the server
+DATA_VERSION_CHECK_SECONDS = float(os.environ.get("DATA_VERSION_CHECK_SECONDS", "5"))
+
+# data_versions document counting writes made outside the server
+DATASET_VERSION_ID = "dataset"
+
+
+class PGIScoreCache:
+    """
+    LRU cache of PGI breakdowns with an optional disk tier.
+
+    Cached dicts are shared between callers and must not be mutated.
+    Every invalidation bumps a per-entity generation; a value read from the
+    database is only stored if the generation has not moved since the read
+    started, so a concurrent write can never be overwritten by stale data.
+    """
+
+    def __init__(self, max_entries=PGI_CACHE_SIZE, disk_dir=PGI_CACHE_DIR, framework_version=FRAMEWORK_VERSION):
+        self.max_entries = max_entries
+        self.framework_version = framework_version
+        self.entries = OrderedDict()
+        self.generations = {}
+        self.epoch = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+        self.disk = None
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            # One file per process: invalidations are only seen by the process that made them
+            self.disk_path = os.path.join(disk_dir, f"pgi_score_cache_{os.getpid()}.sqlite3")
+            self.disk = sqlite3.connect(self.disk_path)
+            self.disk.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            # Entries left by an earlier process with the same pid may describe data that has since changed
+            self.disk.execute("DELETE FROM entries")
+            self.disk.commit()
+            atexit.register(self.close)
+
+    def close(self):
+        """Remove the disk tier"""
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+            os.remove(self.disk_path)
+
+    def key(self, level: str, entity_id: str) -> tuple:
+        return (level, entity_id, self.framework_version)
+
+    def generation(self, level: str, entity_id: str) -> tuple:
+        """Current generation of an entity; pass it to set() to guard against concurrent invalidation"""
+        return (self.epoch, self.generations.get((level, entity_id), 0))
+
+    def get(self, level: str, entity_id: str):
+        """Return the cached value or None, promoting disk hits into memory"""
+        key = self.key(level, entity_id)
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.counters["memory_hits"] += 1
+            return value
+
+        if self.disk is not None:
+            row = self.disk.execute("SELECT value FROM entries WHERE key = ?", (self.disk_key(key),)).fetchone()
+            if row:
+                self.counters["disk_hits"] += 1
+                value = json.loads(row[0])
+                self.store(key, value)
+                return value
+
+        self.counters["misses"] += 1
+        return None
+
+    def set(self, level: str, entity_id: str, value: dict, generation: tuple = None):
+        """Cache a value unless the entity was invalidated after generation was taken"""
+        if generation is not None and generation != self.generation(level, entity_id):
+            return
+        self.store(self.key(level, entity_id), value)
+
+    def store(self, key: tuple, value: dict):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            evicted_key, evicted_value = self.entries.popitem(last=False)
+            self.counters["evictions"] += 1
+            if self.disk is not None:
+                # Spill to the disk tier instead of dropping
+                self.disk.execute("INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)",
+                                  (self.disk_key(evicted_key), dumps(evicted_value).decode()))
+        if self.disk is not None:
+            self.disk.commit()
+
+    def invalidate(self, level: str, entity_id: str):
+        """Drop an entity from both tiers"""
+        generation_key = (level, entity_id)
+        self.generations[generation_key] = self.generations.get(generation_key, 0) + 1
+        key = self.key(level, entity_id)
+        self.entries.pop(key, None)
+        if self.disk is not None:
+            self.disk.execute("DELETE FROM entries WHERE key = ?", (self.disk_key(key),))
+            self.disk.commit()
+        self.counters["invalidations"] += 1
+
+    def clear(self):
+        """Drop every entry (e.g. after the dataset is replaced)"""
+        self.epoch += 1
+        self.entries.clear()
+        if self.disk is not None:
+            self.disk.execute("DELETE FROM entries")
+            self.disk.commit()
+
+    def disk_key(self, key: tuple) -> str:
+        return "|".join(key)
+
+    def stats(self) -> dict:
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        lookups = hits + self.counters["misses"]
+        disk_entries = None
+        if self.disk is not None:
+            disk_entries = self.disk.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            **self.counters,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0,
+            "memory_entries": len(self.entries),
+            "max_memory_entries": self.max_entries,
+            "disk_enabled": self.disk is not None,
+            "disk_entries": disk_entries,
+            "framework_version": self.framework_version
+        }
+
+
+# Shared cache for /api/pgi-score responses
+PGI_SCORE_CACHE = PGIScoreCache()
+
+
+class DataVersions:
+    """
+    In-process version counters for the data behind read endpoints.
+
+    A scope is a tuple such as ("metrics", level, entity_id). bump() is called
+    whenever the data of a scope is written; bump_all() when the whole dataset
+    is replaced. ETags also carry a per-process id so tags issued by an earlier
+    process never match. Writes from other processes are only seen through
+    dataset_changed(), which the server polls.
+    """
+
+    def __init__(self):
+        self.process_id = uuid.uuid4().hex[:8]
+        self.epoch = 0
+        self.versions = {}
+        self.dataset_version = None
+        self.checked_at = None
+
+    def bump(self, *scope):
+        self.versions[scope] = self.versions.get(scope, 0) + 1
+
+    def bump_all(self):
+        self.epoch += 1
+
+    def etag(self, *scope, variant: str = "") -> str:
+        """
+        Weak ETag of the current version of a scope: gzip and identity responses share it.
+        variant tells apart the representations of one scope, such as pages of a list.
+        """
+        suffix = f"-{variant}" if variant else ""
+        return f'W/"{self.process_id}-{self.epoch}-{self.versions.get(scope, 0)}-{FRAMEWORK_VERSION}{suffix}"'
+
+    async def dataset_changed(self, db) -> bool:
+        """
+        Whether mark_dataset_changed() was called since the previous check.
+        Mongo is read at most once per DATA_VERSION_CHECK_SECONDS.
+        """
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < DATA_VERSION_CHECK_SECONDS:
+            return False
+        self.checked_at = now
+        document = await db.data_versions.find_one({"_id": DATASET_VERSION_ID})
+        version = document["version"] if document else 0
+        changed = self.dataset_version is not None and version != self.dataset_version
+        self.dataset_version = version
+        return changed
+
+
+# Shared data versions for ETags
+DATA_VERSIONS = DataVersions()
+
+
+async def mark_dataset_changed(db):
+    """Tell running servers the dataset was written outside them, so they drop their caches"""
+    await db.data_versions.update_one({"_id": DATASET_VERSION_ID}, {"$inc": {"version": 1}}, upsert=True)
+
+
+async def main():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    await mark_dataset_changed(client[os.environ.get("DB_NAME", "maharashtra_education")])
+    print(f"Dataset marked as changed; servers drop their caches within {DATA_VERSION_CHECK_SECONDS:g}s")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+Query-plan regression check
+Builds the registered indexes in a throwaway database on the configured MongoDB
+and fails if any hot API query would be answered by a collection scan. The
+application database is never touched: ensure_indexes can delete duplicates.
+
+Usage: python check_query_plans.py
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from db_indexes import ensure_indexes, explain_hot_queries
+from score_history import HISTORY_COLLECTION, ensure_history_collection
+
+load_dotenv()
+
+async def explain_in_scratch_database(client):
+    """Explain every hot query against the registered indexes in a database dropped afterwards"""
+    db_name = f"{os.environ.get('DB_NAME', 'maharashtra_education')}_query_plans_{uuid.uuid4().hex[:8]}"
+    try:
+        db = client[db_name]
+        history_enabled = await ensure_history_collection(db)
+        await ensure_indexes(db, () if history_enabled else (HISTORY_COLLECTION,))
+        return await explain_hot_queries(db)
+    finally:
+        await client.drop_database(db_name)
+
+async def main():
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    results = await explain_in_scratch_database(client)
+    
+    regressions = [result for result in results if result["collscan"]]
+    for result in results:
+        status = "COLLSCAN" if result["collscan"] else "ok"
+        print(f"[{status}] {result['collection']} {result['filter']} sort={result['sort']}: {' <- '.join(result['stages'])}")
+    
+    print(f"{len(results)} queries checked, {len(regressions)} collection scans")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,95 @@
+"""
+Columnar (Parquet / Arrow IPC) export of PGI indicator scores
+One row per entity, one column per PGI indicator plus domain and total scores.
+Batches are encoded as they arrive so exports can be streamed chunk by chunk.
+"""
+
+import io
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pgi_engine import PGI_ENGINE
+
+COLUMNAR_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream"
+}
+
+ENTITY_COLUMNS = ("entity_id", "entity_name", "state_id", "district_id", "block_id")
+
+def indicator_schema(engine=PGI_ENGINE):
+    """
+    Arrow schema of the export: entity columns, one column per indicator, domain and total scores,
+    and is_sample, true for entities scored with demonstration values instead of stored ones
+    """
+    fields = [pa.field(name, pa.string()) for name in ENTITY_COLUMNS]
+    fields += [pa.field(key, pa.float64()) for key in engine.indicator_keys]
+    fields += [pa.field(f"{domain_key}_score", pa.float64()) for domain_key in engine.domain_keys]
+    fields += [pa.field("total_score", pa.float64()), pa.field("percentage", pa.float64())]
+    fields.append(pa.field("is_sample", pa.bool_()))
+    return pa.schema(fields)
+
+def indicator_record_batch(entities, score_dicts, is_sample, schema, engine=PGI_ENGINE, max_score=1000):
+    """
+    Build one record batch from entity documents, their {indicator_key: value} dicts and
+    whether each entity's values are demonstration ones. Indicators without a value are null.
+    """
+    values = engine.to_matrix(score_dicts)
+    domain_scores, total_scores = engine.score_matrix(values, max_score)
+    missing = np.isnan(values)
+
+    columns = [pa.array([entity.get("id") for entity in entities], pa.string()),
+               pa.array([entity.get("name") for entity in entities], pa.string())]
+    columns += [pa.array([entity.get(field) for entity in entities], pa.string())
+                for field in ENTITY_COLUMNS[2:]]
+    columns += [pa.array(values[:, j], mask=missing[:, j]) for j in range(values.shape[1])]
+    columns += [pa.array(domain_scores[:, d]) for d in range(domain_scores.shape[1])]
+    columns += [pa.array(total_scores), pa.array(total_scores / max_score * 100)]
+    columns.append(pa.array(is_sample, pa.bool_()))
+    return pa.record_batch(columns, schema=schema)
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain, keeping the absolute position"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+class ColumnarWriter:
+    """Encode record batches as Parquet (one row group per batch) or an Arrow IPC stream"""
+
+    def __init__(self, format: str, schema):
+        self.sink = ChunkSink()
+        if format == "parquet":
+            self.writer = pq.ParquetWriter(self.sink, schema, compression="zstd")
+        else:
+            self.writer = pa.ipc.new_stream(self.sink, schema)
+
+    def write(self, batch) -> bytes:
+        """Encode a batch and return the bytes produced so far"""
+        self.writer.write_batch(batch)
+        return self.sink.drain()
+
+    def close(self) -> bytes:
+        """Finish the file (Parquet footer / IPC end marker) and return the remaining bytes"""
+        self.writer.close()
+        return self.sink.drain()
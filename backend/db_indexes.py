@@ -0,0 +1,216 @@
+"""
+MongoDB index registry
+Every index the API relies on is declared here and ensured at startup
+"""
+
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+# Indexes per collection
+INDEX_REGISTRY = {
+    "states": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("name", ASCENDING)], name="name"),
+        IndexModel([("percentage", DESCENDING)], name="percentage_desc"),
+    ],
+    # Entity lists are paged in (percentage desc, id) or id order, see pagination.py
+    "districts": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("state_id", ASCENDING)], name="state_id"),
+        IndexModel([("percentage", DESCENDING), ("id", ASCENDING)], name="percentage_desc_id"),
+    ],
+    "blocks": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("district_id", ASCENDING), ("id", ASCENDING)], name="district_id_id"),
+        IndexModel(
+            [("district_id", ASCENDING), ("percentage", DESCENDING), ("id", ASCENDING)],
+            name="district_id_percentage_desc_id"
+        ),
+        IndexModel([("percentage", DESCENDING), ("id", ASCENDING)], name="percentage_desc_id"),
+    ],
+    "schools": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("block_id", ASCENDING), ("id", ASCENDING)], name="block_id_id"),
+        IndexModel(
+            [("block_id", ASCENDING), ("percentage", DESCENDING), ("id", ASCENDING)],
+            name="block_id_percentage_desc_id"
+        ),
+        IndexModel([("district_id", ASCENDING)], name="district_id"),
+        IndexModel([("percentage", DESCENDING), ("id", ASCENDING)], name="percentage_desc_id"),
+    ],
+    "metrics": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("level", ASCENDING), ("entity_id", ASCENDING)], name="level_entity_id"),
+        IndexModel([("level", ASCENDING), ("domain", ASCENDING)], name="level_domain"),
+        IndexModel([("level", ASCENDING), ("id", ASCENDING)], name="level_id"),
+    ],
+    "insights": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("level", ASCENDING), ("entity_id", ASCENDING)], name="level_entity_id"),
+        IndexModel([("level", ASCENDING), ("id", ASCENDING)], name="level_id"),
+        IndexModel(
+            [("metric_name", ASCENDING), ("level", ASCENDING), ("entity_id", ASCENDING)],
+            unique=True, name="metric_name_level_entity_id_unique"
+        ),
+    ],
+    "pgi_indicator_scores": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("level", ASCENDING), ("entity_id", ASCENDING)], name="level_entity_id"),
+    ],
+    "pgi_scores": [
+        IndexModel([("level", ASCENDING), ("entity_id", ASCENDING)], unique=True, name="level_entity_id_unique"),
+        IndexModel([("level", ASCENDING), ("last_calculated", DESCENDING)], name="level_last_calculated_desc"),
+    ],
+    # Time-series collection, created by score_history.ensure_history_collection
+    "pgi_score_history": [
+        IndexModel(
+            [("meta.level", ASCENDING), ("meta.entity_id", ASCENDING), ("meta.key", ASCENDING), ("recorded_at", ASCENDING)],
+            name="meta_level_entity_id_key_recorded_at"
+        ),
+    ],
+    "pgi_rankings": [
+        IndexModel(
+            [("level", ASCENDING), ("key", ASCENDING), ("scope_ids", ASCENDING), ("value", ASCENDING)],
+            name="level_key_scope_value"
+        ),
+        IndexModel([("level", ASCENDING), ("key", ASCENDING), ("value", ASCENDING)], name="level_key_value"),
+        IndexModel(
+            [("level", ASCENDING), ("entity_id", ASCENDING), ("key", ASCENDING)],
+            unique=True, name="level_entity_id_key_unique"
+        ),
+    ],
+}
+
+# Indexes replaced by registry entries; ensure_indexes drops them where they still exist
+RETIRED_INDEXES = {
+    "districts": ["percentage_desc"],
+    "blocks": ["district_id", "percentage_desc"],
+    "schools": ["block_id", "percentage_desc"],
+    "pgi_scores": ["level_calculation_date_desc"],
+}
+
+# Unique indexes introduced after data was written: duplicates are removed before
+# the index is first built, keeping the earliest document of each key
+DEDUPLICATE_BEFORE_INDEXING = {
+    "insights": ["metric_name_level_entity_id_unique"],
+}
+
+# Hot queries issued by the API: (collection, filter, sort)
+# check_query_plans.py explains each one and fails on a collection scan
+HOT_QUERIES = [
+    ("states", {"id": "mh_001"}, None),
+    ("states", {"name": "Maharashtra"}, None),
+    ("states", {}, [("percentage", DESCENDING)]),
+    ("districts", {"id": "dist_001"}, None),
+    ("districts", {"state_id": "mh_001"}, None),
+    ("districts", {}, [("percentage", DESCENDING)]),
+    ("blocks", {"id": "block_001_001"}, None),
+    ("blocks", {"district_id": "dist_001"}, None),
+    ("blocks", {}, [("percentage", DESCENDING)]),
+    ("schools", {"id": "school_001_001_001"}, None),
+    ("schools", {"block_id": "block_001_001"}, None),
+    ("schools", {"district_id": "dist_001"}, None),
+    ("schools", {}, [("percentage", DESCENDING)]),
+    ("blocks", {"district_id": "dist_001"}, [("percentage", DESCENDING), ("id", ASCENDING)]),
+    ("schools", {"block_id": "block_001_001", "id": {"$gt": "school_001_001_010"}}, [("id", ASCENDING)]),
+    ("schools", {"$and": [{"block_id": "block_001_001"}, {"$or": [
+        {"percentage": {"$lt": 60.0}}, {"percentage": 60.0, "id": {"$gt": "school_001_001_010"}}, {"percentage": None}
+    ]}]}, [("percentage", DESCENDING), ("id", ASCENDING)]),
+    ("districts", {}, [("percentage", DESCENDING), ("id", ASCENDING)]),
+    ("insights", {"level": "school", "id": {"$gt": "0"}}, [("id", ASCENDING)]),
+    ("metrics", {"level": "district", "entity_id": "dist_001"}, None),
+    ("metrics", {"level": "state", "domain": {"$in": ["Learning Outcomes", "Equity"]}}, None),
+    ("metrics", {"level": "school"}, None),
+    ("insights", {"level": "district", "entity_id": "dist_001"}, None),
+    ("insights", {"level": "school"}, None),
+    ("pgi_indicator_scores", {"id": "mh_001_lo_language_class3"}, None),
+    ("pgi_indicator_scores", {"level": "state", "entity_id": "mh_001"}, None),
+    ("pgi_scores", {"level": "district", "entity_id": {"$in": ["dist_001", "dist_002"]}}, None),
+    ("pgi_scores", {"level": "district", "last_calculated": {"$gte": datetime(2025, 1, 1, tzinfo=timezone.utc)}},
+     [("last_calculated", DESCENDING)]),
+    ("pgi_rankings", {"level": "district", "key": "equity"}, [("value", ASCENDING)]),
+    ("pgi_rankings", {"level": "school", "key": "equity", "scope_ids": "dist_001"}, [("value", ASCENDING)]),
+    ("pgi_rankings", {"level": "block", "key": "lo_language_class3", "scope_ids": {"$in": ["dist_001", "dist_002"]},
+                      "value": {"$lt": 65.0}}, [("value", ASCENDING)]),
+    ("pgi_rankings", {"level": "school", "entity_id": {"$in": ["school_001_001_001"]}}, None),
+]
+
+async def remove_duplicates(collection, keys) -> int:
+    """Delete all but the earliest document of every group sharing the same keys; returns documents deleted"""
+    pipeline = [
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": {key: f"${key}" for key in keys}, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+    duplicate_ids = []
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        duplicate_ids.extend(group["ids"][1:])
+    if not duplicate_ids:
+        return 0
+    result = await collection.delete_many({"_id": {"$in": duplicate_ids}})
+    return result.deleted_count
+
+async def ensure_indexes(db, exclude=()):
+    """
+    Create every registered index (no-op for indexes that already exist), then drop retired ones.
+    Collections in exclude are left alone, so they are not created as plain collections.
+    """
+    for collection_name, index_names in DEDUPLICATE_BEFORE_INDEXING.items():
+        existing = await db[collection_name].index_information()
+        for index in INDEX_REGISTRY[collection_name]:
+            if index.document["name"] in index_names and index.document["name"] not in existing:
+                removed = await remove_duplicates(db[collection_name], list(index.document["key"]))
+                if removed:
+                    print(f"Removed {removed} duplicate {collection_name} documents before building {index.document['name']}")
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        if collection_name not in exclude:
+            await db[collection_name].create_indexes(indexes)
+    # Dropped only after their replacements exist, so the queries they served always have an index
+    for collection_name, index_names in RETIRED_INDEXES.items():
+        existing = await db[collection_name].index_information()
+        for index_name in index_names:
+            if index_name in existing:
+                await db[collection_name].drop_index(index_name)
+                print(f"Dropped retired index {collection_name}.{index_name}")
+
+async def verify_indexes(db, exclude=()):
+    """Return the registered indexes missing from the database as (collection, index name) pairs"""
+    missing = []
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        if collection_name in exclude:
+            continue
+        existing = await db[collection_name].index_information()
+        for index in indexes:
+            if index.document["name"] not in existing:
+                missing.append((collection_name, index.document["name"]))
+    return missing
+
+def plan_stages(plan):
+    """Flatten the stage names of an explain() query plan"""
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages.extend(plan_stages(plan["inputStage"]))
+    for input_stage in plan.get("inputStages", []):
+        stages.extend(plan_stages(input_stage))
+    return stages
+
+async def explain_hot_queries(db):
+    """Explain every hot query; return a list of {collection, filter, sort, stages, collscan}"""
+    results = []
+    for collection_name, query, sort in HOT_QUERIES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = await cursor.explain()
+        winning_plan = explanation["queryPlanner"]["winningPlan"]
+        # Slot-based engine (MongoDB 7+) nests the classic plan under queryPlan
+        stages = plan_stages(winning_plan.get("queryPlan", winning_plan))
+        results.append({
+            "collection": collection_name,
+            "filter": query,
+            "sort": sort,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages
+        })
+    return results
@@ -0,0 +1,143 @@
+"""
+In-memory hierarchy of states, districts, blocks and schools
+Entities are loaded once into id -> node maps with parent links and child lists,
+so ancestry, child and name lookups do not query MongoDB. Nodes have the shape of
+an entity read with ENTITY_PROJECTION (id, name and the ancestor ids it has) and
+must not be mutated. The tree is reloaded when the dataset is replaced, and dropped
+when the entity collections no longer match it (e.g. after an unannounced import).
+"""
+
+import time
+import asyncio
+
+from cache import DATA_VERSION_CHECK_SECONDS
+
+# Collection holding the entities of each level
+LEVEL_COLLECTIONS = {
+    "state": "states",
+    "district": "districts",
+    "block": "blocks",
+    "school": "schools"
+}
+LEVELS = tuple(LEVEL_COLLECTIONS)
+
+# Parent level of each level and the field linking a child to its parent
+PARENT_LEVELS = {
+    "school": ("block", "block_id"),
+    "block": ("district", "district_id"),
+    "district": ("state", "state_id")
+}
+CHILD_LEVELS = {parent: (child, field) for child, (parent, field) in PARENT_LEVELS.items()}
+
+# Entity fields needed to score an entity and place it in the hierarchy
+ENTITY_PROJECTION = {"_id": 0, "id": 1, "name": 1, "state_id": 1, "district_id": 1, "block_id": 1}
+
+
+class HierarchyCache:
+    """Process-wide entity tree; load() before use or call ensure_loaded()"""
+
+    def __init__(self):
+        self.nodes = {level: {} for level in LEVELS}
+        self.children = {level: {} for level in LEVELS}
+        self.loaded = False
+        self.checked_at = None
+        self.lock = asyncio.Lock()
+
+    def clear(self):
+        """Forget the tree; the next ensure_loaded() reads it again"""
+        self.nodes = {level: {} for level in LEVELS}
+        self.children = {level: {} for level in LEVELS}
+        self.loaded = False
+
+    async def load(self, db):
+        """Read every entity of every level into a fresh tree"""
+        started = time.perf_counter()
+        nodes = {level: {} for level in LEVELS}
+        for level in LEVELS:
+            async for entity in db[LEVEL_COLLECTIONS[level]].find({}, ENTITY_PROJECTION):
+                nodes[level][entity["id"]] = entity
+        self.nodes = nodes
+        self.children = {level: {} for level in LEVELS}
+        for level in LEVELS:
+            for node in nodes[level].values():
+                self.link(level, node)
+        self.loaded = True
+        print(f"Hierarchy loaded: {', '.join(f'{len(nodes[level])} {level}' for level in LEVELS)} "
+              f"in {time.perf_counter() - started:.2f}s")
+
+    async def ensure_loaded(self, db):
+        if not self.loaded:
+            async with self.lock:
+                if not self.loaded:
+                    await self.load(db)
+
+    async def changed_in(self, db) -> bool:
+        """
+        Whether an entity collection no longer holds as many entities as the loaded tree.
+        Reads collection metadata only, at most once per DATA_VERSION_CHECK_SECONDS.
+        """
+        now = time.monotonic()
+        if not self.loaded or (self.checked_at is not None and now - self.checked_at < DATA_VERSION_CHECK_SECONDS):
+            return False
+        self.checked_at = now
+        for level in LEVELS:
+            if await db[LEVEL_COLLECTIONS[level]].estimated_document_count() != len(self.nodes[level]):
+                return True
+        return False
+
+    def link(self, level: str, node: dict):
+        """Register node in its parent's child list"""
+        if level in PARENT_LEVELS:
+            parent_level, parent_field = PARENT_LEVELS[level]
+            parent_id = node.get(parent_field)
+            if parent_id is not None:
+                self.children[parent_level].setdefault(parent_id, []).append(node["id"])
+
+    def node(self, level: str, entity_id: str):
+        """Node of an entity, or None if it is not in the tree"""
+        return self.nodes[level].get(entity_id)
+
+    async def get(self, db, level: str, entity_id: str):
+        """Node of an entity, reading and adding it if it was created after the tree was loaded"""
+        await self.ensure_loaded(db)
+        node = self.nodes[level].get(entity_id)
+        if node is None:
+            node = await db[LEVEL_COLLECTIONS[level]].find_one({"id": entity_id}, ENTITY_PROJECTION)
+            if node is not None:
+                self.nodes[level][entity_id] = node
+                self.link(level, node)
+        return node
+
+    def parent(self, level: str, entity_id: str):
+        """(parent level, parent node) of an entity, or (None, None) at the top or for unknown entities"""
+        node = self.nodes[level].get(entity_id)
+        if node is None or level not in PARENT_LEVELS:
+            return None, None
+        parent_level, parent_field = PARENT_LEVELS[level]
+        return parent_level, self.nodes[parent_level].get(node.get(parent_field))
+
+    def child_ids(self, level: str, entity_id: str):
+        """Ids of an entity's direct children"""
+        return self.children[level].get(entity_id, [])
+
+    def names(self, level: str, entity_ids) -> dict:
+        """{entity_id: name} for the entities found in the tree"""
+        level_nodes = self.nodes[level]
+        return {entity_id: level_nodes[entity_id]["name"] for entity_id in entity_ids if entity_id in level_nodes}
+
+    def entities(self, level: str, scope_level: str = None, scope_ids=None) -> list:
+        """Nodes of a level, optionally only the descendants of the given entities of scope_level"""
+        if scope_level is None:
+            return list(self.nodes[level].values())
+        ids = list(dict.fromkeys(scope_ids))
+        current = scope_level
+        while current != level:
+            current_children = self.children[current]
+            ids = [child_id for entity_id in ids for child_id in current_children.get(entity_id, [])]
+            current = CHILD_LEVELS[current][0]
+        level_nodes = self.nodes[level]
+        return [level_nodes[entity_id] for entity_id in ids if entity_id in level_nodes]
+
+
+# Shared hierarchy for the API
+HIERARCHY = HierarchyCache()
@@ -0,0 +1,235 @@
+"""
+Rule-based metric insights and statewide precomputation
+classify_metric turns one metric into an insight and recommendation. precompute_insights
+runs it over every metric of every level in a process pool and upserts the results,
+so insight panels are populated before anyone asks for them.
+
+Usage:
+    python insight_engine.py                       # all levels of MONGO_URL/DB_NAME
+    python insight_engine.py --levels district,block --workers 8 --chunk-size 5000
+    python insight_engine.py --resume              # continue an interrupted run
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from cache import mark_dataset_changed
+
+# Processes used by precompute_insights
+INSIGHT_WORKERS = int(os.environ.get("INSIGHT_WORKERS", str(os.cpu_count() or 1)))
+# Metrics per chunk sent to a worker (chunks end on an entity boundary)
+INSIGHT_CHUNK_SIZE = int(os.environ.get("INSIGHT_CHUNK_SIZE", "5000"))
+
+STATE_BENCHMARK = 54.35
+PRECOMPUTE_LEVELS = ("state", "district", "block", "school")
+CHECKPOINT_ID = "precompute_insights"
+
+def classify_metric(metric_name: str, entity_name: str, current_value: float, max_value: float,
+                    trend: str) -> dict:
+    """Generate data-driven insights and recommendations for one metric"""
+    percentage = (current_value / max_value) * 100 if max_value > 0 else 0
+    gap = percentage - STATE_BENCHMARK
+    gap_abs = abs(gap)
+
+    # Determine severity based on performance
+    if percentage >= 80:
+        severity = "excellent"
+        insight_text = f"📊 {entity_name} demonstrates strong performance in {metric_name} with {percentage:.1f}% achievement, {gap_abs:.1f}% above state average."
+        recommendation = "🎯 Maintain current performance levels and share best practices with lower-performing entities."
+    elif percentage >= 65:
+        severity = "good"
+        insight_text = f"📊 {entity_name} shows good performance in {metric_name} at {percentage:.1f}%, {gap_abs:.1f}% {'above' if gap > 0 else 'below'} state average."
+        recommendation = "🎯 Focus on incremental improvements to reach excellence. Target 5-10% improvement within 6 months."
+    elif percentage >= 50:
+        severity = "moderate"
+        insight_text = f"📊 {entity_name} has moderate performance in {metric_name} at {percentage:.1f}%, {gap_abs:.1f}% below state average."
+        recommendation = "🎯 Implement targeted interventions and capacity building. Aim for 10-15% improvement within 6-12 months."
+    else:
+        severity = "critical"
+        insight_text = f"📊 {entity_name} shows critical performance gap in {metric_name} at {percentage:.1f}%, {gap_abs:.1f}% below state average."
+        recommendation = "🎯 Immediate intervention required. Deploy focused support, additional resources, and regular monitoring. Target 15-20% improvement within 12 months."
+
+    # Add trend context
+    if trend == "increasing":
+        insight_text += " Performance trend is improving."
+    elif trend == "decreasing":
+        insight_text += " Performance trend is declining - urgent attention needed."
+    else:
+        insight_text += " Performance trend is stable."
+
+    return {
+        "insight": insight_text,
+        "recommendation": recommendation,
+        "severity": severity
+    }
+
+def classify_chunk(rows):
+    """Worker entry point: classify (metric_name, entity_name, value, max_value, trend) rows"""
+    return [classify_metric(*row) for row in rows]
+
+def insight_operations(level: str, metrics, results, generated_at: datetime):
+    """Upserts of the classified metrics, keyed like the unique (metric_name, level, entity_id) index"""
+    return [
+        UpdateOne(
+            {"metric_name": metric["metric_name"], "level": level, "entity_id": metric["entity_id"]},
+            {
+                "$set": {
+                    "insight_text": result["insight"],
+                    "recommendation": result["recommendation"],
+                    "severity": result["severity"],
+                    "generated_at": generated_at
+                },
+                "$setOnInsert": {"id": str(uuid.uuid4())}
+            },
+            upsert=True
+        )
+        for metric, result in zip(metrics, results)
+    ]
+
+async def iter_metric_chunks(db, level: str, after_entity_id, chunk_size: int):
+    """Yield lists of a level's metrics in entity_id order, each ending on an entity boundary"""
+    query = {"level": level}
+    if after_entity_id is not None:
+        query["entity_id"] = {"$gt": after_entity_id}
+    projection = {"_id": 0, "metric_name": 1, "entity_id": 1, "entity_name": 1, "value": 1, "max_value": 1, "trend": 1}
+    cursor = db.metrics.find(query, projection).sort([("level", 1), ("entity_id", 1)]).batch_size(chunk_size)
+
+    chunk = []
+    async for metric in cursor:
+        if len(chunk) >= chunk_size and metric["entity_id"] != chunk[-1]["entity_id"]:
+            yield chunk
+            chunk = []
+        chunk.append(metric)
+    if chunk:
+        yield chunk
+
+async def precompute_level(db, level: str, classify, workers: int, chunk_size: int, on_write) -> int:
+    """
+    Classify and upsert every metric of one level, resuming after the level's checkpoint.
+    Up to `workers` chunks are classified at once with await classify(rows); after each window is written the last
+    entity id is checkpointed and on_write(level, entity_ids, metrics) is called.
+    Returns the metrics processed.
+    """
+    checkpoint_key = {"id": CHECKPOINT_ID, "level": level}
+    checkpoint = await db.checkpoints.find_one(checkpoint_key) or {}
+    if checkpoint.get("completed"):
+        return 0
+
+    generated_at = datetime.now(timezone.utc)
+    processed = 0
+
+    async def process(window):
+        results = await asyncio.gather(*[
+            classify([(m["metric_name"], m["entity_name"], m["value"], m["max_value"], m["trend"]) for m in chunk])
+            for chunk in window
+        ])
+        operations = [
+            operation
+            for chunk, chunk_results in zip(window, results)
+            for operation in insight_operations(level, chunk, chunk_results, generated_at)
+        ]
+        try:
+            await db.insights.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # An upsert racing a concurrent insert of the same key loses; that insight stands
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+        await db.checkpoints.update_one(
+            checkpoint_key, {"$set": {"last_entity_id": window[-1][-1]["entity_id"]}}, upsert=True
+        )
+        on_write(level, {metric["entity_id"] for chunk in window for metric in chunk}, len(operations))
+        return len(operations)
+
+    window = []
+    async for chunk in iter_metric_chunks(db, level, checkpoint.get("last_entity_id"), chunk_size):
+        window.append(chunk)
+        if len(window) >= workers:
+            processed += await process(window)
+            window = []
+    if window:
+        processed += await process(window)
+
+    await db.checkpoints.update_one(checkpoint_key, {"$set": {"completed": True}}, upsert=True)
+    return processed
+
+async def precompute_insights(db, levels=PRECOMPUTE_LEVELS, workers: int = INSIGHT_WORKERS,
+                              chunk_size: int = INSIGHT_CHUNK_SIZE, resume: bool = False, report=None,
+                              on_write=None) -> dict:
+    """
+    Regenerate the insights of every metric of the given levels.
+    Without resume the checkpoints are reset, so every metric is classified again
+    (e.g. after a data refresh). report(done, total) receives progress and
+    on_write(level, entity_ids) the entities whose insights were written.
+    Prints and returns metrics and metrics/sec per level.
+    """
+    if not resume:
+        await db.checkpoints.delete_many({"id": CHECKPOINT_ID})
+    total = await db.metrics.count_documents({"level": {"$in": list(levels)}})
+    done = 0
+
+    def written(level, entity_ids, count):
+        nonlocal done
+        done += count
+        if on_write:
+            on_write(level, entity_ids)
+        if report:
+            report(done, total)
+
+    # Spawned workers import only this module, not the server and its database client.
+    # With a single worker the pool would only add pickling, so chunks are classified inline.
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    loop = asyncio.get_running_loop()
+
+    async def classify(rows):
+        if pool is None:
+            return classify_chunk(rows)
+        return await loop.run_in_executor(pool, classify_chunk, rows)
+
+    stats = {}
+    started = time.perf_counter()
+    try:
+        for level in levels:
+            level_started = time.perf_counter()
+            processed = await precompute_level(db, level, classify, workers, chunk_size, written)
+            elapsed = time.perf_counter() - level_started
+            stats[level] = {"metrics": processed, "metrics_per_sec": round(processed / elapsed, 1) if elapsed > 0 else 0}
+            print(f"Precomputed {level} insights: {processed} metrics in {elapsed:.2f}s "
+                  f"({stats[level]['metrics_per_sec']} metrics/sec)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    processed = sum(level_stats["metrics"] for level_stats in stats.values())
+    stats["total"] = {"metrics": processed, "metrics_per_sec": round(processed / elapsed, 1) if elapsed > 0 else 0}
+    print(f"Precomputed {processed} insights in {elapsed:.2f}s with {workers} workers")
+    return stats
+
+async def main(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), tz_aware=True)
+    db = client[os.environ.get("DB_NAME", "maharashtra_education")]
+    await precompute_insights(db, args.levels.split(","), args.workers, args.chunk_size, args.resume)
+    await mark_dataset_changed(db)
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Precompute metric insights for every entity")
+    parser.add_argument("--levels", default=",".join(PRECOMPUTE_LEVELS), help="comma separated levels")
+    parser.add_argument("--workers", type=int, default=INSIGHT_WORKERS, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=INSIGHT_CHUNK_SIZE, help="metrics per worker chunk")
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+    asyncio.run(main(parser.parse_args()))
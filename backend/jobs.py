@@ -0,0 +1,104 @@
+"""
+In-process background job queue
+A bounded pool of asyncio workers drains one queue, so a burst of requests is
+processed a few jobs at a time instead of all at once. Jobs are deduplicated by
+key: submitting a key that is already queued or running returns that job.
+"""
+
+import os
+import uuid
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# Concurrent workers
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+# Finished jobs kept for status lookups
+JOB_HISTORY_SIZE = int(os.environ.get("JOB_HISTORY_SIZE", "1000"))
+
+QUEUED, RUNNING, COMPLETED, FAILED = "queued", "running", "completed", "failed"
+
+
+class JobQueue:
+    """
+    asyncio job queue with a fixed worker pool.
+
+    A job function is called as await func(report); report(done, total) updates
+    the progress shown by status(). Workers are started on the first submit so
+    they run on the serving event loop.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, history_size=JOB_HISTORY_SIZE):
+        self.worker_count = workers
+        self.history_size = history_size
+        self.queue = None
+        self.workers = []
+        self.jobs = OrderedDict()
+        self.active = {}
+
+    def submit(self, kind: str, key: tuple, func) -> dict:
+        """Queue func unless a job with the same kind and key is queued or running; returns the job"""
+        active_id = self.active.get((kind, key))
+        if active_id is not None:
+            return self.jobs[active_id]
+
+        self.start()
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "key": list(key),
+            "status": QUEUED,
+            "progress": {"done": 0, "total": None},
+            "error": None,
+            "submitted_at": datetime.now(timezone.utc),
+            "started_at": None,
+            "finished_at": None
+        }
+        self.jobs[job["id"]] = job
+        self.active[(kind, key)] = job["id"]
+        self.queue.put_nowait((job, func))
+        self.prune()
+        return job
+
+    def start(self):
+        """Start the worker pool if it is not running on the current event loop"""
+        loop = asyncio.get_running_loop()
+        if self.queue is not None and self.workers and self.workers[0].get_loop() is loop:
+            return
+        self.queue = asyncio.Queue()
+        self.workers = [asyncio.create_task(self.worker()) for _ in range(self.worker_count)]
+
+    async def worker(self):
+        while True:
+            job, func = await self.queue.get()
+            job["status"] = RUNNING
+            job["started_at"] = datetime.now(timezone.utc)
+
+            def report(done, total=None):
+                job["progress"] = {"done": done, "total": total}
+
+            try:
+                await func(report)
+                job["status"] = COMPLETED
+            except Exception as e:
+                job["status"] = FAILED
+                job["error"] = str(e)
+                print(f"Job {job['id']} ({job['kind']} {job['key']}) failed: {e}")
+            finally:
+                job["finished_at"] = datetime.now(timezone.utc)
+                self.active.pop((job["kind"], tuple(job["key"])), None)
+                self.queue.task_done()
+
+    def prune(self):
+        """Forget the oldest finished jobs beyond history_size"""
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in (COMPLETED, FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.history_size)]:
+            del self.jobs[job_id]
+
+    def status(self, job_id: str):
+        """Job status dict, or None if the job is unknown"""
+        return self.jobs.get(job_id)
+
+
+# Shared queue for insight generation
+JOB_QUEUE = JobQueue()
@@ -0,0 +1,106 @@
+"""
+Migration of ISO-string date fields to native BSON dates
+Earlier versions stored created_at / last_updated / generated_at / last_calculated /
+calculation_date as ISO strings. Documents are rewritten in _id order, a batch at a
+time; the last _id of every batch is checkpointed in the migrations collection so an
+interrupted run resumes where it stopped.
+
+Usage:
+    python migrate_dates.py                     # migrate MONGO_URL/DB_NAME
+    python migrate_dates.py --batch-size 5000
+"""
+
+import os
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from cache import mark_dataset_changed
+from serialization import COLLECTION_DATE_FIELDS
+
+MIGRATION_ID = "native_dates"
+# Documents rewritten per bulk_write
+MIGRATION_BATCH_SIZE = int(os.environ.get("MIGRATION_BATCH_SIZE", "1000"))
+
+def parse_iso(value: str):
+    """Parse a stored ISO timestamp as a UTC-aware datetime; None if it is not one"""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+async def migrate_collection(db, collection_name: str, fields, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """Convert the string date fields of one collection, resuming from its checkpoint; returns documents updated"""
+    checkpoint_key = {"id": MIGRATION_ID, "collection": collection_name}
+    checkpoint = await db.migrations.find_one(checkpoint_key) or {}
+    if checkpoint.get("completed"):
+        return 0
+
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    if checkpoint.get("last_id") is not None:
+        query["_id"] = {"$gt": checkpoint["last_id"]}
+    projection = {field: 1 for field in fields}
+
+    converted = 0
+    while True:
+        batch = await db[collection_name].find(query, projection).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+
+        operations = []
+        for document in batch:
+            update = {}
+            for field in fields:
+                value = document.get(field)
+                parsed = parse_iso(value) if isinstance(value, str) else None
+                if parsed is not None:
+                    update[field] = parsed
+            if update:
+                operations.append(UpdateOne({"_id": document["_id"]}, {"$set": update}))
+        if operations:
+            await db[collection_name].bulk_write(operations, ordered=False)
+            converted += len(operations)
+
+        # Unparseable strings are left as they are and skipped by moving past their _id
+        query["_id"] = {"$gt": batch[-1]["_id"]}
+        await db.migrations.update_one(
+            checkpoint_key,
+            {"$set": {"last_id": batch[-1]["_id"]}, "$inc": {"converted": len(operations)}},
+            upsert=True
+        )
+
+    await db.migrations.update_one(checkpoint_key, {"$set": {"completed": True}}, upsert=True)
+    return converted
+
+async def migrate_dates(db, batch_size: int = MIGRATION_BATCH_SIZE) -> dict:
+    """Run the migration over every collection with date fields; returns documents updated per collection"""
+    results = {}
+    for collection_name, fields in COLLECTION_DATE_FIELDS.items():
+        converted = await migrate_collection(db, collection_name, fields, batch_size)
+        if converted:
+            print(f"Migrated {converted} {collection_name} documents to native dates")
+        results[collection_name] = converted
+    return results
+
+async def main(batch_size: int):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), tz_aware=True)
+    db = client[os.environ.get("DB_NAME", "maharashtra_education")]
+    results = await migrate_dates(db, batch_size)
+    if any(results.values()):
+        await mark_dataset_changed(db)
+    print(f"Migration complete: {sum(results.values())} documents updated")
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Convert ISO-string date fields to native BSON dates")
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE, help="documents per bulk_write")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,107 @@
+"""
+Keyset pagination and field projection for list endpoints
+A page is read with an indexed range query that starts after the last document of
+the previous page, so deep pages cost the same as the first one. The position is
+handed to the client as an opaque cursor; the fields= parameter is pushed down to
+Mongo as a projection.
+"""
+
+import os
+import re
+import base64
+import binascii
+
+import orjson
+from fastapi import HTTPException
+
+from serialization import from_mongo
+
+# Largest page a client may ask for
+PAGE_SIZE_MAX = int(os.environ.get("PAGE_SIZE_MAX", "1000"))
+
+# Header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Keyset orders: sort name -> sort keys. id is unique, so it breaks ties and every order is total.
+PAGE_SORTS = {
+    "id": [("id", 1)],
+    "percentage": [("percentage", -1), ("id", 1)],
+}
+
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+def parse_fields(fields, sort: str = "id"):
+    """
+    Projection for a comma separated fields= value; without fields every field but _id is read.
+    The sort keys are always included because the next cursor is built from them.
+    """
+    projection = {"_id": 0}
+    if not fields:
+        return projection
+    for field in fields.split(","):
+        field = field.strip()
+        if not FIELD_NAME.match(field):
+            raise HTTPException(status_code=400, detail=f"Invalid field: {field}")
+        projection[field] = 1
+    for key, _ in PAGE_SORTS[sort]:
+        projection[key] = 1
+    return projection
+
+def encode_cursor(sort: str, document) -> str:
+    """Cursor pointing just after document in the given order"""
+    position = [sort] + [document.get(key) for key, _ in PAGE_SORTS[sort]]
+    return base64.urlsafe_b64encode(orjson.dumps(position)).decode().rstrip("=")
+
+def decode_cursor(sort: str, cursor: str) -> list:
+    """Sort key values stored in a cursor; 400 if it is malformed or was issued for another order"""
+    try:
+        position = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(position, list) or len(position) != len(PAGE_SORTS[sort]) + 1 or position[0] != sort:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position[1:]
+
+def after_position(sort: str, values: list) -> dict:
+    """Filter matching the documents that come after values in the given order"""
+    if sort == "id":
+        return {"id": {"$gt": values[0]}}
+
+    # percentage descending with missing percentages last, then id ascending
+    percentage, entity_id = values
+    if percentage is None:
+        return {"percentage": None, "id": {"$gt": entity_id}}
+    return {"$or": [
+        {"percentage": {"$lt": percentage}},
+        {"percentage": percentage, "id": {"$gt": entity_id}},
+        {"percentage": None}
+    ]}
+
+def validate_page(sort: str, limit):
+    """400 for an unknown sort or a limit outside 1..PAGE_SIZE_MAX"""
+    if sort not in PAGE_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort: {sort}")
+    if limit is not None and not 1 <= limit <= PAGE_SIZE_MAX:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {PAGE_SIZE_MAX}")
+
+async def find_page(db, collection_name: str, query: dict, limit=None, cursor=None, sort: str = "id",
+                    fields=None):
+    """
+    Read one page of a collection in keyset order; returns (documents, next cursor or None).
+    Without limit and cursor every matching document is returned, unsorted, as one page;
+    a cursor without limit returns everything after it.
+    """
+    validate_page(sort, limit)
+    if cursor:
+        query = {"$and": [query, after_position(sort, decode_cursor(sort, cursor))]}
+    find = db[collection_name].find(query, parse_fields(fields, sort))
+    # Unpaged reads keep the natural order so large sets are not sorted
+    if limit is not None or cursor:
+        find = find.sort(PAGE_SORTS[sort])
+    if limit is None:
+        return [from_mongo(collection_name, document) async for document in find], None
+
+    # One extra document tells whether there is a next page
+    documents = await find.limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(sort, documents[limit - 1]) if len(documents) > limit else None
+    return [from_mongo(collection_name, document) for document in documents[:limit]], next_cursor
@@ -0,0 +1,188 @@
+"""
+Vectorized PGI scoring engine
+Compiles the PGI framework into NumPy weight/direction arrays so that an
+(entities x indicators) matrix can be scored in a single pass
+"""
+
+import numpy as np
+
+from pgi_framework import PGI_DOMAINS, PGI_INDICATORS, FRAMEWORK_INDEX, build_framework_index
+
+# Units where a lower achieved value is better (gaps, delays)
+LOWER_IS_BETTER_UNITS = ("percentage_point_difference", "days")
+
+# Rows scored per block in domain_score_matrix
+BLOCK_ROWS = 2048
+
+
+class PGIScoringEngine:
+    """
+    Compiled form of PGI_DOMAINS / PGI_INDICATORS.
+
+    Scores are bit-for-bit identical to calculate_total_pgi_score: indicator
+    contributions are accumulated column by column in framework order, so the
+    floating point summation order matches the per-entity implementation.
+    """
+
+    def __init__(self, domains=None, indicators=None):
+        domains = PGI_DOMAINS if domains is None else domains
+        indicators = PGI_INDICATORS if indicators is None else indicators
+        if domains is PGI_DOMAINS and indicators is PGI_INDICATORS:
+            index = FRAMEWORK_INDEX
+        else:
+            index = build_framework_index(domains, indicators)
+
+        self.domains = domains
+        self.indicators = indicators
+        self.domain_keys = tuple(domains.keys())
+        self.indicator_keys = tuple(indicators.keys())
+        self.column_index = {key: j for j, key in enumerate(self.indicator_keys)}
+
+        self.targets = np.array([ind["target"] for ind in indicators.values()], dtype=np.float64)
+        self.lower_is_better = np.array(
+            [ind.get("unit") in LOWER_IS_BETTER_UNITS for ind in indicators.values()], dtype=bool
+        )
+        self.lower_columns = np.flatnonzero(self.lower_is_better)
+        self.domain_weights = np.array([d["weight"] for d in domains.values()], dtype=np.float64)
+        self.normalized_weights = np.array(
+            [index.normalized_weights[key] for key in self.indicator_keys], dtype=np.float64
+        )
+
+        # Column indices of each domain, in framework order
+        self.domain_columns = [
+            np.array([self.column_index[key] for key in index.indicators_by_domain.get(domain_key, {})], dtype=np.intp)
+            for domain_key in self.domain_keys
+        ]
+
+    def to_matrix(self, score_dicts):
+        """
+        Build an (entities x indicators) matrix from a list of {indicator_key: achieved} dicts.
+        Missing indicators are NaN; unknown keys are ignored.
+        """
+        values = np.full((len(score_dicts), len(self.indicator_keys)), np.nan, dtype=np.float64)
+        column_index = self.column_index
+        for row, scores in enumerate(score_dicts):
+            for key, achieved in scores.items():
+                j = column_index.get(key)
+                if j is not None:
+                    values[row, j] = achieved
+        return values
+
+    def _apply_direction(self, block):
+        """Convert "lower is better" columns of block into achievement percentages, in place"""
+        lower = self.lower_columns
+        achieved = block[:, lower]
+        targets = self.targets[lower]
+        with np.errstate(invalid="ignore"):
+            penalized = np.maximum(0, 100 - ((achieved - targets) / targets * 100))
+        block[:, lower] = np.where(achieved <= targets, 100.0, penalized)
+        return block
+
+    def achievement_matrix(self, values):
+        """Convert achieved values into achievement percentages (NaN stays NaN)"""
+        return self._apply_direction(np.array(values, dtype=np.float64))
+
+    def domain_score_matrix(self, values, max_score=1000):
+        """Return an (entities x domains) matrix of domain contributions to the total score"""
+        values = np.asarray(values, dtype=np.float64)
+        scores = np.zeros((values.shape[0], len(self.domain_keys)), dtype=np.float64)
+
+        # Work in row blocks so the per-column accumulation stays in cache
+        for start in range(0, values.shape[0], BLOCK_ROWS):
+            block = self._apply_direction(np.array(values[start:start + BLOCK_ROWS]))
+            block *= self.normalized_weights
+            # Missing (NaN) indicators contribute nothing
+            block[np.isnan(block)] = 0.0
+
+            for d, columns in enumerate(self.domain_columns):
+                if len(columns) == 0:
+                    continue
+                weighted_achievement = np.zeros(block.shape[0], dtype=np.float64)
+                for j in columns:
+                    weighted_achievement += block[:, j]
+                scores[start:start + BLOCK_ROWS, d] = (weighted_achievement / 100) * self.domain_weights[d] * max_score
+
+        return scores
+
+    def score_matrix(self, values, max_score=1000):
+        """Return (domain_scores, total_scores) for an (entities x indicators) matrix"""
+        domain_scores = self.domain_score_matrix(values, max_score)
+        total_scores = np.zeros(domain_scores.shape[0], dtype=np.float64)
+        for d in range(domain_scores.shape[1]):
+            total_scores += domain_scores[:, d]
+        return domain_scores, total_scores
+
+    def score_many(self, score_dicts, max_score=1000):
+        """
+        Score many entities at once.
+
+        Returns a list of dicts with the same shape and values as
+        calculate_total_pgi_score for each input dict.
+        """
+        domain_scores, total_scores = self.score_matrix(self.to_matrix(score_dicts), max_score)
+        return [
+            self.result_dict(domain_row, total_score, max_score)
+            for domain_row, total_score in zip(domain_scores.tolist(), total_scores.tolist())
+        ]
+
+    def result_dict(self, domain_row, total_score, max_score=1000):
+        """Format one row of scores like calculate_total_pgi_score (expects Python floats)"""
+        domain_breakdown = {}
+        for domain_key, domain_score in zip(self.domain_keys, domain_row):
+            domain_data = self.domains[domain_key]
+            domain_max = domain_data["weight"] * max_score
+            domain_breakdown[domain_key] = {
+                "name": domain_data["name"],
+                "code": domain_data["code"],
+                "weight": domain_data["weight"],
+                "score": round(domain_score, 2),
+                "max_score": round(domain_max, 2),
+                "percentage": round((domain_score / domain_max * 100), 2) if domain_data["weight"] > 0 else 0
+            }
+
+        return {
+            "total_score": round(total_score, 2),
+            "max_score": max_score,
+            "percentage": round((total_score / max_score) * 100, 2),
+            "domain_breakdown": domain_breakdown
+        }
+
+    def rollup_matrix(self, values, parent_index, parent_count, weights=None):
+        """
+        Aggregate child indicator values into their parents.
+        
+        Args:
+            values: (children x indicators) matrix, NaN where a child has no value
+            parent_index: parent row for every child row
+            parent_count: number of parent rows
+            weights: optional per-child weights (e.g. student_count); parents whose
+                children all have zero weight fall back to an unweighted mean
+        
+        Returns:
+            (parents x indicators) matrix of means over the children that have a
+            value for each indicator, NaN where no child has one
+        """
+        values = np.asarray(values, dtype=np.float64)
+        parent_index = np.asarray(parent_index, dtype=np.intp)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+
+        def weighted_mean(child_weights):
+            numerator = np.zeros((parent_count, values.shape[1]), dtype=np.float64)
+            denominator = np.zeros((parent_count, values.shape[1]), dtype=np.float64)
+            np.add.at(numerator, parent_index, filled * child_weights[:, None])
+            np.add.at(denominator, parent_index, present * child_weights[:, None])
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(denominator > 0, numerator / denominator, np.nan)
+
+        rolled_up = weighted_mean(np.ones(values.shape[0], dtype=np.float64))
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            weighted = weighted_mean(weights)
+            has_weight = np.bincount(parent_index, weights=weights, minlength=parent_count) > 0
+            rolled_up = np.where(has_weight[:, None], weighted, rolled_up)
+        return rolled_up
+
+
+# Shared engine compiled once at import
+PGI_ENGINE = PGIScoringEngine()
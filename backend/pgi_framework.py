@@ -3,6 +3,11 @@ PGI (Performance Grading Index) Framework Configuration
 Based on Maharashtra Education System Performance Indicators
 """
 
+import json
+import hashlib
+from collections import namedtuple
+from types import MappingProxyType
+
 # PGI Domain Structure with Weights (Total = 1.0)
 PGI_DOMAINS = {
     "learning_outcomes": {
@@ -1195,21 +1200,68 @@ PGI_INDICATORS = {
     }
 }
 
+# Precompiled framework index
+# Built once at import so that per-request scoring never re-filters PGI_INDICATORS
+PGIFrameworkIndex = namedtuple("PGIFrameworkIndex", [
+    "indicators_by_domain",            # domain_key -> {indicator_key: indicator_data}
+    "indicators_by_level",             # level -> {indicator_key: indicator_data}
+    "indicators_by_domain_and_level",  # (domain_key, level) -> {indicator_key: indicator_data}
+    "key_by_code",                     # indicator code -> indicator_key
+    "normalized_weights"               # indicator_key -> weight normalized within its domain
+])
+
+LEVELS = ("state", "district", "block", "school")
+
+def build_framework_index(domains=PGI_DOMAINS, indicators=PGI_INDICATORS):
+    """Build an immutable lookup index over the given domains and indicators"""
+    by_domain = {domain_key: {} for domain_key in domains}
+    by_level = {level: {} for level in LEVELS}
+    by_domain_and_level = {(domain_key, level): {} for domain_key in domains for level in LEVELS}
+    key_by_code = {}
+
+    for indicator_key, indicator_data in indicators.items():
+        by_domain.setdefault(indicator_data["domain"], {})[indicator_key] = indicator_data
+        key_by_code[indicator_data["code"]] = indicator_key
+        for level in indicator_data["levels"]:
+            by_level.setdefault(level, {})[indicator_key] = indicator_data
+            by_domain_and_level.setdefault((indicator_data["domain"], level), {})[indicator_key] = indicator_data
+
+    normalized_weights = {}
+    for domain_indicators in by_domain.values():
+        total_indicator_weight = sum(ind["weight"] for ind in domain_indicators.values())
+        for indicator_key, indicator_data in domain_indicators.items():
+            normalized_weights[indicator_key] = indicator_data["weight"] / total_indicator_weight
+
+    return PGIFrameworkIndex(
+        indicators_by_domain=MappingProxyType({k: MappingProxyType(v) for k, v in by_domain.items()}),
+        indicators_by_level=MappingProxyType({k: MappingProxyType(v) for k, v in by_level.items()}),
+        indicators_by_domain_and_level=MappingProxyType({k: MappingProxyType(v) for k, v in by_domain_and_level.items()}),
+        key_by_code=MappingProxyType(key_by_code),
+        normalized_weights=MappingProxyType(normalized_weights)
+    )
+
+FRAMEWORK_INDEX = build_framework_index()
+
+def framework_version(domains=PGI_DOMAINS, indicators=PGI_INDICATORS):
+    """Short content hash of the framework; changes whenever a domain or indicator definition changes"""
+    encoded = json.dumps({"domains": domains, "indicators": indicators}, sort_keys=True)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:12]
+
+FRAMEWORK_VERSION = framework_version()
+
+_NO_INDICATORS = MappingProxyType({})
+
 def get_indicators_for_domain(domain_key):
-    """Get all indicators belonging to a specific domain"""
-    return {
-        indicator_key: indicator_data 
-        for indicator_key, indicator_data in PGI_INDICATORS.items() 
-        if indicator_data["domain"] == domain_key
-    }
+    """Get all indicators belonging to a specific domain (read-only mapping)"""
+    return FRAMEWORK_INDEX.indicators_by_domain.get(domain_key, _NO_INDICATORS)
 
 def get_indicators_for_level(level):
-    """Get all indicators applicable to a specific level (state/district/block/school)"""
-    return {
-        indicator_key: indicator_data 
-        for indicator_key, indicator_data in PGI_INDICATORS.items() 
-        if level in indicator_data["levels"]
-    }
+    """Get all indicators applicable to a specific level (state/district/block/school) (read-only mapping)"""
+    return FRAMEWORK_INDEX.indicators_by_level.get(level, _NO_INDICATORS)
+
+def get_indicators_for_domain_and_level(domain_key, level):
+    """Get the indicators of a domain that apply to a specific level (read-only mapping)"""
+    return FRAMEWORK_INDEX.indicators_by_domain_and_level.get((domain_key, level), _NO_INDICATORS)
 
 def calculate_domain_score(domain_key, indicator_scores, max_score=1000):
     """
@@ -1230,7 +1282,7 @@ def calculate_domain_score(domain_key, indicator_scores, max_score=1000):
         return 0.0
     
     # Calculate weighted average of indicators within domain
-    total_indicator_weight = sum(ind["weight"] for ind in domain_indicators.values())
+    normalized_weights = FRAMEWORK_INDEX.normalized_weights
     weighted_achievement = 0.0
     
     for indicator_key, indicator_data in domain_indicators.items():
@@ -1250,8 +1302,7 @@ def calculate_domain_score(domain_key, indicator_scores, max_score=1000):
                 achievement_pct = achieved
             
             # Weight within domain
-            indicator_weight_normalized = indicator_data["weight"] / total_indicator_weight
-            weighted_achievement += achievement_pct * indicator_weight_normalized
+            weighted_achievement += achievement_pct * normalized_weights[indicator_key]
     
     # Apply domain weight to get contribution to total score
     domain_contribution = (weighted_achievement / 100) * domain["weight"] * max_score
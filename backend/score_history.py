@@ -0,0 +1,141 @@
+"""
+PGI score history
+Every calculation and rollup appends the indicator values and the total of the
+entities it scored to the pgi_score_history time-series collection: one measurement
+per entity, key and time, with meta = {level, entity_id, key}. History is read back
+downsampled into calendar buckets on the server, so a trend chart over years of
+calculations reads one point per bucket and key.
+"""
+
+import os
+from datetime import timezone
+
+HISTORY_COLLECTION = "pgi_score_history"
+
+# Oldest server with time-series collections and $dateTrunc
+HISTORY_MIN_SERVER_VERSION = (5, 0)
+
+# Options of the time-series collection
+HISTORY_TIMESERIES = {"timeField": "recorded_at", "metaField": "meta", "granularity": "hours"}
+
+# Key under which an entity's total PGI percentage is recorded next to its indicators
+TOTAL_KEY = "total"
+
+# $dateTrunc units a history can be downsampled to
+HISTORY_BUCKETS = ("day", "week", "month", "quarter", "year")
+
+# Change in percentage points between the first and last bucket below which a series is stable
+HISTORY_TREND_THRESHOLD = float(os.environ.get("HISTORY_TREND_THRESHOLD", "1.0"))
+
+async def ensure_history_collection(db) -> bool:
+    """
+    Create pgi_score_history as a time-series collection; must run before its indexes are built.
+    Time-series collections and the $dateTrunc downsampling both need MongoDB 5.0+: on older
+    servers nothing is created and False is returned, so the caller can disable history.
+    """
+    version = (await db.command("buildInfo"))["versionArray"]
+    if tuple(version[:2]) < HISTORY_MIN_SERVER_VERSION:
+        print(
+            f"WARNING: {HISTORY_COLLECTION} needs MongoDB {'.'.join(map(str, HISTORY_MIN_SERVER_VERSION))} or later; "
+            f"server is {'.'.join(map(str, version[:3]))}, score history is disabled"
+        )
+        return False
+    if HISTORY_COLLECTION not in await db.list_collection_names():
+        await db.create_collection(HISTORY_COLLECTION, timeseries=HISTORY_TIMESERIES)
+    return True
+
+def history_documents(level: str, entity_id: str, indicator_values: dict, total, recorded_at) -> list:
+    """Measurements for one entity: one per indicator and, if total is given, one for its PGI total"""
+    documents = [
+        {
+            "recorded_at": recorded_at,
+            "meta": {"level": level, "entity_id": entity_id, "key": indicator_key},
+            "value": value
+        }
+        for indicator_key, value in indicator_values.items()
+    ]
+    if total is not None:
+        documents.append({
+            "recorded_at": recorded_at,
+            "meta": {"level": level, "entity_id": entity_id, "key": TOTAL_KEY},
+            "value": total["percentage"],
+            "score": total["total_score"]
+        })
+    return documents
+
+async def record_scores(db, level: str, entity_scores, recorded_at) -> int:
+    """
+    Append (entity_id, {indicator_key: value}, total) scores of a level to the history.
+    total is a dict with total_score and percentage, or None. Returns measurements written.
+    """
+    documents = [
+        document
+        for entity_id, indicator_values, total in entity_scores
+        for document in history_documents(level, entity_id, indicator_values, total, recorded_at)
+    ]
+    if documents:
+        await db[HISTORY_COLLECTION].insert_many(documents, ordered=False)
+    return len(documents)
+
+def bucket_expression(bucket: str) -> dict:
+    """Start of the calendar bucket (UTC, weeks starting on Monday) a measurement falls in"""
+    return {"$dateTrunc": {"date": "$recorded_at", "unit": bucket, "startOfWeek": "monday"}}
+
+def series_trend(points: list) -> str:
+    """increasing / decreasing / stable from the first to the last bucket average"""
+    if len(points) < 2:
+        return "stable"
+    change = points[-1]["average"] - points[0]["average"]
+    if change > HISTORY_TREND_THRESHOLD:
+        return "increasing"
+    if change < -HISTORY_TREND_THRESHOLD:
+        return "decreasing"
+    return "stable"
+
+async def score_history(db, level: str, entity_id: str, keys=None, since=None, until=None,
+                        bucket: str = "month") -> dict:
+    """
+    Downsampled history of an entity: {"series": {key: [point, ...]}, "trends": {key: trend}}.
+    Each point covers one bucket with the average, min, max and last value recorded in it.
+    keys limits the series (indicator keys and/or TOTAL_KEY); since/until bound recorded_at.
+    """
+    query = {"meta.level": level, "meta.entity_id": entity_id}
+    if keys:
+        query["meta.key"] = {"$in": list(keys)}
+    if since or until:
+        query["recorded_at"] = {}
+        if since:
+            query["recorded_at"]["$gte"] = since
+        if until:
+            query["recorded_at"]["$lt"] = until
+
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"recorded_at": 1}},
+        {"$group": {
+            "_id": {"key": "$meta.key", "period": bucket_expression(bucket)},
+            "average": {"$avg": "$value"},
+            "min": {"$min": "$value"},
+            "max": {"$max": "$value"},
+            "last": {"$last": "$value"},
+            "count": {"$sum": 1}
+        }},
+        {"$sort": {"_id.key": 1, "_id.period": 1}}
+    ]
+    series = {}
+    async for row in db[HISTORY_COLLECTION].aggregate(pipeline):
+        period = row["_id"]["period"]
+        if period.tzinfo is None:
+            period = period.replace(tzinfo=timezone.utc)
+        series.setdefault(row["_id"]["key"], []).append({
+            "period": period,
+            "average": round(row["average"], 2),
+            "min": row["min"],
+            "max": row["max"],
+            "last": row["last"],
+            "count": row["count"]
+        })
+    return {
+        "series": series,
+        "trends": {key: series_trend(points) for key, points in series.items()}
+    }
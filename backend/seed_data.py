@@ -0,0 +1,410 @@
+"""
+Sample dataset seeding pipeline
+Generates the Maharashtra sample documents as per-collection streams and writes
+them with batched, unordered insert_many calls, filling collections concurrently
+"""
+
+import os
+import time
+import asyncio
+from datetime import datetime, timezone
+from itertools import islice
+
+from pymongo.errors import BulkWriteError
+
+from pgi_framework import PGI_INDICATORS
+
+# Documents per insert_many call
+SEED_BATCH_SIZE = int(os.environ.get("SEED_BATCH_SIZE", "1000"))
+
+STATE_ID = "mh_001"
+
+# All 36 districts of Maharashtra with realistic performance data
+DISTRICTS = [
+    # Tier 1 - Metro/Urban districts (High performance)
+    {"name": "Mumbai City", "score": 485, "rank": 1, "blocks": 8},
+    {"name": "Mumbai Suburban", "score": 465, "rank": 2, "blocks": 10},
+    {"name": "Pune", "score": 445, "rank": 3, "blocks": 15},
+    {"name": "Thane", "score": 430, "rank": 4, "blocks": 12},
+    {"name": "Nashik", "score": 415, "rank": 5, "blocks": 14},
+    {"name": "Nagpur", "score": 410, "rank": 6, "blocks": 13},
+    {"name": "Aurangabad", "score": 395, "rank": 7, "blocks": 11},
+
+    # Tier 2 - Semi-urban districts (Good performance)
+    {"name": "Kolhapur", "score": 385, "rank": 8, "blocks": 10},
+    {"name": "Solapur", "score": 375, "rank": 9, "blocks": 9},
+    {"name": "Ahmednagar", "score": 370, "rank": 10, "blocks": 12},
+    {"name": "Satara", "score": 365, "rank": 11, "blocks": 11},
+    {"name": "Sangli", "score": 355, "rank": 12, "blocks": 8},
+    {"name": "Latur", "score": 350, "rank": 13, "blocks": 9},
+    {"name": "Osmanabad", "score": 345, "rank": 14, "blocks": 7},
+    {"name": "Jalgaon", "score": 340, "rank": 15, "blocks": 13},
+    {"name": "Dhule", "score": 335, "rank": 16, "blocks": 8},
+    {"name": "Akola", "score": 330, "rank": 17, "blocks": 9},
+    {"name": "Amravati", "score": 325, "rank": 18, "blocks": 12},
+
+    # Tier 3 - Developing districts (Moderate performance)
+    {"name": "Yavatmal", "score": 320, "rank": 19, "blocks": 11},
+    {"name": "Buldhana", "score": 315, "rank": 20, "blocks": 10},
+    {"name": "Washim", "score": 310, "rank": 21, "blocks": 6},
+    {"name": "Hingoli", "score": 305, "rank": 22, "blocks": 5},
+    {"name": "Parbhani", "score": 300, "rank": 23, "blocks": 8},
+    {"name": "Jalna", "score": 295, "rank": 24, "blocks": 7},
+    {"name": "Beed", "score": 290, "rank": 25, "blocks": 9},
+    {"name": "Raigad", "score": 285, "rank": 26, "blocks": 10},
+    {"name": "Ratnagiri", "score": 280, "rank": 27, "blocks": 8},
+    {"name": "Sindhudurg", "score": 275, "rank": 28, "blocks": 7},
+
+    # Tier 4 - Emerging districts (Needs focused attention)
+    {"name": "Chandrapur", "score": 270, "rank": 29, "blocks": 12},
+    {"name": "Wardha", "score": 265, "rank": 30, "blocks": 7},
+    {"name": "Gondia", "score": 260, "rank": 31, "blocks": 8},
+    {"name": "Bhandara", "score": 255, "rank": 32, "blocks": 6},
+    {"name": "Gadchiroli", "score": 250, "rank": 33, "blocks": 9},
+    {"name": "Nandurbar", "score": 245, "rank": 34, "blocks": 6},
+    {"name": "Palghar", "score": 240, "rank": 35, "blocks": 8},
+    {"name": "Usmanabad", "score": 235, "rank": 36, "blocks": 7}
+]
+
+# Domains structure used for metrics generation
+METRIC_DOMAINS = {
+    "Learning Outcomes": {
+        "metrics": ["Grade Proficiency", "FLN Achievement", "NAS Performance", "Conceptual Understanding"],
+        "state_values": [65.8, 58.2, 62.1, 70.4],
+        "max_values": [240, 60, 80, 100]
+    },
+    "Infrastructure": {
+        "metrics": ["Basic Facilities", "Digital Infrastructure", "Classroom Adequacy", "Laboratory Facilities"],
+        "state_values": [90.1, 75.3, 82.6, 68.9],
+        "max_values": [190, 50, 60, 40]
+    },
+    "Governance": {
+        "metrics": ["VSK Utilization", "Digital Attendance", "Fund Flow Efficiency", "Policy Implementation"],
+        "state_values": [49.7, 45.2, 52.8, 48.1],
+        "max_values": [130, 30, 35, 35]
+    },
+    "Teachers Education": {
+        "metrics": ["Teacher Qualification", "Professional Development", "Student-Teacher Ratio", "Training Effectiveness"],
+        "state_values": [76.6, 78.2, 74.1, 79.5],
+        "max_values": [100, 25, 25, 30]
+    },
+    "Access": {
+        "metrics": ["Net Enrollment Ratio", "Gross Enrollment Ratio", "Retention Rates", "OOSC Enrollment"],
+        "state_values": [65.5, 68.9, 72.3, 58.7],
+        "max_values": [80, 20, 25, 15]
+    },
+    "Equity": {
+        "metrics": ["Gender Parity", "Social Category Performance", "CWSN Inclusion", "Rural-Urban Equity"],
+        "state_values": [234.3, 89.2, 85.6, 91.7],
+        "max_values": [260, 65, 60, 75]
+    }
+}
+
+# Block and school metrics are generated for the first N districts (for demo purposes)
+METRIC_DISTRICT_COUNT = 10
+
+TRENDS = ["increasing", "stable", "decreasing"]
+
+# Maharashtra PGI indicator scores
+STATE_INDICATOR_SCORES = {
+    # Learning Outcomes indicators (12 indicators)
+    "lo_language_class3": 58.3,
+    "lo_math_class3": 55.7,
+    "lo_language_class5": 61.7,
+    "lo_math_class5": 58.3,
+    "lo_language_class8": 64.5,
+    "lo_math_class8": 62.8,
+    "lo_science_class8": 60.4,
+    "lo_social_class8": 59.2,
+    "lo_language_class10": 66.8,
+    "lo_math_class10": 68.5,
+    "lo_science_class10": 65.2,
+    "lo_social_class10": 63.9,
+
+    # Access indicators (8 indicators)
+    "adjusted_ner_secondary": 82.3,
+    "ner_higher_secondary": 68.5,
+    "retention_rate_primary": 91.2,
+    "retention_rate_upper_primary": 88.7,
+    "retention_rate_secondary": 84.7,
+    "completion_rate_secondary": 78.9,
+    "completion_rate_higher_secondary": 72.4,
+    "participation_rate_pre_primary": 76.8,
+
+    # Infrastructure & Facilities indicators (24 indicators)
+    "inf_ict_lab": 72.5,
+    "inf_smart_classes": 42.5,
+    "inf_integrated_science_lab": 71.6,
+    "inf_separate_science_lab_hs": 68.3,
+    "inf_cocurricular_rooms": 54.8,
+    "inf_library_basic": 89.3,
+    "inf_library_separate_room": 67.2,
+    "inf_prevocational_exposure": 38.5,
+    "inf_nsqf_vocational": 28.7,
+    "inf_vocational_placement_class10": 52.3,
+    "inf_vocational_placement_class12": 58.9,
+    "inf_vocational_selfemployed_class10": 18.4,
+    "inf_vocational_selfemployed_class12": 24.6,
+    "inf_midday_meal": 92.8,
+    "inf_pm_poshan_audit": 87.5,
+    "inf_health_checkup": 94.2,
+    "inf_sanitary_pad_vending": 76.4,
+    "inf_functional_incinerator": 68.9,
+    "inf_free_textbook": 96.8,
+    "inf_balavatika": 58.3,
+    "inf_kitchen_garden": 74.2,
+    "inf_rainwater_harvesting": 62.7,
+    "inf_drinking_water": 98.5,
+    "inf_solar_panel": 34.6,
+
+    # Equity indicators (44 indicators - equity gaps and facilities)
+    # SC vs General gaps (8 indicators)
+    "eq_sc_lang_class3": 6.5, "eq_sc_lang_class5": 7.2, "eq_sc_lang_class8": 8.1, "eq_sc_lang_class10": 8.5,
+    "eq_sc_math_class3": 7.3, "eq_sc_math_class5": 8.4, "eq_sc_math_class8": 9.2, "eq_sc_math_class10": 9.8,
+    # ST vs General gaps (8 indicators)
+    "eq_st_lang_class3": 8.2, "eq_st_lang_class5": 9.1, "eq_st_lang_class8": 10.3, "eq_st_lang_class10": 11.2,
+    "eq_st_math_class3": 9.5, "eq_st_math_class5": 10.8, "eq_st_math_class8": 12.1, "eq_st_math_class10": 13.5,
+    # Urban vs Rural gaps (8 indicators)
+    "eq_urban_rural_lang_class3": 9.2, "eq_urban_rural_lang_class5": 10.5, "eq_urban_rural_lang_class8": 11.8, "eq_urban_rural_lang_class10": 12.3,
+    "eq_urban_rural_math_class3": 10.1, "eq_urban_rural_math_class5": 11.4, "eq_urban_rural_math_class8": 12.7, "eq_urban_rural_math_class10": 13.2,
+    # Boys vs Girls gaps (8 indicators)
+    "eq_gender_lang_class3": 2.1, "eq_gender_lang_class5": 2.5, "eq_gender_lang_class8": 2.9, "eq_gender_lang_class10": 3.2,
+    "eq_gender_math_class3": 2.8, "eq_gender_math_class5": 3.4, "eq_gender_math_class8": 3.9, "eq_gender_math_class10": 4.2,
+    # Examination Result gaps (4 indicators)
+    "eq_sc_exam_class10": 8.7, "eq_st_exam_class10": 11.5, "eq_sc_exam_class12": 9.2, "eq_st_exam_class12": 12.3,
+    # Transition Rate gaps (2 indicators)
+    "eq_gender_transition": 2.8, "eq_minority_transition": 4.5,
+    # Facilities (6 indicators)
+    "eq_cwsn_assistive_tech": 56.9, "eq_cwsn_aids_appliances": 72.4, "eq_cwsn_ramp": 78.5,
+    "eq_cwsn_toilets": 68.3, "eq_boys_toilets": 94.2, "eq_girls_toilets": 92.8,
+
+    # Governance Processes indicators (16 indicators)
+    "gp_aadhar_seeding": 96.8, "gp_student_attendance_digital": 74.3, "gp_teacher_attendance_digital": 78.6,
+    "gp_head_teacher_primary": 92.4, "gp_head_teacher_upper_primary": 88.7, "gp_vidyanjali_portal": 42.5,
+    "gp_anganwadi_colocated": 58.3, "gp_ptr_primary": 69.8, "gp_principals_secondary": 94.2,
+    "gp_central_fund_release_recurring": 18.5, "gp_central_fund_release_nonrecurring": 24.3,
+    "gp_cyber_safety": 62.7, "gp_internet_pedagogical": 65.8, "gp_state_fund_release": 16.2,
+    "gp_oosc_identified": 87.4, "gp_oosc_mainstreamed": 68.9,
+
+    # Teacher Education & Training indicators (8 indicators)
+    "tet_trained_cwsn_teachers": 68.3,
+    "tet_career_counselling": 72.5,
+    "tet_teacher_aadhar": 98.7,
+    "tet_qualified_preprimary": 87.4,
+    "tet_qualified_primary": 92.5,
+    "tet_qualified_upper_primary": 89.6,
+    "tet_qualified_secondary": 88.7,
+    "tet_qualified_higher_secondary": 85.3
+}
+
+def utc_now() -> datetime:
+    """Current UTC time, stored as a native BSON date (millisecond precision)"""
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def state_document(timestamp: datetime, total_score: float = 543.5, percentage: float = 54.35):
+    """Build the Maharashtra state document"""
+    return {
+        "id": STATE_ID,
+        "name": "Maharashtra",
+        "total_score": total_score,
+        "max_score": 1000,
+        "percentage": percentage,
+        "rank": 14,
+        "districts_count": len(DISTRICTS),
+        "created_at": timestamp
+    }
+
+def metric_document(metric_id: str, metric: str, level: str, entity_id: str, entity_name: str,
+                    value: float, max_value: float, trend: str, domain: str, timestamp: datetime):
+    """Build one metrics document"""
+    return {
+        "id": metric_id,
+        "metric_name": metric,
+        "level": level,
+        "entity_id": entity_id,
+        "entity_name": entity_name,
+        "value": value,
+        "max_value": max_value,
+        "percentage": (value / max_value) * 100,
+        "trend": trend,
+        "domain": domain,
+        "last_updated": timestamp
+    }
+
+def iter_districts(timestamp: datetime):
+    """Yield the district documents"""
+    for i, district in enumerate(DISTRICTS):
+        yield {
+            "id": f"dist_{i+1:03d}",
+            "name": district["name"],
+            "state_id": STATE_ID,
+            "total_score": district["score"],
+            "max_score": 600,
+            "percentage": (district["score"] / 600) * 100,
+            "rank": district["rank"],
+            "blocks_count": district["blocks"],
+            "created_at": timestamp
+        }
+
+def iter_blocks(timestamp: datetime):
+    """Yield the block documents"""
+    for i, district in enumerate(DISTRICTS):
+        for j in range(district["blocks"]):
+            yield {
+                "id": f"block_{i+1:03d}_{j+1:03d}",
+                "name": f"{district['name']} Block {j+1}",
+                "district_id": f"dist_{i+1:03d}",
+                "state_id": STATE_ID,
+                "schools_count": 15 + (j * 3),
+                "performance_score": 70 + (j * 2.5),
+                "created_at": timestamp
+            }
+
+def iter_schools(timestamp: datetime):
+    """Yield the school documents"""
+    for i, district in enumerate(DISTRICTS):
+        for j in range(district["blocks"]):
+            for k in range(15 + (j * 3)):
+                yield {
+                    "id": f"school_{i+1:03d}_{j+1:03d}_{k+1:03d}",
+                    "name": f"{district['name']} School {k+1}",
+                    "block_id": f"block_{i+1:03d}_{j+1:03d}",
+                    "district_id": f"dist_{i+1:03d}",
+                    "state_id": STATE_ID,
+                    "student_count": 200 + (k * 15),
+                    "teacher_count": 12 + k,
+                    "infrastructure_score": 65 + (k * 1.5),
+                    "created_at": timestamp
+                }
+
+def iter_metrics(timestamp: datetime):
+    """Yield the metrics documents for blocks and schools of the first districts, the state and all districts"""
+    for i, district in enumerate(DISTRICTS[:METRIC_DISTRICT_COUNT]):
+        for j in range(district["blocks"]):
+            block_id = f"block_{i+1:03d}_{j+1:03d}"
+            for domain, data in METRIC_DOMAINS.items():
+                domain_slug = domain.lower().replace(' ', '_')
+                for idx, metric in enumerate(data["metrics"]):
+                    # Slightly vary the values from district level based on block
+                    block_value = data["state_values"][idx] * (0.80 + (hash(f"{block_id}_{metric}") % 35) / 100)
+                    yield metric_document(
+                        f"metric_block_{i+1:03d}_{j+1:03d}_{domain_slug}_{idx}", metric, "block", block_id,
+                        f"{district['name']} Block {j+1}", block_value, data["max_values"][idx],
+                        TRENDS[(idx + j) % 3], domain, timestamp
+                    )
+
+            for k in range(15 + (j * 3)):
+                school_id = f"school_{i+1:03d}_{j+1:03d}_{k+1:03d}"
+                for domain, data in METRIC_DOMAINS.items():
+                    domain_slug = domain.lower().replace(' ', '_')
+                    for idx, metric in enumerate(data["metrics"]):
+                        # Vary the values based on school
+                        school_value = data["state_values"][idx] * (0.75 + (hash(f"{school_id}_{metric}") % 40) / 100)
+                        yield metric_document(
+                            f"metric_school_{i+1:03d}_{j+1:03d}_{k+1:03d}_{domain_slug}_{idx}", metric, "school",
+                            school_id, f"{district['name']} School {k+1}", school_value, data["max_values"][idx],
+                            TRENDS[(idx + k) % 3], domain, timestamp
+                        )
+
+    for domain, data in METRIC_DOMAINS.items():
+        for i, metric in enumerate(data["metrics"]):
+            yield metric_document(
+                f"metric_{domain.lower().replace(' ', '_')}_{i}", metric, "state", STATE_ID, "Maharashtra",
+                data["state_values"][i], data["max_values"][i], TRENDS[i % 3], domain, timestamp
+            )
+
+    for dist_idx, district in enumerate(DISTRICTS):
+        for domain, data in METRIC_DOMAINS.items():
+            for i, metric in enumerate(data["metrics"]):
+                # Vary the values based on district performance tier
+                district_value = data["state_values"][i] * (0.85 + (hash(f"dist_{dist_idx+1:03d}_{metric}") % 25) / 100)
+                yield metric_document(
+                    f"metric_district_{dist_idx+1:03d}_{domain.lower().replace(' ', '_')}_{i}", metric, "district",
+                    f"dist_{dist_idx+1:03d}", district["name"], district_value, data["max_values"][i],
+                    TRENDS[(i + dist_idx) % 3], domain, timestamp
+                )
+
+def indicator_score_document(level: str, entity_id: str, indicator_key: str, achieved_pct: float,
+                             timestamp: datetime = None):
+    """Build the pgi_indicator_scores document for one indicator of an entity"""
+    indicator_info = PGI_INDICATORS[indicator_key]
+    return {
+        "id": f"{entity_id}_{indicator_key}",
+        "indicator_key": indicator_key,
+        "indicator_name": indicator_info["name"],
+        "domain": indicator_info["domain"],
+        "achieved_value": achieved_pct,
+        "target_value": indicator_info["target"],
+        "percentage": achieved_pct,
+        "unit": indicator_info["unit"],
+        "level": level,
+        "entity_id": entity_id,
+        "last_updated": timestamp or utc_now()
+    }
+
+def iter_state_indicator_scores(timestamp: datetime):
+    """Yield the Maharashtra PGI indicator score documents"""
+    for indicator_key, achieved_pct in STATE_INDICATOR_SCORES.items():
+        if indicator_key in PGI_INDICATORS:
+            yield indicator_score_document("state", STATE_ID, indicator_key, achieved_pct, timestamp)
+
+def sample_data_streams(timestamp: datetime):
+    """Document streams of the sample dataset, by collection name (the state document is seeded separately)"""
+    return {
+        "districts": iter_districts(timestamp),
+        "blocks": iter_blocks(timestamp),
+        "schools": iter_schools(timestamp),
+        "metrics": iter_metrics(timestamp),
+        "pgi_indicator_scores": iter_state_indicator_scores(timestamp)
+    }
+
+async def bulk_insert(collection, documents, batch_size: int = SEED_BATCH_SIZE) -> int:
+    """
+    Write a document stream with unordered insert_many batches.
+    Documents that already exist (duplicate key) are skipped so a partial seed can be resumed.
+    Returns the number of documents written.
+    """
+    written = 0
+    documents = iter(documents)
+    while True:
+        batch = list(islice(documents, batch_size))
+        if not batch:
+            return written
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+            written += len(result.inserted_ids)
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            written += e.details["nInserted"]
+
+async def seed_collections(db, streams: dict, batch_size: int = SEED_BATCH_SIZE) -> dict:
+    """
+    Fill several collections concurrently from {collection name: document stream}.
+    Prints and returns rows written and rows/sec per collection and overall.
+    """
+    async def seed_one(collection_name, documents):
+        started = time.perf_counter()
+        rows = await bulk_insert(db[collection_name], documents, batch_size)
+        return collection_name, rows, time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(seed_one(name, documents) for name, documents in streams.items()))
+    elapsed = time.perf_counter() - started
+
+    stats = {"collections": {}, "batch_size": batch_size}
+    for collection_name, rows, seconds in results:
+        stats["collections"][collection_name] = {
+            "rows": rows,
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else 0
+        }
+        print(f"Seeded {collection_name}: {rows} rows in {seconds:.2f}s ({stats['collections'][collection_name]['rows_per_sec']} rows/sec)")
+
+    total_rows = sum(rows for _, rows, _ in results)
+    stats["rows"] = total_rows
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(total_rows / elapsed, 1) if elapsed > 0 else 0
+    print(f"Seeded {total_rows} rows in {elapsed:.2f}s ({stats['rows_per_sec']} rows/sec, batch size {batch_size})")
+    return stats
\ No newline at end of file
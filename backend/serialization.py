@@ -0,0 +1,58 @@
+"""
+Response serialization
+Per-collection knowledge of date fields and an orjson-backed JSON response, so
+documents go from Motor to the wire without per-field scanning or a second
+encoding pass.
+"""
+
+from datetime import datetime, timezone
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# Date fields of each collection; every other field is passed through untouched
+COLLECTION_DATE_FIELDS = {
+    "states": ("created_at", "last_calculated"),
+    "districts": ("created_at", "last_calculated"),
+    "blocks": ("created_at", "last_calculated"),
+    "schools": ("created_at", "last_calculated"),
+    "metrics": ("last_updated",),
+    "insights": ("generated_at",),
+    "pgi_indicator_scores": ("last_updated",),
+    "pgi_scores": ("calculation_date", "last_calculated"),
+}
+
+# Projection that keeps Mongo's _id out of API documents
+NO_ID_PROJECTION = {"_id": 0}
+
+def from_mongo(collection_name: str, document):
+    """
+    Prepare a document read with NO_ID_PROJECTION for the API.
+    Only the collection's known date fields are inspected: datetimes come back
+    from Mongo without tzinfo and are marked as UTC; ISO strings are kept.
+    """
+    if document is None:
+        return None
+    document.pop("_id", None)
+    for field in COLLECTION_DATE_FIELDS.get(collection_name, ()):
+        value = document.get(field)
+        if isinstance(value, datetime) and value.tzinfo is None:
+            document[field] = value.replace(tzinfo=timezone.utc)
+    return document
+
+def from_mongo_many(collection_name: str, documents):
+    """from_mongo for a list of documents"""
+    return [from_mongo(collection_name, document) for document in documents]
+
+def json_default(value):
+    """Fallback for types orjson does not handle natively (ObjectId, Decimal128, ...)"""
+    return str(value)
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (datetimes as RFC 3339, NaN as null)"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
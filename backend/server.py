@@ -1,29 +1,56 @@
 import os
 import uuid
-import json
-from datetime import datetime, timezone
+import io
+import hashlib
+import csv
+import asyncio
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict, Any
 from dotenv import load_dotenv
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
 # Removed emergentintegrations dependency - using fallback insights generation
 from pgi_framework import (
     PGI_DOMAINS, 
     PGI_INDICATORS, 
     get_indicators_for_domain,
     get_indicators_for_level,
+    get_indicators_for_domain_and_level,
     calculate_domain_score,
     calculate_total_pgi_score
 )
+from pgi_engine import LOWER_IS_BETTER_UNITS, PGI_ENGINE
+from db_indexes import ensure_indexes, verify_indexes
+from migrate_dates import migrate_dates
+from cache import DATA_VERSIONS, PGI_SCORE_CACHE
+from jobs import JOB_QUEUE
+from hierarchy import CHILD_LEVELS, ENTITY_PROJECTION, HIERARCHY, LEVEL_COLLECTIONS, LEVELS, PARENT_LEVELS
+from insight_engine import PRECOMPUTE_LEVELS, classify_metric, precompute_insights
+from serialization import NO_ID_PROJECTION, FastJSONResponse, dumps, from_mongo, from_mongo_many
+from pagination import NEXT_CURSOR_HEADER, PAGE_SIZE_MAX, find_page, parse_fields
+from score_history import HISTORY_BUCKETS, HISTORY_COLLECTION, ensure_history_collection, record_scores, score_history
+from seed_data import (
+    STATE_INDICATOR_SCORES,
+    bulk_insert,
+    indicator_score_document,
+    sample_data_streams,
+    seed_collections,
+    state_document,
+    utc_now
+)
 
 # Load environment variables
 load_dotenv()
 
 # App initialization
-app = FastAPI(title="Maharashtra Education Dashboard API")
+app = FastAPI(title="Maharashtra Education Dashboard API", default_response_class=FastJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -32,14 +59,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Compress responses larger than GZIP_MINIMUM_SIZE bytes for clients sending Accept-Encoding: gzip
+GZIP_MINIMUM_SIZE = int(os.environ.get("GZIP_MINIMUM_SIZE", "1024"))
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 # Database connection
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "maharashtra_education")
 # Removed EMERGENT_LLM_KEY - no longer using Emergent services
 
-client = AsyncIOMotorClient(MONGO_URL)
+# Dates are stored as native BSON dates and read back as UTC-aware datetimes
+client = AsyncIOMotorClient(MONGO_URL, tz_aware=True)
 db = client[DB_NAME]
 
 # Pydantic models
@@ -64,6 +97,11 @@ class IndicatorDrilldownRequest(BaseModel):
     indicator_code: str
     domain_name: str
 
+class BatchEntitiesRequest(BaseModel):
+    level: str
+    # Bounded like a page, so one request cannot ask for an entire level (422 above the cap)
+    entity_ids: List[str] = Field(max_length=PAGE_SIZE_MAX)
+
 class MetricData(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     metric_name: str
@@ -136,64 +174,500 @@ class PGIScore(BaseModel):
     last_calculated: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Helper functions
-def prepare_for_mongo(data):
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.isoformat()
-    return data
-
-def parse_from_mongo(item):
-    if isinstance(item, dict):
-        if '_id' in item:
-            del item['_id']
-        for key, value in item.items():
-            if isinstance(value, str) and 'T' in value and 'Z' in value:
-                try:
-                    item[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                except Exception:
-                    pass
-    return item
 
-async def generate_ai_insight(metric_name: str, level: str, entity_name: str, current_value: float, 
-                             max_value: float, trend: str) -> Dict[str, str]:
-    """Generate data-driven insights and recommendations (fallback implementation)"""
-    percentage = (current_value / max_value) * 100 if max_value > 0 else 0
-    state_benchmark = 54.35
-    gap = percentage - state_benchmark
-    gap_abs = abs(gap)
-    
-    # Determine severity based on performance
-    if percentage >= 80:
-        severity = "excellent"
-        insight_text = f"📊 {entity_name} demonstrates strong performance in {metric_name} with {percentage:.1f}% achievement, {gap_abs:.1f}% above state average."
-        recommendation = "🎯 Maintain current performance levels and share best practices with lower-performing entities."
-    elif percentage >= 65:
-        severity = "good"
-        insight_text = f"📊 {entity_name} shows good performance in {metric_name} at {percentage:.1f}%, {gap_abs:.1f}% {'above' if gap > 0 else 'below'} state average."
-        recommendation = "🎯 Focus on incremental improvements to reach excellence. Target 5-10% improvement within 6 months."
-    elif percentage >= 50:
-        severity = "moderate"
-        insight_text = f"📊 {entity_name} has moderate performance in {metric_name} at {percentage:.1f}%, {gap_abs:.1f}% below state average."
-        recommendation = "🎯 Implement targeted interventions and capacity building. Aim for 10-15% improvement within 6-12 months."
-    else:
-        severity = "critical"
-        insight_text = f"📊 {entity_name} shows critical performance gap in {metric_name} at {percentage:.1f}%, {gap_abs:.1f}% below state average."
-        recommendation = "🎯 Immediate intervention required. Deploy focused support, additional resources, and regular monitoring. Target 15-20% improvement within 12 months."
-    
-    # Add trend context
-    if trend == "increasing":
-        insight_text += " Performance trend is improving."
-    elif trend == "decreasing":
-        insight_text += " Performance trend is declining - urgent attention needed."
-    else:
-        insight_text += " Performance trend is stable."
+def get_level_collection(level: str):
+    """Get the Mongo collection for a level, or None for an unknown level"""
+    collection_name = LEVEL_COLLECTIONS.get(level)
+    return db[collection_name] if collection_name else None
+
+def sample_indicator_scores(level: str, entity_id: str) -> Dict[str, float]:
+    """
+    Deterministic demonstration scores for entities that have no stored indicator scores.
+    Derived from a stable digest rather than hash(), which is salted per process, so every
+    worker and restart computes the same values as the ones already in pgi_scores.
+    """
+    return {
+        # Scores between 50-90
+        key: 50 + int.from_bytes(hashlib.blake2b((key + entity_id).encode(), digest_size=8).digest(), "big") % 40
+        for key in get_indicators_for_level(level).keys()
+    }
+
+def build_pgi_response(level: str, entity_id: str, entity_name: str,
+                       indicator_scores: Dict[str, float], pgi_result: Dict) -> Dict:
+    """Build the detailed PGI response with domain and indicator breakdown"""
+    domains_detail = []
+    for domain_key, domain_score_data in pgi_result["domain_breakdown"].items():
+        domain_indicators_list = []
+        domain_indicators = get_indicators_for_domain_and_level(domain_key, level)
+        
+        for ind_key, ind_data in domain_indicators.items():
+            achieved_pct = indicator_scores.get(ind_key, 0)
+            domain_indicators_list.append({
+                "indicator_key": ind_key,
+                "indicator_code": ind_data["code"],
+                "indicator_name": ind_data["name"],
+                "achieved_percentage": round(achieved_pct, 2),
+                "target": ind_data["target"],
+                "unit": ind_data["unit"],
+                "weight_in_domain": ind_data["weight"]
+            })
+        
+        domains_detail.append({
+            "domain_key": domain_key,
+            "domain_name": domain_score_data["name"],
+            "domain_code": domain_score_data["code"],
+            "score": domain_score_data["score"],
+            "max_score": domain_score_data["max_score"],
+            "percentage": domain_score_data["percentage"],
+            "weight": domain_score_data["weight"],
+            "indicators": domain_indicators_list
+        })
     
     return {
-        "insight": insight_text,
-        "recommendation": recommendation,
-        "severity": severity
+        "entity_id": entity_id,
+        "entity_name": entity_name,
+        "level": level,
+        "total_score": pgi_result["total_score"],
+        "max_score": pgi_result["max_score"],
+        "percentage": pgi_result["percentage"],
+        "domains": domains_detail,
+        "calculation_date": utc_now()
+    }
+
+async def group_indicator_scores(level: str, entity_ids: List[str]) -> Dict[str, Dict[str, float]]:
+    """Load indicator scores for many entities with a single query, grouped by entity"""
+    grouped = {entity_id: {} for entity_id in entity_ids}
+    cursor = db.pgi_indicator_scores.find(
+        {"level": level, "entity_id": {"$in": entity_ids}},
+        {"_id": 0, "entity_id": 1, "indicator_key": 1, "percentage": 1}
+    )
+    async for score in cursor:
+        grouped[score["entity_id"]][score["indicator_key"]] = score["percentage"]
+    return grouped
+
+def materialized_indicator_values(document: Dict) -> Dict[str, float]:
+    """{indicator_key: achieved_percentage} of a materialized PGI breakdown"""
+    return {
+        indicator["indicator_key"]: indicator["achieved_percentage"]
+        for domain in document.get("domains", [])
+        for indicator in domain.get("indicators", [])
+    }
+
+async def materialize_pgi_scores(level: str, entities: List[Dict], calculated_at: Optional[datetime] = None) -> List[Dict]:
+    """
+    Compute and persist the PGI breakdown of entities into pgi_scores.
+    
+    The stored documents are what get_pgi_score serves, so this must run whenever
+    an entity's indicator scores change. Calculations and rollups pass calculated_at:
+    it becomes the document's last_calculated where the indicator values differ from
+    the stored ones, while unchanged entities keep their previous last_calculated.
+    """
+    if not entities:
+        return []
+    
+    entity_ids = [entity["id"] for entity in entities]
+    indicator_scores = await group_indicator_scores(level, entity_ids)
+    score_dicts = [
+        indicator_scores[entity_id] or sample_indicator_scores(level, entity_id)
+        for entity_id in entity_ids
+    ]
+    pgi_results = PGI_ENGINE.score_many(score_dicts, max_score=1000)
+    
+    documents = [
+        build_pgi_response(level, entity["id"], entity["name"], scores, pgi_result)
+        for entity, scores, pgi_result in zip(entities, score_dicts, pgi_results)
+    ]
+    if calculated_at is not None:
+        stored = {}
+        async for previous in db.pgi_scores.find(
+            {"level": level, "entity_id": {"$in": entity_ids}},
+            {"_id": 0, "entity_id": 1, "last_calculated": 1,
+             "domains.indicators.indicator_key": 1, "domains.indicators.achieved_percentage": 1}
+        ):
+            stored[previous["entity_id"]] = previous
+        for document in documents:
+            previous = stored.get(document["entity_id"])
+            if previous is None or materialized_indicator_values(previous) != materialized_indicator_values(document):
+                document["last_calculated"] = calculated_at
+            elif previous.get("last_calculated"):
+                document["last_calculated"] = previous["last_calculated"]
+    
+    await db.pgi_scores.bulk_write([
+        ReplaceOne({"level": level, "entity_id": document["entity_id"]}, dict(document), upsert=True)
+        for document in documents
+    ], ordered=False)
+    for entity_id in entity_ids:
+        pgi_score_changed(level, entity_id)
+    await update_rankings(level, entities, documents)
+    return documents
+
+def ranking_value(unit: str, achieved: float) -> float:
+    """
+    Sort value of an indicator reading in pgi_rankings. Readings in "lower is better" units
+    (gaps, delays) are negated, so ascending order puts the worst entities first for every key.
+    """
+    return -achieved if unit in LOWER_IS_BETTER_UNITS else achieved
+
+def indicator_gap(unit: str, achieved: float, target: float) -> float:
+    """Shortfall of a reading against its target in the indicator's direction; positive when the target is missed"""
+    return achieved - target if unit in LOWER_IS_BETTER_UNITS else target - achieved
+
+def ranking_entries(level: str, entity: Dict, document: Dict) -> List[Dict]:
+    """Build the pgi_rankings entries (one per domain and per indicator) of a materialized entity"""
+    # Ancestor ids, outermost first: [state_id, district_id, block_id]
+    scope_ids = [entity[field] for field in ("state_id", "district_id", "block_id") if entity.get(field)]
+    base = {"level": level, "entity_id": entity["id"], "entity_name": entity["name"], "scope_ids": scope_ids}
+    
+    entries = []
+    for domain in document["domains"]:
+        entries.append({
+            **base,
+            "kind": "domain",
+            "key": domain["domain_key"],
+            "value": domain["percentage"],
+            "score": domain["score"],
+            "max_score": domain["max_score"]
+        })
+        for indicator in domain["indicators"]:
+            entries.append({
+                **base,
+                "kind": "indicator",
+                "key": indicator["indicator_key"],
+                "value": ranking_value(indicator["unit"], indicator["achieved_percentage"]),
+                "achieved": indicator["achieved_percentage"]
+            })
+    return entries
+
+async def update_rankings(level: str, entities: List[Dict], documents: List[Dict]):
+    """
+    Write the pgi_rankings entries of freshly materialized entities that differ from the
+    stored ones, then remove the keys they no longer have. Entries are never absent while
+    an entity is rewritten.
+    """
+    stored = {}
+    async for entry in db.pgi_rankings.find(
+        {"level": level, "entity_id": {"$in": [entity["id"] for entity in entities]}}, {"_id": 0}
+    ):
+        stored[(entry["entity_id"], entry["key"])] = entry
+    ranked = {entity_id for entity_id, _ in stored}
+    
+    new_entries = []
+    replaced_entries = []
+    current = set()
+    for entity, document in zip(entities, documents):
+        for entry in ranking_entries(level, entity, document):
+            current.add((entity["id"], entry["key"]))
+            if entity["id"] not in ranked:
+                new_entries.append(entry)
+            elif stored.get((entity["id"], entry["key"])) != entry:
+                replaced_entries.append(entry)
+    
+    # Entities ranked for the first time (the bulk of a full materialization) are plain inserts
+    if new_entries:
+        try:
+            await db.pgi_rankings.insert_many(new_entries, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            # A concurrent materialization inserted these first; overwrite them like any other entry
+            replaced_entries.extend(
+                {field: value for field, value in error["op"].items() if field != "_id"}
+                for error in e.details["writeErrors"]
+            )
+    # Keyed like the level_entity_id_key_unique index, so concurrent writers replace each other's entries
+    if replaced_entries:
+        await db.pgi_rankings.bulk_write([
+            ReplaceOne({"level": level, "entity_id": entry["entity_id"], "key": entry["key"]}, entry, upsert=True)
+            for entry in replaced_entries
+        ], ordered=False)
+    
+    stale = [(entity_id, key) for entity_id, key in stored if (entity_id, key) not in current]
+    if stale:
+        await db.pgi_rankings.delete_many({
+            "level": level,
+            "$or": [{"entity_id": entity_id, "key": key} for entity_id, key in stale]
+        })
+
+# Checkpoint id in the migrations collection of the ranking_value conversion
+RANKING_VALUE_MIGRATION_ID = "ranking_values"
+
+async def migrate_ranking_values():
+    """
+    Convert indicator entries written before ranking_value existed: their value is the raw
+    reading, which ranks "lower is better" indicators best first. Runs once per database.
+    """
+    checkpoint_key = {"id": RANKING_VALUE_MIGRATION_ID, "collection": "pgi_rankings"}
+    if (await db.migrations.find_one(checkpoint_key) or {}).get("completed"):
+        return
+    
+    legacy = {"kind": "indicator", "achieved": {"$exists": False}}
+    lower_is_better_keys = [key for key, indicator in PGI_INDICATORS.items() if indicator.get("unit") in LOWER_IS_BETTER_UNITS]
+    negated = await db.pgi_rankings.update_many(
+        {**legacy, "key": {"$in": lower_is_better_keys}},
+        [{"$set": {"achieved": "$value", "value": {"$multiply": ["$value", -1]}}}]
+    )
+    kept = await db.pgi_rankings.update_many(legacy, [{"$set": {"achieved": "$value"}}])
+    if negated.modified_count or kept.modified_count:
+        print(f"Converted {negated.modified_count + kept.modified_count} pgi_rankings entries to ranking values")
+    await db.migrations.update_one(checkpoint_key, {"$set": {"completed": True}}, upsert=True)
+
+async def get_worst_k(level: str, key: str, k: int, scope_ids: Optional[List[str]] = None,
+                      below: Optional[float] = None) -> List[Dict]:
+    """
+    Get the k worst pgi_rankings entries of a level for a domain or indicator key.
+    
+    scope_ids restricts the result to descendants of any of the given ancestors;
+    below keeps only entries whose value (see ranking_value) is strictly lower than the threshold.
+    """
+    query = {"level": level, "key": key}
+    if scope_ids is not None:
+        if not scope_ids:
+            return []
+        query["scope_ids"] = scope_ids[0] if len(scope_ids) == 1 else {"$in": scope_ids}
+    if below is not None:
+        query["value"] = {"$lt": below}
+    
+    return await db.pgi_rankings.find(query, {"_id": 0}).sort("value", 1).limit(k).to_list(length=k)
+
+async def count_rankings(level: str, key: str, scope_id: str, below: Optional[float] = None) -> int:
+    """Count the pgi_rankings entries of a level under one ancestor, optionally only values (see ranking_value) below a threshold"""
+    query = {"level": level, "key": key, "scope_ids": scope_id}
+    if below is not None:
+        query["value"] = {"$lt": below}
+    return await db.pgi_rankings.count_documents(query)
+
+async def get_entity_names(level: str, entity_ids: List[str]) -> Dict[str, str]:
+    """Get {entity_id: name} for entities of one level from the hierarchy cache"""
+    await HIERARCHY.ensure_loaded(db)
+    return HIERARCHY.names(level, entity_ids)
+
+def pgi_score_changed(level: str, entity_id: str):
+    """Invalidate the cached PGI breakdown of an entity and move its ETag on"""
+    PGI_SCORE_CACHE.invalidate(level, entity_id)
+    DATA_VERSIONS.bump("pgi_score", level, entity_id)
+
+def entities_changed(level: str, entities: List[Dict]):
+    """Move on the ETags of the entity lists containing these entities"""
+    for entity in entities:
+        if level in PARENT_LEVELS:
+            DATA_VERSIONS.bump("entities", level, entity.get(PARENT_LEVELS[level][1]))
+        else:
+            DATA_VERSIONS.bump("entities", level)
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match covers etag (weak comparison, as for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in header.split(","))
+
+def query_variant(request: Request) -> str:
+    """Digest of the request's query parameters in a fixed order; empty without any"""
+    params = sorted(request.query_params.multi_items())
+    if not params:
+        return ""
+    return hashlib.blake2b(repr(params).encode(), digest_size=6).hexdigest()
+
+async def conditional_get(request: Request, scope: tuple, load, extra_headers: Optional[Dict[str, str]] = None):
+    """
+    Serve a read endpoint with an ETag for the current version of scope and the query parameters
+    (limit, cursor, fields, ...) of the request.
+    Clients holding that version get a 304 without load() being run.
+    extra_headers are added to the response after load(), which may fill them in.
+    """
+    # Taken before loading, so a write during the load can only make the tag older than the data
+    etag = DATA_VERSIONS.etag(*scope, variant=query_variant(request))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+    content = await load()
+    return FastJSONResponse(content, headers={**headers, **(extra_headers or {})})
+
+async def get_materialized_pgi_scores(level: str, entity_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Get PGI breakdowns for many entities, materializing any that are missing.
+    Entities that do not exist are left out of the result.
+    Served from PGI_SCORE_CACHE where possible; returned dicts must not be mutated.
+    """
+    materialized = {}
+    generations = {}
+    for entity_id in entity_ids:
+        cached = PGI_SCORE_CACHE.get(level, entity_id)
+        if cached is not None:
+            materialized[entity_id] = cached
+        else:
+            generations[entity_id] = PGI_SCORE_CACHE.generation(level, entity_id)
+    if not generations:
+        return materialized
+    
+    uncached_ids = list(generations)
+    async for document in db.pgi_scores.find({"level": level, "entity_id": {"$in": uncached_ids}}, NO_ID_PROJECTION):
+        document = from_mongo("pgi_scores", document)
+        materialized[document["entity_id"]] = document
+        PGI_SCORE_CACHE.set(level, document["entity_id"], document, generations[document["entity_id"]])
+    
+    missing_ids = [entity_id for entity_id in uncached_ids if entity_id not in materialized]
+    if missing_ids and level in LEVEL_COLLECTIONS:
+        entities = [await HIERARCHY.get(db, level, entity_id) for entity_id in missing_ids]
+        for document in await materialize_pgi_scores(level, [entity for entity in entities if entity]):
+            materialized[document["entity_id"]] = document
+            PGI_SCORE_CACHE.set(level, document["entity_id"], document)
+    
+    return materialized
+
+def invalidate_ancestor_scores(level: str, entity: Dict):
+    """Drop the cached PGI breakdowns of an entity's ancestors after one of their descendants changed"""
+    while level in PARENT_LEVELS:
+        level = PARENT_LEVELS[level][0]
+        if entity.get(f"{level}_id"):
+            pgi_score_changed(level, entity[f"{level}_id"])
+
+# Entities materialized per batch when filling gaps in the store
+MATERIALIZE_BATCH_SIZE = 1000
+
+# Levels whose entities are all known to be in pgi_scores and pgi_rankings
+fully_materialized_levels = set()
+
+async def ensure_materialized(level: str, scope_level: Optional[str] = None, scope_ids: Optional[List[str]] = None):
+    """
+    Make sure every entity of a level, optionally only those under the given
+    ancestors, is materialized so that pgi_rankings answers for all of them.
+    """
+    if level in fully_materialized_levels:
+        return
+    
+    await HIERARCHY.ensure_loaded(db)
+    entities = HIERARCHY.entities(level, scope_level, scope_ids)
+    score_query = {"level": level}
+    if scope_level is not None:
+        score_query["entity_id"] = {"$in": [entity["id"] for entity in entities]}
+    materialized_ids = {
+        document["entity_id"]
+        async for document in db.pgi_scores.find(score_query, {"_id": 0, "entity_id": 1})
     }
+    
+    missing = [entity for entity in entities if entity["id"] not in materialized_ids]
+    for start in range(0, len(missing), MATERIALIZE_BATCH_SIZE):
+        await materialize_pgi_scores(level, missing[start:start + MATERIALIZE_BATCH_SIZE])
+    
+    if scope_level is None:
+        fully_materialized_levels.add(level)
+
+async def materialize_all_levels():
+    """Materialize every entity so that rankings cover the whole state"""
+    try:
+        for level in LEVEL_COLLECTIONS:
+            await ensure_materialized(level)
+        print("PGI scores and rankings materialized for all levels")
+    except Exception as e:
+        print(f"Error materializing PGI scores: {e}")
+
+async def rollup_entities(level: str, parents: List[Dict], weighted: bool = True) -> List[str]:
+    """
+    Recompute the indicator scores of parent entities from their children.
+    
+    Each parent indicator is the mean over the children that have a value for it,
+    weighted by student_count when requested. Parents get the summed student_count
+    of their children so the next level up can be weighted too. Returns the ids of
+    the parents that had scored children.
+    """
+    child_level, parent_field = CHILD_LEVELS[level]
+    parent_ids = [parent["id"] for parent in parents]
+    position = {parent_id: row for row, parent_id in enumerate(parent_ids)}
+    
+    children = await get_level_collection(child_level).find(
+        {parent_field: {"$in": parent_ids}},
+        {"_id": 0, "id": 1, parent_field: 1, "student_count": 1}
+    ).to_list(length=None)
+    child_scores = await group_indicator_scores(child_level, [child["id"] for child in children])
+    scored_children = [child for child in children if child_scores[child["id"]]]
+    
+    student_counts = [0] * len(parents)
+    for child in children:
+        student_counts[position[child[parent_field]]] += child.get("student_count", 0)
+    
+    rolled_up = PGI_ENGINE.rollup_matrix(
+        PGI_ENGINE.to_matrix([child_scores[child["id"]] for child in scored_children]),
+        [position[child[parent_field]] for child in scored_children],
+        len(parents),
+        [child.get("student_count", 0) for child in scored_children] if weighted else None
+    )
+    
+    level_indicators = get_indicators_for_level(level)
+    score_operations = []
+    rolled_up_parents = []
+    parent_scores = {}
+    for row, parent in enumerate(parents):
+        parent_values = {
+            indicator_key: value
+            for indicator_key, value in zip(PGI_ENGINE.indicator_keys, rolled_up[row].tolist())
+            if indicator_key in level_indicators and value == value  # skip NaN
+        }
+        if parent_values:
+            score_operations.extend(
+                UpdateOne(
+                    {"id": f"{parent['id']}_{indicator_key}"},
+                    {"$set": indicator_score_document(level, parent["id"], indicator_key, value)},
+                    upsert=True
+                )
+                for indicator_key, value in parent_values.items()
+            )
+            rolled_up_parents.append(parent)
+            parent_scores[parent["id"]] = parent_values
+    
+    if not rolled_up_parents:
+        return []
+    
+    calculated_at = utc_now()
+    await db.pgi_indicator_scores.bulk_write(score_operations, ordered=False)
+    documents = await materialize_pgi_scores(level, rolled_up_parents, calculated_at)
+    
+    await get_level_collection(level).bulk_write([
+        UpdateOne({"id": document["entity_id"]}, {"$set": {
+            "total_score": document["total_score"],
+            "percentage": document["percentage"],
+            "student_count": student_counts[position[document["entity_id"]]],
+            "last_calculated": calculated_at
+        }})
+        for document in documents
+    ], ordered=False)
+    entities_changed(level, rolled_up_parents)
+    await record_score_history(level, [
+        (document["entity_id"], parent_scores[document["entity_id"]], document) for document in documents
+    ], calculated_at)
+    
+    return [parent["id"] for parent in rolled_up_parents]
+
+# Cleared by startup_db on servers without time-series collections (MongoDB < 5.0)
+history_enabled = True
+
+async def record_score_history(level: str, entity_scores: List[tuple], recorded_at: datetime):
+    """Append (entity_id, indicator values, total) scores to pgi_score_history and move the history ETags on"""
+    if not history_enabled:
+        return
+    await record_scores(db, level, entity_scores, recorded_at)
+    for entity_id, _, _ in entity_scores:
+        DATA_VERSIONS.bump("score_history", level, entity_id)
+
+async def rollup_ancestors(level: str, entity: Dict, weighted: bool = True) -> List[Dict]:
+    """Re-aggregate the ancestor chain of an entity, nearest parent first"""
+    refreshed = []
+    while level in PARENT_LEVELS:
+        parent_level, parent_field = PARENT_LEVELS[level]
+        parent = await HIERARCHY.get(db, parent_level, entity[parent_field]) if entity.get(parent_field) else None
+        if not parent:
+            break
+        if await rollup_entities(parent_level, [parent], weighted):
+            refreshed.append({"level": parent_level, "entity_id": parent["id"]})
+        level, entity = parent_level, parent
+    return refreshed
+
+async def generate_ai_insight(metric_name: str, level: str, entity_name: str, current_value: float, 
+                             max_value: float, trend: str) -> Dict[str, str]:
+    """Generate data-driven insights and recommendations (fallback implementation)"""
+    return classify_metric(metric_name, entity_name, current_value, max_value, trend)
 
 # Initialize sample data
 async def initialize_sample_data():
@@ -205,463 +679,280 @@ async def initialize_sample_data():
         return
     
     print("Initializing sample data...")
+    timestamp = utc_now()
     
-    # State level data
-    state_data = {
-        "id": "mh_001",
-        "name": "Maharashtra",
-        "total_score": 543.5,
-        "max_score": 1000,
-        "percentage": 54.35,
-        "rank": 14,
-        "districts_count": 36,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.states.insert_one(prepare_for_mongo(state_data))
-    
-    # All 36 districts of Maharashtra with realistic performance data
-    districts = [
-        # Tier 1 - Metro/Urban districts (High performance)
-        {"name": "Mumbai City", "score": 485, "rank": 1, "blocks": 8},
-        {"name": "Mumbai Suburban", "score": 465, "rank": 2, "blocks": 10},
-        {"name": "Pune", "score": 445, "rank": 3, "blocks": 15},
-        {"name": "Thane", "score": 430, "rank": 4, "blocks": 12},
-        {"name": "Nashik", "score": 415, "rank": 5, "blocks": 14},
-        {"name": "Nagpur", "score": 410, "rank": 6, "blocks": 13},
-        {"name": "Aurangabad", "score": 395, "rank": 7, "blocks": 11},
-        
-        # Tier 2 - Semi-urban districts (Good performance)
-        {"name": "Kolhapur", "score": 385, "rank": 8, "blocks": 10},
-        {"name": "Solapur", "score": 375, "rank": 9, "blocks": 9},
-        {"name": "Ahmednagar", "score": 370, "rank": 10, "blocks": 12},
-        {"name": "Satara", "score": 365, "rank": 11, "blocks": 11},
-        {"name": "Sangli", "score": 355, "rank": 12, "blocks": 8},
-        {"name": "Latur", "score": 350, "rank": 13, "blocks": 9},
-        {"name": "Osmanabad", "score": 345, "rank": 14, "blocks": 7},
-        {"name": "Jalgaon", "score": 340, "rank": 15, "blocks": 13},
-        {"name": "Dhule", "score": 335, "rank": 16, "blocks": 8},
-        {"name": "Akola", "score": 330, "rank": 17, "blocks": 9},
-        {"name": "Amravati", "score": 325, "rank": 18, "blocks": 12},
-        
-        # Tier 3 - Developing districts (Moderate performance)
-        {"name": "Yavatmal", "score": 320, "rank": 19, "blocks": 11},
-        {"name": "Buldhana", "score": 315, "rank": 20, "blocks": 10},
-        {"name": "Washim", "score": 310, "rank": 21, "blocks": 6},
-        {"name": "Hingoli", "score": 305, "rank": 22, "blocks": 5},
-        {"name": "Parbhani", "score": 300, "rank": 23, "blocks": 8},
-        {"name": "Jalna", "score": 295, "rank": 24, "blocks": 7},
-        {"name": "Beed", "score": 290, "rank": 25, "blocks": 9},
-        {"name": "Raigad", "score": 285, "rank": 26, "blocks": 10},
-        {"name": "Ratnagiri", "score": 280, "rank": 27, "blocks": 8},
-        {"name": "Sindhudurg", "score": 275, "rank": 28, "blocks": 7},
-        
-        # Tier 4 - Emerging districts (Needs focused attention)
-        {"name": "Chandrapur", "score": 270, "rank": 29, "blocks": 12},
-        {"name": "Wardha", "score": 265, "rank": 30, "blocks": 7},
-        {"name": "Gondia", "score": 260, "rank": 31, "blocks": 8},
-        {"name": "Bhandara", "score": 255, "rank": 32, "blocks": 6},
-        {"name": "Gadchiroli", "score": 250, "rank": 33, "blocks": 9},
-        {"name": "Nandurbar", "score": 245, "rank": 34, "blocks": 6},
-        {"name": "Palghar", "score": 240, "rank": 35, "blocks": 8},
-        {"name": "Usmanabad", "score": 235, "rank": 36, "blocks": 7}
-    ]
-    
-    # Define domains structure (will be used for metrics generation)
-    domains = {
-        "Learning Outcomes": {
-            "metrics": ["Grade Proficiency", "FLN Achievement", "NAS Performance", "Conceptual Understanding"],
-            "state_values": [65.8, 58.2, 62.1, 70.4],
-            "max_values": [240, 60, 80, 100]
-        },
-        "Infrastructure": {
-            "metrics": ["Basic Facilities", "Digital Infrastructure", "Classroom Adequacy", "Laboratory Facilities"],
-            "state_values": [90.1, 75.3, 82.6, 68.9],
-            "max_values": [190, 50, 60, 40]
-        },
-        "Governance": {
-            "metrics": ["VSK Utilization", "Digital Attendance", "Fund Flow Efficiency", "Policy Implementation"],
-            "state_values": [49.7, 45.2, 52.8, 48.1],
-            "max_values": [130, 30, 35, 35]
-        },
-        "Teachers Education": {
-            "metrics": ["Teacher Qualification", "Professional Development", "Student-Teacher Ratio", "Training Effectiveness"],
-            "state_values": [76.6, 78.2, 74.1, 79.5],
-            "max_values": [100, 25, 25, 30]
-        },
-        "Access": {
-            "metrics": ["Net Enrollment Ratio", "Gross Enrollment Ratio", "Retention Rates", "OOSC Enrollment"],
-            "state_values": [65.5, 68.9, 72.3, 58.7],
-            "max_values": [80, 20, 25, 15]
-        },
-        "Equity": {
-            "metrics": ["Gender Parity", "Social Category Performance", "CWSN Inclusion", "Rural-Urban Equity"],
-            "state_values": [234.3, 89.2, 85.6, 91.7],
-            "max_values": [260, 65, 60, 75]
-        }
-    }
-    
-    for i, district in enumerate(districts):
-        district_data = {
-            "id": f"dist_{i+1:03d}",
-            "name": district["name"],
-            "state_id": "mh_001",
-            "total_score": district["score"],
-            "max_score": 600,
-            "percentage": (district["score"] / 600) * 100,
-            "rank": district["rank"],
-            "blocks_count": district["blocks"],
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
-        await db.districts.insert_one(prepare_for_mongo(district_data))
-        
-        # Create blocks for each district
-        for j in range(district["blocks"]):
-            block_data = {
-                "id": f"block_{i+1:03d}_{j+1:03d}",
-                "name": f"{district['name']} Block {j+1}",
-                "district_id": f"dist_{i+1:03d}",
-                "state_id": "mh_001",
-                "schools_count": 15 + (j * 3),
-                "performance_score": 70 + (j * 2.5),
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-            await db.blocks.insert_one(prepare_for_mongo(block_data))
-            
-            # Create metrics for all blocks of first 10 districts (for demo purposes)
-            if i < 10:
-                for domain, data in domains.items():
-                    for idx, metric in enumerate(data["metrics"]):
-                        # Slightly vary the values from district level based on block
-                        block_value = data["state_values"][idx] * (0.80 + (hash(f"block_{i+1:03d}_{j+1:03d}_{metric}") % 35) / 100)
-                        metric_data = {
-                            "id": f"metric_block_{i+1:03d}_{j+1:03d}_{domain.lower().replace(' ', '_')}_{idx}",
-                            "metric_name": metric,
-                            "level": "block",
-                            "entity_id": f"block_{i+1:03d}_{j+1:03d}",
-                            "entity_name": f"{district['name']} Block {j+1}",
-                            "value": block_value,
-                            "max_value": data["max_values"][idx],
-                            "percentage": (block_value / data["max_values"][idx]) * 100,
-                            "trend": ["increasing", "stable", "decreasing"][(idx + j) % 3],
-                            "domain": domain,
-                            "last_updated": datetime.now(timezone.utc).isoformat()
-                        }
-                        await db.metrics.insert_one(prepare_for_mongo(metric_data))
-            
-            # Create schools for each block
-            for k in range(block_data["schools_count"]):
-                school_data = {
-                    "id": f"school_{i+1:03d}_{j+1:03d}_{k+1:03d}",
-                    "name": f"{district['name']} School {k+1}",
-                    "block_id": f"block_{i+1:03d}_{j+1:03d}",
-                    "district_id": f"dist_{i+1:03d}",
-                    "state_id": "mh_001",
-                    "student_count": 200 + (k * 15),
-                    "teacher_count": 12 + k,
-                    "infrastructure_score": 65 + (k * 1.5),
-                    "created_at": datetime.now(timezone.utc).isoformat()
-                }
-                await db.schools.insert_one(prepare_for_mongo(school_data))
-                
-                # Create metrics for schools in blocks that have metrics (first 10 districts)
-                if i < 10:
-                    for domain, data in domains.items():
-                        for idx, metric in enumerate(data["metrics"]):
-                            # Vary the values based on school
-                            school_value = data["state_values"][idx] * (0.75 + (hash(f"school_{i+1:03d}_{j+1:03d}_{k+1:03d}_{metric}") % 40) / 100)
-                            metric_data = {
-                                "id": f"metric_school_{i+1:03d}_{j+1:03d}_{k+1:03d}_{domain.lower().replace(' ', '_')}_{idx}",
-                                "metric_name": metric,
-                                "level": "school",
-                                "entity_id": f"school_{i+1:03d}_{j+1:03d}_{k+1:03d}",
-                                "entity_name": f"{district['name']} School {k+1}",
-                                "value": school_value,
-                                "max_value": data["max_values"][idx],
-                                "percentage": (school_value / data["max_values"][idx]) * 100,
-                                "trend": ["increasing", "stable", "decreasing"][(idx + k) % 3],
-                                "domain": domain,
-                                "last_updated": datetime.now(timezone.utc).isoformat()
-                            }
-                            await db.metrics.insert_one(prepare_for_mongo(metric_data))
-    
-    # Insert metrics data
-    for domain, data in domains.items():
-        for i, metric in enumerate(data["metrics"]):
-            metric_data = {
-                "id": f"metric_{domain.lower().replace(' ', '_')}_{i}",
-                "metric_name": metric,
-                "level": "state",
-                "entity_id": "mh_001",
-                "entity_name": "Maharashtra",
-                "value": data["state_values"][i],
-                "max_value": data["max_values"][i],
-                "percentage": (data["state_values"][i] / data["max_values"][i]) * 100,
-                "trend": ["increasing", "stable", "decreasing"][i % 3],
-                "domain": domain,
-                "last_updated": datetime.now(timezone.utc).isoformat()
-            }
-            await db.metrics.insert_one(prepare_for_mongo(metric_data))
-    
-    # Insert metrics data for ALL districts
-    for dist_idx, district in enumerate(districts):
-        for domain, data in domains.items():
-            for i, metric in enumerate(data["metrics"]):
-                # Vary the values based on district performance tier
-                district_value = data["state_values"][i] * (0.85 + (hash(f"dist_{dist_idx+1:03d}_{metric}") % 25) / 100)
-                metric_data = {
-                    "id": f"metric_district_{dist_idx+1:03d}_{domain.lower().replace(' ', '_')}_{i}",
-                    "metric_name": metric,
-                    "level": "district",
-                    "entity_id": f"dist_{dist_idx+1:03d}",
-                    "entity_name": district["name"],
-                    "value": district_value,
-                    "max_value": data["max_values"][i],
-                    "percentage": (district_value / data["max_values"][i]) * 100,
-                    "trend": ["increasing", "stable", "decreasing"][(i + dist_idx) % 3],
-                    "domain": domain,
-                    "last_updated": datetime.now(timezone.utc).isoformat()
-                }
-                await db.metrics.insert_one(prepare_for_mongo(metric_data))
-    
+    # Districts, blocks, schools, metrics and indicator scores are written concurrently in batches
+    await seed_collections(db, sample_data_streams(timestamp))
     print(f"Metrics initialized for state, all 36 districts, all blocks of first 10 districts, and all schools in those blocks")
     
-    # Initialize PGI indicator scores for state level
-    print("Initializing PGI indicator scores for Maharashtra...")
-    state_indicator_scores = {
-        # Learning Outcomes indicators (12 indicators)
-        "lo_language_class3": 58.3,
-        "lo_math_class3": 55.7,
-        "lo_language_class5": 61.7,
-        "lo_math_class5": 58.3,
-        "lo_language_class8": 64.5,
-        "lo_math_class8": 62.8,
-        "lo_science_class8": 60.4,
-        "lo_social_class8": 59.2,
-        "lo_language_class10": 66.8,
-        "lo_math_class10": 68.5,
-        "lo_science_class10": 65.2,
-        "lo_social_class10": 63.9,
-        
-        # Access indicators (8 indicators)
-        "adjusted_ner_secondary": 82.3,
-        "ner_higher_secondary": 68.5,
-        "retention_rate_primary": 91.2,
-        "retention_rate_upper_primary": 88.7,
-        "retention_rate_secondary": 84.7,
-        "completion_rate_secondary": 78.9,
-        "completion_rate_higher_secondary": 72.4,
-        "participation_rate_pre_primary": 76.8,
-        
-        # Infrastructure & Facilities indicators (24 indicators)
-        "inf_ict_lab": 72.5,
-        "inf_smart_classes": 42.5,
-        "inf_integrated_science_lab": 71.6,
-        "inf_separate_science_lab_hs": 68.3,
-        "inf_cocurricular_rooms": 54.8,
-        "inf_library_basic": 89.3,
-        "inf_library_separate_room": 67.2,
-        "inf_prevocational_exposure": 38.5,
-        "inf_nsqf_vocational": 28.7,
-        "inf_vocational_placement_class10": 52.3,
-        "inf_vocational_placement_class12": 58.9,
-        "inf_vocational_selfemployed_class10": 18.4,
-        "inf_vocational_selfemployed_class12": 24.6,
-        "inf_midday_meal": 92.8,
-        "inf_pm_poshan_audit": 87.5,
-        "inf_health_checkup": 94.2,
-        "inf_sanitary_pad_vending": 76.4,
-        "inf_functional_incinerator": 68.9,
-        "inf_free_textbook": 96.8,
-        "inf_balavatika": 58.3,
-        "inf_kitchen_garden": 74.2,
-        "inf_rainwater_harvesting": 62.7,
-        "inf_drinking_water": 98.5,
-        "inf_solar_panel": 34.6,
-        
-        # Equity indicators (44 indicators - equity gaps and facilities)
-        # SC vs General gaps (8 indicators)
-        "eq_sc_lang_class3": 6.5, "eq_sc_lang_class5": 7.2, "eq_sc_lang_class8": 8.1, "eq_sc_lang_class10": 8.5,
-        "eq_sc_math_class3": 7.3, "eq_sc_math_class5": 8.4, "eq_sc_math_class8": 9.2, "eq_sc_math_class10": 9.8,
-        # ST vs General gaps (8 indicators)
-        "eq_st_lang_class3": 8.2, "eq_st_lang_class5": 9.1, "eq_st_lang_class8": 10.3, "eq_st_lang_class10": 11.2,
-        "eq_st_math_class3": 9.5, "eq_st_math_class5": 10.8, "eq_st_math_class8": 12.1, "eq_st_math_class10": 13.5,
-        # Urban vs Rural gaps (8 indicators)
-        "eq_urban_rural_lang_class3": 9.2, "eq_urban_rural_lang_class5": 10.5, "eq_urban_rural_lang_class8": 11.8, "eq_urban_rural_lang_class10": 12.3,
-        "eq_urban_rural_math_class3": 10.1, "eq_urban_rural_math_class5": 11.4, "eq_urban_rural_math_class8": 12.7, "eq_urban_rural_math_class10": 13.2,
-        # Boys vs Girls gaps (8 indicators)
-        "eq_gender_lang_class3": 2.1, "eq_gender_lang_class5": 2.5, "eq_gender_lang_class8": 2.9, "eq_gender_lang_class10": 3.2,
-        "eq_gender_math_class3": 2.8, "eq_gender_math_class5": 3.4, "eq_gender_math_class8": 3.9, "eq_gender_math_class10": 4.2,
-        # Examination Result gaps (4 indicators)
-        "eq_sc_exam_class10": 8.7, "eq_st_exam_class10": 11.5, "eq_sc_exam_class12": 9.2, "eq_st_exam_class12": 12.3,
-        # Transition Rate gaps (2 indicators)
-        "eq_gender_transition": 2.8, "eq_minority_transition": 4.5,
-        # Facilities (6 indicators)
-        "eq_cwsn_assistive_tech": 56.9, "eq_cwsn_aids_appliances": 72.4, "eq_cwsn_ramp": 78.5, 
-        "eq_cwsn_toilets": 68.3, "eq_boys_toilets": 94.2, "eq_girls_toilets": 92.8,
-        
-        # Governance Processes indicators (16 indicators)
-        "gp_aadhar_seeding": 96.8, "gp_student_attendance_digital": 74.3, "gp_teacher_attendance_digital": 78.6,
-        "gp_head_teacher_primary": 92.4, "gp_head_teacher_upper_primary": 88.7, "gp_vidyanjali_portal": 42.5,
-        "gp_anganwadi_colocated": 58.3, "gp_ptr_primary": 69.8, "gp_principals_secondary": 94.2,
-        "gp_central_fund_release_recurring": 18.5, "gp_central_fund_release_nonrecurring": 24.3,
-        "gp_cyber_safety": 62.7, "gp_internet_pedagogical": 65.8, "gp_state_fund_release": 16.2,
-        "gp_oosc_identified": 87.4, "gp_oosc_mainstreamed": 68.9,
-        
-        # Teacher Education & Training indicators (8 indicators)
-        "tet_trained_cwsn_teachers": 68.3,
-        "tet_career_counselling": 72.5,
-        "tet_teacher_aadhar": 98.7,
-        "tet_qualified_preprimary": 87.4,
-        "tet_qualified_primary": 92.5,
-        "tet_qualified_upper_primary": 89.6,
-        "tet_qualified_secondary": 88.7,
-        "tet_qualified_higher_secondary": 85.3
-    }
-    
-    # Store state-level PGI indicator scores
-    for indicator_key, achieved_pct in state_indicator_scores.items():
-        if indicator_key in PGI_INDICATORS:
-            indicator_info = PGI_INDICATORS[indicator_key]
-            score_data = {
-                "id": f"mh_001_{indicator_key}",
-                "indicator_key": indicator_key,
-                "indicator_name": indicator_info["name"],
-                "domain": indicator_info["domain"],
-                "achieved_value": achieved_pct,
-                "target_value": indicator_info["target"],
-                "percentage": achieved_pct,
-                "unit": indicator_info["unit"],
-                "level": "state",
-                "entity_id": "mh_001",
-                "last_updated": datetime.now(timezone.utc).isoformat()
-            }
-            await db.pgi_indicator_scores.insert_one(prepare_for_mongo(score_data))
-    
-    # Calculate and update state PGI score
-    pgi_result = calculate_total_pgi_score(state_indicator_scores, max_score=1000)
-    await db.states.update_one(
-        {"id": "mh_001"},
-        {"$set": {
-            "total_score": pgi_result["total_score"],
-            "percentage": pgi_result["percentage"]
-        }}
-    )
+    # The state document goes in last: its presence marks the seed as complete
+    pgi_result = calculate_total_pgi_score(STATE_INDICATOR_SCORES, max_score=1000)
+    await db.states.insert_one(state_document(timestamp, pgi_result["total_score"], pgi_result["percentage"]))
     
     print(f"PGI Framework initialized. Maharashtra PGI Score: {pgi_result['total_score']}/1000 ({pgi_result['percentage']}%)")
     print("Sample data initialization completed")
+    HIERARCHY.clear()
+    start_insight_precompute()
+
+def start_insight_precompute(levels=PRECOMPUTE_LEVELS, resume: bool = False) -> dict:
+    """Queue statewide insight precomputation; returns the job"""
+    def insights_written(level, entity_ids):
+        for entity_id in entity_ids:
+            DATA_VERSIONS.bump("insights", level, entity_id)
+    
+    async def precompute_task(report):
+        await precompute_insights(db, levels, resume=resume, report=report, on_write=insights_written)
+    
+    return JOB_QUEUE.submit("precompute_insights", tuple(levels), precompute_task)
+
+# Background materialization of PGI scores and rankings
+materialization_task = None
+
+def dataset_replaced():
+    """Drop every in-process cache of the dataset after it was replaced wholesale"""
+    fully_materialized_levels.clear()
+    PGI_SCORE_CACHE.clear()
+    DATA_VERSIONS.bump_all()
+    HIERARCHY.clear()
+
+def start_materialization():
+    """Materialize all levels in the background so startup is not blocked"""
+    global materialization_task
+    if materialization_task and not materialization_task.done():
+        materialization_task.cancel()
+    fully_materialized_levels.clear()
+    materialization_task = asyncio.create_task(materialize_all_levels())
+
+@app.middleware("http")
+async def sync_external_writes(request: Request, call_next):
+    """
+    Drop the in-process caches once a CLI or import has marked the dataset as changed,
+    or entities were added or removed without that mark (e.g. by mongoimport)
+    """
+    if await DATA_VERSIONS.dataset_changed(db) or await HIERARCHY.changed_in(db):
+        print("Dataset changed outside the server, dropping cached data")
+        dataset_replaced()
+    return await call_next(request)
 
 # API Endpoints
 @app.on_event("startup")
 async def startup_db():
+    global history_enabled
+    # Time-series collections have to exist before their indexes are built; without them
+    # history is disabled and the rest of the API runs as usual
+    history_enabled = await ensure_history_collection(db)
+    disabled_collections = () if history_enabled else (HISTORY_COLLECTION,)
+    await ensure_indexes(db, disabled_collections)
+    missing_indexes = await verify_indexes(db, disabled_collections)
+    if missing_indexes:
+        print(f"WARNING: missing MongoDB indexes: {missing_indexes}")
+    # Resumable; a no-op once every collection is checkpointed as completed
+    await migrate_dates(db)
+    await migrate_ranking_values()
     await initialize_sample_data()
+    await HIERARCHY.load(db)
+    # Baseline for sync_external_writes
+    await DATA_VERSIONS.dataset_changed(db)
+    start_materialization()
 
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now(timezone.utc)}
 
 @app.get("/api/states", response_model=List[Dict])
-async def get_states():
+async def get_states(request: Request):
     """Get all states"""
-    states = await db.states.find().to_list(length=None)
-    return [parse_from_mongo(state) for state in states]
+    async def load():
+        states = await db.states.find({}, NO_ID_PROJECTION).to_list(length=None)
+        return from_mongo_many("states", states)
+    return await conditional_get(request, ("entities", "state"), load)
 
 @app.get("/api/states/{state_id}/districts", response_model=List[Dict])
-async def get_districts(state_id: str):
+async def get_districts(state_id: str, request: Request):
     """Get all districts in a state"""
-    districts = await db.districts.find({"state_id": state_id}).to_list(length=None)
-    return [parse_from_mongo(district) for district in districts]
+    async def load():
+        districts = await db.districts.find({"state_id": state_id}, NO_ID_PROJECTION).to_list(length=None)
+        return from_mongo_many("districts", districts)
+    return await conditional_get(request, ("entities", "district", state_id), load)
 
 @app.get("/api/districts/{district_id}/blocks", response_model=List[Dict])
-async def get_blocks(district_id: str):
-    """Get all blocks in a district"""
-    blocks = await db.blocks.find({"district_id": district_id}).to_list(length=None)
-    return [parse_from_mongo(block) for block in blocks]
+async def get_blocks(district_id: str, request: Request, limit: Optional[int] = None, cursor: Optional[str] = None,
+                     sort: str = "id", fields: Optional[str] = None):
+    """
+    Get the blocks in a district
+    
+    With limit, one page in sort order (id or percentage); the next page's cursor is in X-Next-Cursor.
+    fields=id,name,... returns only those fields.
+    """
+    page_headers = {}
+    async def load():
+        blocks, next_cursor = await find_page(db, "blocks", {"district_id": district_id}, limit, cursor, sort, fields)
+        if next_cursor:
+            page_headers[NEXT_CURSOR_HEADER] = next_cursor
+        return blocks
+    return await conditional_get(request, ("entities", "block", district_id), load, page_headers)
 
 @app.get("/api/blocks/{block_id}/schools", response_model=List[Dict])
-async def get_schools(block_id: str):
-    """Get all schools in a block"""
-    schools = await db.schools.find({"block_id": block_id}).to_list(length=None)
-    return [parse_from_mongo(school) for school in schools]
+async def get_schools(block_id: str, request: Request, limit: Optional[int] = None, cursor: Optional[str] = None,
+                      sort: str = "id", fields: Optional[str] = None):
+    """
+    Get the schools in a block
+    
+    With limit, one page in sort order (id or percentage); the next page's cursor is in X-Next-Cursor.
+    fields=id,name,... returns only those fields.
+    """
+    page_headers = {}
+    async def load():
+        schools, next_cursor = await find_page(db, "schools", {"block_id": block_id}, limit, cursor, sort, fields)
+        if next_cursor:
+            page_headers[NEXT_CURSOR_HEADER] = next_cursor
+        return schools
+    return await conditional_get(request, ("entities", "school", block_id), load, page_headers)
 
 @app.get("/api/schools/{school_id}")
 async def get_school_by_id(school_id: str):
     """Get school data directly by school ID"""
-    school = await db.schools.find_one({"id": school_id})
+    school = await db.schools.find_one({"id": school_id}, NO_ID_PROJECTION)
     if not school:
         raise HTTPException(status_code=404, detail=f"School not found: {school_id}")
-    return parse_from_mongo(school)
+    return from_mongo("schools", school)
 
 @app.get("/api/districts/{district_id}")
 async def get_district_by_id(district_id: str):
     """Get district data directly by district ID"""
-    district = await db.districts.find_one({"id": district_id})
+    district = await db.districts.find_one({"id": district_id}, NO_ID_PROJECTION)
     if not district:
         raise HTTPException(status_code=404, detail=f"District not found: {district_id}")
-    return parse_from_mongo(district)
+    return from_mongo("districts", district)
 
 @app.get("/api/blocks/{block_id}")
 async def get_block_by_id(block_id: str):
     """Get block data directly by block ID"""
-    block = await db.blocks.find_one({"id": block_id})
+    block = await db.blocks.find_one({"id": block_id}, NO_ID_PROJECTION)
     if not block:
         raise HTTPException(status_code=404, detail=f"Block not found: {block_id}")
-    return parse_from_mongo(block)
+    return from_mongo("blocks", block)
 
 @app.get("/api/metrics/{level}/{entity_id}")
-async def get_metrics(level: str, entity_id: str):
+async def get_metrics(level: str, entity_id: str, request: Request):
     """Get metrics for specific entity level"""
-    metrics = await db.metrics.find({"level": level, "entity_id": entity_id}).to_list(length=None)
-    return [parse_from_mongo(metric) for metric in metrics]
+    async def load():
+        metrics = await db.metrics.find({"level": level, "entity_id": entity_id}, NO_ID_PROJECTION).to_list(length=None)
+        return from_mongo_many("metrics", metrics)
+    return await conditional_get(request, ("metrics", level, entity_id), load)
 
 @app.get("/api/insights/{level}/{entity_id}")
-async def get_insights(level: str, entity_id: str):
+async def get_insights(level: str, entity_id: str, request: Request):
     """Get AI-generated insights for specific entity"""
-    insights = await db.insights.find({"level": level, "entity_id": entity_id}).to_list(length=None)
-    return [parse_from_mongo(insight) for insight in insights]
+    async def load():
+        insights = await db.insights.find({"level": level, "entity_id": entity_id}, NO_ID_PROJECTION).to_list(length=None)
+        return from_mongo_many("insights", insights)
+    return await conditional_get(request, ("insights", level, entity_id), load)
+
+@app.post("/api/metrics/batch")
+async def get_metrics_batch(request: BatchEntitiesRequest):
+    """Get metrics for many entities of one level, grouped by entity"""
+    if get_level_collection(request.level) is None:
+        raise HTTPException(status_code=400, detail="Invalid level")
+    
+    metrics = {entity_id: [] for entity_id in request.entity_ids}
+    cursor = db.metrics.find({"level": request.level, "entity_id": {"$in": request.entity_ids}}, NO_ID_PROJECTION)
+    async for metric in cursor:
+        metrics[metric["entity_id"]].append(from_mongo("metrics", metric))
+    return {"level": request.level, "metrics": metrics}
+
+@app.post("/api/insights/batch")
+async def get_insights_batch(request: BatchEntitiesRequest):
+    """Get AI-generated insights for many entities of one level, grouped by entity"""
+    if get_level_collection(request.level) is None:
+        raise HTTPException(status_code=400, detail="Invalid level")
+    
+    insights = {entity_id: [] for entity_id in request.entity_ids}
+    cursor = db.insights.find({"level": request.level, "entity_id": {"$in": request.entity_ids}}, NO_ID_PROJECTION)
+    async for insight in cursor:
+        insights[insight["entity_id"]].append(from_mongo("insights", insight))
+    return {"level": request.level, "insights": insights}
 
 @app.post("/api/generate-insights/{level}/{entity_id}")
-async def generate_insights_endpoint(level: str, entity_id: str, background_tasks: BackgroundTasks):
-    """Generate AI insights for specific metrics"""
+async def generate_insights_endpoint(level: str, entity_id: str):
+    """
+    Queue AI insight generation for an entity's metrics
+    
+    Returns the job; poll GET /api/jobs/{job_id} for progress. A request for an entity
+    whose job is still queued or running returns that job instead of a new one.
+    """
     
-    async def generate_insights_task():
-        # Get metrics for the entity
-        metrics = await db.metrics.find({"level": level, "entity_id": entity_id}).to_list(length=None)
+    async def generate_insights_task(report):
+        # Get metrics for the entity and the metrics that already have an insight
+        metrics = await db.metrics.find({"level": level, "entity_id": entity_id}, NO_ID_PROJECTION).to_list(length=None)
+        existing = {
+            insight["metric_name"]
+            async for insight in db.insights.find({"level": level, "entity_id": entity_id}, {"_id": 0, "metric_name": 1})
+        }
         
-        for metric in metrics:
-            # Check if insight already exists
-            existing_insight = await db.insights.find_one({
+        new_insights = {}
+        generated_at = utc_now()
+        for done, metric in enumerate(metrics):
+            report(done, len(metrics))
+            if metric["metric_name"] in existing or metric["metric_name"] in new_insights:
+                continue
+            ai_result = await generate_ai_insight(
+                metric["metric_name"],
+                level,
+                metric["entity_name"],
+                metric["value"],
+                metric["max_value"],
+                metric["trend"]
+            )
+            new_insights[metric["metric_name"]] = {
+                "id": str(uuid.uuid4()),
                 "metric_name": metric["metric_name"],
                 "level": level,
-                "entity_id": entity_id
-            })
-            
-            if not existing_insight:
-                # Generate new insight
-                ai_result = await generate_ai_insight(
-                    metric["metric_name"],
-                    level,
-                    metric["entity_name"],
-                    metric["value"],
-                    metric["max_value"],
-                    metric["trend"]
-                )
-                
-                insight_data = {
-                    "id": str(uuid.uuid4()),
-                    "metric_name": metric["metric_name"],
-                    "level": level,
-                    "entity_id": entity_id,
-                    "insight_text": ai_result["insight"],
-                    "recommendation": ai_result["recommendation"],
-                    "severity": ai_result["severity"],
-                    "generated_at": datetime.now(timezone.utc).isoformat()
-                }
-                
-                await db.insights.insert_one(prepare_for_mongo(insight_data))
-    
-    background_tasks.add_task(generate_insights_task)
-    return {"message": "Insights generation started", "level": level, "entity_id": entity_id}
+                "entity_id": entity_id,
+                "insight_text": ai_result["insight"],
+                "recommendation": ai_result["recommendation"],
+                "severity": ai_result["severity"],
+                "generated_at": generated_at
+            }
+        
+        # The unique (metric_name, level, entity_id) index drops insights a concurrent run already wrote
+        if new_insights and await bulk_insert(db.insights, new_insights.values()):
+            DATA_VERSIONS.bump("insights", level, entity_id)
+        report(len(metrics), len(metrics))
+    
+    job = JOB_QUEUE.submit("insights", (level, entity_id), generate_insights_task)
+    return {
+        "message": "Insights generation started",
+        "level": level,
+        "entity_id": entity_id,
+        "job_id": job["id"],
+        "status": job["status"]
+    }
 
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Get the status and progress of a background job"""
+    job = JOB_QUEUE.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.post("/api/precompute-insights")
+async def precompute_insights_endpoint(levels: Optional[str] = None, resume: bool = False):
+    """
+    Queue regeneration of the insights of every metric of every entity
+    
+    levels is a comma separated subset of state,district,block,school (default all).
+    resume=true continues an interrupted run from its checkpoints. Poll GET /api/jobs/{job_id}.
+    """
+    selected = tuple(levels.split(",")) if levels else PRECOMPUTE_LEVELS
+    invalid = [level for level in selected if level not in PRECOMPUTE_LEVELS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid levels: {invalid}")
+    
+    job = start_insight_precompute(selected, resume)
+    return {"message": "Insight precomputation started", "levels": list(selected), "job_id": job["id"], "status": job["status"]}
 
 @app.post("/api/generate-domain-insights/{domain_key}")
 async def generate_domain_insights(domain_key: str, level: str = "state", entity_id: str = "mh_001"):
@@ -670,18 +961,6 @@ async def generate_domain_insights(domain_key: str, level: str = "state", entity
     # Normalize domain key (handle both hyphens and underscores)
     domain_key = domain_key.replace("-", "_")
     
-    # Domain name mapping
-    domain_mapping = {
-        "learning_outcomes": "Learning Outcomes",
-        "infrastructure": "Infrastructure",
-        "access": "Access",
-        "equity": "Equity",
-        "governance": "Governance",
-        "teacher_education": "Teachers Education"
-    }
-    
-    domain_name = domain_mapping.get(domain_key, domain_key)
-    
     # Get PGI data based on the current level
     pgi_data = await get_pgi_score(level, entity_id)
     domain_data = next((d for d in pgi_data["domains"] if d["domain_key"] == domain_key), None)
@@ -689,28 +968,6 @@ async def generate_domain_insights(domain_key: str, level: str = "state", entity
     if not domain_data:
         raise HTTPException(status_code=404, detail=f"Domain not found: {domain_key}")
     
-    # Get entities based on current level
-    all_districts = []
-    all_blocks = []
-    all_schools = []
-    
-    if level == "state":
-        all_districts = await db.districts.find({}, {"_id": 0}).to_list(length=None)
-        all_blocks = await db.blocks.find({}, {"_id": 0}).to_list(length=None)
-        all_schools = await db.schools.find({}, {"_id": 0}).to_list(length=None)
-    elif level == "district":
-        # For district level, get blocks and schools within this district
-        all_blocks = await db.blocks.find({"district_id": entity_id}, {"_id": 0}).to_list(length=None)
-        for block in all_blocks:
-            block_schools = await db.schools.find({"block_id": block["id"]}, {"_id": 0}).to_list(length=5)
-            all_schools.extend(block_schools)
-    elif level == "block":
-        # For block level, get schools within this block
-        all_schools = await db.schools.find({"block_id": entity_id}, {"_id": 0}).to_list(length=None)
-    
-    # Get metrics for this domain
-    domain_metrics = await db.metrics.find({"domain": domain_name}).to_list(length=None)
-    
     # Analyze indicators needing improvement
     indicators_analysis = []
     for indicator in domain_data.get("indicators", []):
@@ -732,119 +989,67 @@ async def generate_domain_insights(domain_key: str, level: str = "state", entity
     # Sort by gap (descending)
     indicators_analysis.sort(key=lambda x: x["gap"], reverse=True)
     
-    # Initialize empty lists for all analyses
-    district_scores = []
-    block_scores = []
-    school_scores = []
+    def domain_score_entry(entry, **names):
+        percentage = entry.get("value", 0)
+        return {
+            "id": entry["entity_id"],
+            "name": entry["entity_name"],
+            **names,
+            "score": round(entry.get("score", 0), 2),
+            "max_score": round(entry.get("max_score", 100), 2),
+            "percentage": round(percentage, 2),
+            "gap_to_target": round(100 - percentage, 2)
+        }
+    
+    # Bottom entities come straight from the pgi_rankings index, scoped to the current entity
+    scope_level = None if level == "state" else level
+    scope_ids = None if level == "state" else [entity_id]
     
     # Analyze districts needing improvement (bottom 5) - only for state level
     bottom_districts = []
     if level == "state":
-        district_scores = []
-        for district in all_districts:
-            try:
-                # Get PGI data for this district
-                dist_pgi = await get_pgi_score("district", district["id"])
-                dist_domain = next((d for d in dist_pgi.get("domains", []) if d.get("domain_key") == domain_key), None)
-                
-                if dist_domain:
-                    percentage = dist_domain.get("percentage", 0)
-                    score = dist_domain.get("score", 0)
-                    max_score = dist_domain.get("max_score", 100)
-                    
-                    district_scores.append({
-                        "id": district["id"],
-                        "name": district["name"],
-                        "score": round(score, 2),
-                        "max_score": round(max_score, 2),
-                        "percentage": round(percentage, 2),
-                        "gap_to_target": round(100 - percentage, 2)
-                    })
-            except Exception as e:
-                print(f"Error processing district {district['id']}: {str(e)}")
-                continue
-        
-        district_scores.sort(key=lambda x: x["percentage"])
-        bottom_districts = district_scores[:5]
+        await ensure_materialized("district")
+        bottom_districts = [domain_score_entry(entry) for entry in await get_worst_k("district", domain_key, 5)]
     
     # Analyze blocks needing improvement - for state and district levels
     bottom_blocks = []
     if level in ["state", "district"]:
-        block_scores = []
-        for block in all_blocks:
-            try:
-                # Get PGI data for this block
-                block_pgi = await get_pgi_score("block", block["id"])
-                block_domain = next((d for d in block_pgi.get("domains", []) if d.get("domain_key") == domain_key), None)
-                
-                if block_domain:
-                    percentage = block_domain.get("percentage", 0)
-                    score = block_domain.get("score", 0)
-                    max_score = block_domain.get("max_score", 100)
-                    
-                    # Get district name only for state level
-                    district_name = ""
-                    if level == "state":
-                        district = next((d for d in all_districts if d["id"] == block.get("district_id")), None)
-                        district_name = district["name"] if district else "Unknown"
-                    
-                    block_scores.append({
-                        "id": block["id"],
-                        "name": block["name"],
-                        "district_name": district_name,
-                        "score": round(score, 2),
-                        "max_score": round(max_score, 2),
-                        "percentage": round(percentage, 2),
-                        "gap_to_target": round(100 - percentage, 2)
-                    })
-            except Exception as e:
-                print(f"Error processing block {block['id']}: {str(e)}")
-                continue
+        await ensure_materialized("block", scope_level, scope_ids)
+        block_entries = await get_worst_k("block", domain_key, 10, scope_ids)
         
-        block_scores.sort(key=lambda x: x["percentage"])
-        bottom_blocks = block_scores[:10]
+        # District name only for state level (scope_ids of a block: [state_id, district_id])
+        district_names = {}
+        if level == "state":
+            district_names = await get_entity_names("district", [entry["scope_ids"][1] for entry in block_entries])
+        bottom_blocks = [
+            domain_score_entry(
+                entry,
+                district_name=district_names.get(entry["scope_ids"][1], "Unknown") if level == "state" else ""
+            )
+            for entry in block_entries
+        ]
     
-    # Analyze schools needing improvement - for all levels
+    # Analyze schools needing improvement - for all levels except school
     bottom_schools = []
-    school_scores = []
-    
-    for school in all_schools:
-        try:
-            # Get PGI data for this school
-            school_pgi = await get_pgi_score("school", school["id"])
-            school_domain = next((d for d in school_pgi.get("domains", []) if d.get("domain_key") == domain_key), None)
-            
-            if school_domain:
-                percentage = school_domain.get("percentage", 0)
-                score = school_domain.get("score", 0)
-                max_score = school_domain.get("max_score", 100)
-                
-                # Get block and district names based on level
-                block_name = ""
-                district_name = ""
-                if level in ["state", "district"]:
-                    block = next((b for b in all_blocks if b["id"] == school.get("block_id")), None)
-                    block_name = block["name"] if block else "Unknown"
-                    if level == "state":
-                        district = next((d for d in all_districts if d["id"] == block.get("district_id")), None) if block else None
-                        district_name = district["name"] if district else "Unknown"
-                
-                school_scores.append({
-                    "id": school["id"],
-                    "name": school["name"],
-                    "block_name": block_name,
-                    "district_name": district_name,
-                    "score": round(score, 2),
-                    "max_score": round(max_score, 2),
-                    "percentage": round(percentage, 2),
-                    "gap_to_target": round(100 - percentage, 2)
-                })
-        except Exception as e:
-            print(f"Error processing school {school['id']}: {str(e)}")
-            continue
-    
-    school_scores.sort(key=lambda x: x["percentage"])
-    bottom_schools = school_scores[:10]
+    if level in ["state", "district", "block"]:
+        await ensure_materialized("school", scope_level, scope_ids)
+        school_entries = await get_worst_k("school", domain_key, 10, scope_ids)
+        
+        # Get block and district names based on level (scope_ids of a school: [state_id, district_id, block_id])
+        block_names = {}
+        district_names = {}
+        if level in ["state", "district"]:
+            block_names = await get_entity_names("block", [entry["scope_ids"][2] for entry in school_entries])
+            if level == "state":
+                district_names = await get_entity_names("district", [entry["scope_ids"][1] for entry in school_entries])
+        bottom_schools = [
+            domain_score_entry(
+                entry,
+                block_name=block_names.get(entry["scope_ids"][2], "Unknown") if level in ["state", "district"] else "",
+                district_name=district_names.get(entry["scope_ids"][1], "Unknown") if level == "state" else ""
+            )
+            for entry in school_entries
+        ]
     
     # Calculate overall statistics
     overall_achievement = domain_data.get("percentage", 0)
@@ -877,60 +1082,248 @@ async def generate_domain_insights(domain_key: str, level: str = "state", entity
 @app.get("/api/dashboard-overview")
 async def get_dashboard_overview():
     """Get comprehensive dashboard overview"""
-    # Get state data
-    state = await db.states.find_one({"name": "Maharashtra"})
+    domain_names = ["Learning Outcomes", "Infrastructure", "Governance", "Teachers Education", "Access", "Equity"]
     
-    # Get top performing districts
-    top_districts = await db.districts.find().sort("percentage", -1).limit(5).to_list(length=5)
+    # Domain-wise performance is summed server-side in one pass over the state metrics
+    domain_pipeline = [
+        {"$match": {"level": "state", "domain": {"$in": domain_names}}},
+        {"$group": {
+            "_id": "$domain",
+            "score": {"$sum": "$value"},
+            "max_score": {"$sum": "$max_value"},
+            "metrics_count": {"$sum": 1}
+        }}
+    ]
     
-    # Get domain-wise performance
-    domains = {}
-    domain_names = ["Learning Outcomes", "Infrastructure", "Governance", "Teachers Education", "Access", "Equity"]
+    # Independent queries run concurrently; entity counts come from collection metadata
+    state, top_districts, domain_totals, total_districts, total_blocks, total_schools = await asyncio.gather(
+        db.states.find_one({"name": "Maharashtra"}, NO_ID_PROJECTION),
+        db.districts.find({}, NO_ID_PROJECTION).sort("percentage", -1).limit(5).to_list(length=5),
+        db.metrics.aggregate(domain_pipeline).to_list(length=None),
+        db.districts.estimated_document_count(),
+        db.blocks.estimated_document_count(),
+        db.schools.estimated_document_count()
+    )
     
+    totals = {row["_id"]: row for row in domain_totals}
+    domains = {}
     for domain in domain_names:
-        domain_metrics = await db.metrics.find({"domain": domain, "level": "state"}).to_list(length=None)
-        if domain_metrics:
-            total_value = sum(m["value"] for m in domain_metrics)
-            total_max = sum(m["max_value"] for m in domain_metrics)
+        if domain in totals:
+            total_value = totals[domain]["score"]
+            total_max = totals[domain]["max_score"]
             domains[domain] = {
                 "score": total_value,
                 "max_score": total_max,
                 "percentage": (total_value / total_max) * 100 if total_max > 0 else 0,
-                "metrics_count": len(domain_metrics)
+                "metrics_count": totals[domain]["metrics_count"]
             }
     
     return {
-        "state": parse_from_mongo(state) if state else {},
-        "top_districts": [parse_from_mongo(d) for d in top_districts],
+        "state": from_mongo("states", state) if state else {},
+        "top_districts": from_mongo_many("districts", top_districts),
         "domain_performance": domains,
-        "total_districts": await db.districts.count_documents({}),
-        "total_blocks": await db.blocks.count_documents({}),
-        "total_schools": await db.schools.count_documents({})
+        "total_districts": total_districts,
+        "total_blocks": total_blocks,
+        "total_schools": total_schools
     }
 
+# Rows per chunk written by the streaming export formats
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# CSV columns of each exported collection, in output order. The header is written before
+# any row, so it cannot be derived from the documents without dropping fields seen later.
+CSV_EXPORT_COLUMNS = {
+    "states": ("id", "name", "total_score", "max_score", "percentage", "rank", "districts_count",
+               "student_count", "created_at", "last_calculated"),
+    "districts": ("id", "name", "state_id", "total_score", "max_score", "percentage", "rank", "blocks_count",
+                  "student_count", "created_at", "last_calculated"),
+    "blocks": ("id", "name", "district_id", "state_id", "schools_count", "performance_score", "total_score",
+               "percentage", "student_count", "created_at", "last_calculated"),
+    "schools": ("id", "name", "block_id", "district_id", "state_id", "student_count", "teacher_count",
+                "infrastructure_score", "total_score", "percentage", "created_at", "last_calculated"),
+    "metrics": ("id", "metric_name", "level", "entity_id", "entity_name", "domain", "value", "max_value",
+                "percentage", "trend", "last_updated"),
+    "insights": ("id", "metric_name", "level", "entity_id", "insight_text", "recommendation", "severity",
+                 "generated_at"),
+}
+
+def export_parts(level: str) -> List[tuple]:
+    """(collection name, filter) pairs exported for a level"""
+    parts = []
+    if level in LEVEL_COLLECTIONS:
+        parts.append((LEVEL_COLLECTIONS[level], {}))
+    if level in ("state", "district"):
+        parts.append(("metrics", {"level": level}))
+    parts.append(("insights", {"level": level}))
+    return parts
+
+async def iter_export_documents(collection_name: str, query: Dict, projection: Dict = NO_ID_PROJECTION):
+    """Iterate a collection in cursor batches without holding it in memory"""
+    cursor = db[collection_name].find(query, projection).batch_size(EXPORT_BATCH_SIZE)
+    async for document in cursor:
+        yield from_mongo(collection_name, document)
+
+async def stream_ndjson_export(parts: List[tuple], projection: Dict = NO_ID_PROJECTION):
+    """Yield NDJSON chunks, one line per document tagged with its collection"""
+    lines = []
+    for collection_name, query in parts:
+        async for document in iter_export_documents(collection_name, query, projection):
+            lines.append(dumps({"collection": collection_name, **document}))
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+def csv_value(value):
+    """Flatten a document value into a CSV cell"""
+    if isinstance(value, datetime):
+        # RFC 3339, as orjson writes it in the JSON and NDJSON exports
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    return value
+
+def csv_cell(document: Dict, column: str):
+    """CSV cell of a column, following dotted paths into embedded documents"""
+    value = document
+    for part in column.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return csv_value(value)
+
+async def stream_csv_export(collection_name: str, query: Dict, columns):
+    """Yield CSV chunks for one collection; only the given columns are read and every one is written"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    
+    def flush():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+    
+    projection = {"_id": 0, **{column: 1 for column in columns}}
+    async for document in iter_export_documents(collection_name, query, projection):
+        writer.writerow([csv_cell(document, column) for column in columns])
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield flush()
+    yield flush()
+
 @app.get("/api/export-data/{level}")
-async def export_data(level: str):
-    """Export data for specific level as JSON"""
-    data = {}
+async def export_data(level: str, format: str = "json", collection: Optional[str] = None,
+                      limit: Optional[int] = None, cursor: Optional[str] = None, sort: str = "id",
+                      fields: Optional[str] = None):
+    """
+    Export data for specific level as JSON, or streamed as NDJSON / CSV
     
-    if level == "state":
-        data["states"] = [parse_from_mongo(s) for s in await db.states.find().to_list(length=None)]
-        data["metrics"] = [parse_from_mongo(m) for m in await db.metrics.find({"level": "state"}).to_list(length=None)]
-    elif level == "district":
-        data["districts"] = [parse_from_mongo(d) for d in await db.districts.find().to_list(length=None)]
-        data["metrics"] = [parse_from_mongo(m) for m in await db.metrics.find({"level": "district"}).to_list(length=None)]
-    elif level == "block":
-        data["blocks"] = [parse_from_mongo(b) for b in await db.blocks.find().to_list(length=None)]
-    elif level == "school":
-        data["schools"] = [parse_from_mongo(s) for s in await db.schools.find().to_list(length=None)]
-    
-    data["insights"] = [parse_from_mongo(i) for i in await db.insights.find({"level": level}).to_list(length=None)]
+    format=ndjson streams every exported collection, one document per line with a "collection" field.
+    format=csv streams a single collection (the level's entity collection unless collection is given).
+    fields=id,name,... exports only those fields. JSON exports of a single collection can be paged
+    with limit, cursor and sort (id or percentage); the next page's cursor is in X-Next-Cursor.
+    """
+    parts = export_parts(level)
+    if collection:
+        parts = [part for part in parts if part[0] == collection]
+        if not parts:
+            raise HTTPException(status_code=400, detail=f"Collection {collection} is not exported for level {level}")
+    
+    paged = limit is not None or cursor is not None
+    if paged and (format != "json" or not collection):
+        raise HTTPException(status_code=400, detail="Paging needs format=json and a single collection")
+    
+    if format == "json":
+        data = {}
+        next_cursor = None
+        for collection_name, query in parts:
+            data[collection_name], next_cursor = await find_page(db, collection_name, query, limit, cursor, sort, fields)
+        
+        # Returned as a response so the documents are encoded once, by orjson, without jsonable_encoder
+        return FastJSONResponse({
+            "level": level,
+            "exported_at": datetime.now(timezone.utc),
+            "data": data
+        }, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
     
-    return {
-        "level": level,
-        "exported_at": datetime.now(timezone.utc),
-        "data": data
-    }
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    
+    projection = parse_fields(fields)
+    if format == "ndjson":
+        content = stream_ndjson_export(parts, projection)
+        filename = f"{level}_export.ndjson"
+    else:
+        collection_name, query = parts[0]
+        columns = [field for field in projection if field != "_id"] if fields else CSV_EXPORT_COLUMNS[collection_name]
+        content = stream_csv_export(collection_name, query, columns)
+        filename = f"{level}_{collection_name}_export.csv"
+    
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/api/export-indicators/{level}")
+async def export_indicator_scores(level: str, format: str = "parquet"):
+    """
+    Export PGI indicator scores for every entity of a level as Parquet or Arrow IPC
+    
+    One row per entity with one column per PGI indicator plus domain and total scores.
+    Entities are read and encoded EXPORT_BATCH_SIZE at a time and streamed as they are written.
+    """
+    collection = get_level_collection(level)
+    if collection is None:
+        raise HTTPException(status_code=400, detail=f"Invalid level: {level}")
+    
+    try:
+        from columnar_export import COLUMNAR_MEDIA_TYPES, ColumnarWriter, indicator_record_batch, indicator_schema
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Columnar export requires pyarrow")
+    
+    if format not in COLUMNAR_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    
+    async def stream_batches():
+        schema = indicator_schema()
+        writer = ColumnarWriter(format, schema)
+        entities = []
+        
+        async def encode():
+            entity_ids = [entity["id"] for entity in entities]
+            indicator_scores = await group_indicator_scores(level, entity_ids)
+            # Same values the materialized scores use; entities on the demo fallback are flagged is_sample
+            is_sample = [not indicator_scores[entity_id] for entity_id in entity_ids]
+            score_dicts = [
+                indicator_scores[entity_id] or sample_indicator_scores(level, entity_id)
+                for entity_id in entity_ids
+            ]
+            chunk = writer.write(indicator_record_batch(entities, score_dicts, is_sample, schema))
+            entities.clear()
+            return chunk
+        
+        cursor = collection.find({}, ENTITY_PROJECTION).batch_size(EXPORT_BATCH_SIZE)
+        async for entity in cursor:
+            entities.append(entity)
+            if len(entities) >= EXPORT_BATCH_SIZE:
+                yield await encode()
+        if entities:
+            yield await encode()
+        yield writer.close()
+    
+    extension = "parquet" if format == "parquet" else "arrows"
+    return StreamingResponse(
+        stream_batches(),
+        media_type=COLUMNAR_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{level}_indicator_scores.{extension}"'}
+    )
 
 @app.post("/api/reinitialize-data")
 async def reinitialize_data():
@@ -943,9 +1336,16 @@ async def reinitialize_data():
         await db.schools.delete_many({})
         await db.metrics.delete_many({})
         await db.insights.delete_many({})
+        await db.pgi_indicator_scores.delete_many({})
+        await db.pgi_scores.delete_many({})
+        await db.pgi_rankings.delete_many({})
+        await db.pgi_score_history.delete_many({})
+        dataset_replaced()
         
         print("Database cleared. Reinitializing data...")
         await initialize_sample_data()
+        await HIERARCHY.load(db)
+        start_materialization()
         
         return {"message": "Data reinitialized successfully", "districts_count": 36}
     except Exception as e:
@@ -976,197 +1376,241 @@ async def get_domain_indicators(domain_key: str):
     domain_indicators = get_indicators_for_domain(domain_key)
     return {
         "domain": PGI_DOMAINS[domain_key],
-        "indicators": domain_indicators,
+        "indicators": dict(domain_indicators),
         "indicators_count": len(domain_indicators)
     }
 
 @app.get("/api/pgi-score/{level}/{entity_id}")
-async def get_pgi_score(level: str, entity_id: str):
+async def get_pgi_score_endpoint(level: str, entity_id: str, request: Request):
     """Get detailed PGI score for an entity with domain and indicator breakdown"""
+    return await conditional_get(request, ("pgi_score", level, entity_id), lambda: get_pgi_score(level, entity_id))
+
+async def get_pgi_score(level: str, entity_id: str):
+    """Get the PGI breakdown of an entity (404 if it does not exist)"""
     
-    # Get entity details
-    entity = None
-    entity_name = ""
-    
-    if level == "state":
-        entity = await db.states.find_one({"id": entity_id})
-        entity_name = entity["name"] if entity else "Unknown State"
-    elif level == "district":
-        entity = await db.districts.find_one({"id": entity_id})
-        entity_name = entity["name"] if entity else "Unknown District"
-    elif level == "block":
-        entity = await db.blocks.find_one({"id": entity_id})
-        entity_name = entity["name"] if entity else "Unknown Block"
-    elif level == "school":
-        entity = await db.schools.find_one({"id": entity_id})
-        entity_name = entity["name"] if entity else "Unknown School"
-    
-    if not entity:
+    # Served from the materialized store; computed on first access
+    materialized = await get_materialized_pgi_scores(level, [entity_id])
+    if entity_id not in materialized:
         raise HTTPException(status_code=404, detail=f"Entity not found: {entity_id}")
     
-    # Get all indicator scores for this entity
-    indicator_scores_data = await db.pgi_indicator_scores.find({
-        "level": level,
-        "entity_id": entity_id
-    }).to_list(length=None)
+    return materialized[entity_id]
+
+@app.post("/api/pgi-score/batch")
+async def get_pgi_scores_batch(request: BatchEntitiesRequest):
+    """Get detailed PGI scores for many entities of one level in a single round trip"""
+    if get_level_collection(request.level) is None:
+        raise HTTPException(status_code=400, detail="Invalid level")
     
-    # Convert to dict for calculation
-    indicator_scores = {
-        score["indicator_key"]: score["percentage"]
-        for score in indicator_scores_data
+    entity_ids = list(dict.fromkeys(request.entity_ids))
+    materialized = await get_materialized_pgi_scores(request.level, entity_ids)
+    
+    return {
+        "level": request.level,
+        "results": [materialized[entity_id] for entity_id in entity_ids if entity_id in materialized],
+        "not_found": [entity_id for entity_id in entity_ids if entity_id not in materialized],
+        "count": len(materialized)
     }
+
+@app.get("/api/pgi-score-updates/{level}")
+async def get_pgi_score_updates(level: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                limit: int = 100):
+    """
+    Get entities whose PGI score was calculated in a time window, most recent first
     
-    # If no scores exist, generate sample scores for demonstration
-    if not indicator_scores:
-        # Get applicable indicators for this level
-        level_indicators = get_indicators_for_level(level)
-        indicator_scores = {
-            key: 50 + (hash(key + entity_id) % 40)  # Generate deterministic scores between 50-90
-            for key in level_indicators.keys()
-        }
+    Only calculations and rollups that changed an entity's indicator scores count, not
+    the materialization of unchanged scores. since defaults to seven days ago; naive
+    timestamps are taken as UTC.
+    """
+    if get_level_collection(level) is None:
+        raise HTTPException(status_code=400, detail="Invalid level")
     
-    # Calculate PGI scores
-    pgi_result = calculate_total_pgi_score(indicator_scores, max_score=1000)
+    since = since or datetime.now(timezone.utc) - timedelta(days=7)
+    window = {"$gte": since if since.tzinfo else since.replace(tzinfo=timezone.utc)}
+    if until:
+        window["$lt"] = until if until.tzinfo else until.replace(tzinfo=timezone.utc)
     
-    # Build detailed response with domain breakdown
-    domains_detail = []
-    for domain_key, domain_score_data in pgi_result["domain_breakdown"].items():
-        domain_indicators_list = []
-        domain_indicators = get_indicators_for_domain(domain_key)
-        
-        for ind_key, ind_data in domain_indicators.items():
-            if level in ind_data["levels"]:
-                achieved_pct = indicator_scores.get(ind_key, 0)
-                domain_indicators_list.append({
-                    "indicator_key": ind_key,
-                    "indicator_code": ind_data["code"],
-                    "indicator_name": ind_data["name"],
-                    "achieved_percentage": round(achieved_pct, 2),
-                    "target": ind_data["target"],
-                    "unit": ind_data["unit"],
-                    "weight_in_domain": ind_data["weight"]
-                })
-        
-        domains_detail.append({
-            "domain_key": domain_key,
-            "domain_name": domain_score_data["name"],
-            "domain_code": domain_score_data["code"],
-            "score": domain_score_data["score"],
-            "max_score": domain_score_data["max_score"],
-            "percentage": domain_score_data["percentage"],
-            "weight": domain_score_data["weight"],
-            "indicators": domain_indicators_list
-        })
+    cursor = db.pgi_scores.find(
+        {"level": level, "last_calculated": window},
+        {"_id": 0, "entity_id": 1, "entity_name": 1, "total_score": 1, "percentage": 1, "last_calculated": 1}
+    ).sort("last_calculated", -1).limit(limit)
+    updates = from_mongo_many("pgi_scores", await cursor.to_list(length=limit))
     
     return {
-        "entity_id": entity_id,
-        "entity_name": entity_name,
         "level": level,
-        "total_score": pgi_result["total_score"],
-        "max_score": pgi_result["max_score"],
-        "percentage": pgi_result["percentage"],
-        "domains": domains_detail,
-        "calculation_date": datetime.now(timezone.utc).isoformat()
+        "since": window["$gte"],
+        "until": window.get("$lt"),
+        "updates": updates,
+        "count": len(updates)
     }
 
+@app.get("/api/score-history/{level}/{entity_id}")
+async def get_score_history(level: str, entity_id: str, request: Request, keys: Optional[str] = None,
+                            since: Optional[datetime] = None, until: Optional[datetime] = None,
+                            bucket: str = "month"):
+    """
+    Get the PGI score history of an entity downsampled into buckets (day, week, month, quarter, year)
+    
+    One series per indicator plus "total" (the PGI percentage), each with a trend; keys=total,lo_math_class3
+    limits the series. Naive timestamps are taken as UTC. 501 on servers older than MongoDB 5.0.
+    """
+    if not history_enabled:
+        raise HTTPException(status_code=501, detail="Score history needs MongoDB 5.0 or later")
+    if get_level_collection(level) is None:
+        raise HTTPException(status_code=400, detail="Invalid level")
+    if bucket not in HISTORY_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported bucket: {bucket}")
+    
+    since = since if since is None or since.tzinfo else since.replace(tzinfo=timezone.utc)
+    until = until if until is None or until.tzinfo else until.replace(tzinfo=timezone.utc)
+    
+    async def load():
+        history = await score_history(db, level, entity_id, keys.split(",") if keys else None, since, until, bucket)
+        return {
+            "level": level,
+            "entity_id": entity_id,
+            "bucket": bucket,
+            "since": since,
+            "until": until,
+            **history
+        }
+    return await conditional_get(request, ("score_history", level, entity_id), load)
+
 @app.post("/api/pgi-score/{level}/{entity_id}/calculate")
-async def calculate_and_store_pgi_score(level: str, entity_id: str, indicator_data: Dict[str, float]):
+async def calculate_and_store_pgi_score(level: str, entity_id: str, indicator_data: Dict[str, float],
+                                        rollup: bool = False, weighted: bool = True):
     """
     Calculate and store PGI score based on provided indicator values
     
     Request body: Dict of {indicator_key: achieved_percentage}
+    Query params: rollup=true also re-aggregates the entity's ancestor chain
+    (weighted by student_count unless weighted=false)
     """
     
     # Validate level and entity
-    entity = None
-    if level == "state":
-        entity = await db.states.find_one({"id": entity_id})
-    elif level == "district":
-        entity = await db.districts.find_one({"id": entity_id})
-    elif level == "block":
-        entity = await db.blocks.find_one({"id": entity_id})
-    elif level == "school":
-        entity = await db.schools.find_one({"id": entity_id})
-    
+    entity = await HIERARCHY.get(db, level, entity_id) if level in LEVEL_COLLECTIONS else None
     if not entity:
         raise HTTPException(status_code=404, detail=f"Entity not found: {entity_id}")
     
     # Store individual indicator scores
     for indicator_key, achieved_pct in indicator_data.items():
         if indicator_key in PGI_INDICATORS:
-            indicator_info = PGI_INDICATORS[indicator_key]
-            
-            score_data = {
-                "id": f"{entity_id}_{indicator_key}",
-                "indicator_key": indicator_key,
-                "indicator_name": indicator_info["name"],
-                "domain": indicator_info["domain"],
-                "achieved_value": achieved_pct,
-                "target_value": indicator_info["target"],
-                "percentage": achieved_pct,
-                "unit": indicator_info["unit"],
-                "level": level,
-                "entity_id": entity_id,
-                "last_updated": datetime.now(timezone.utc).isoformat()
-            }
+            score_data = indicator_score_document(level, entity_id, indicator_key, achieved_pct)
             
             # Upsert (update or insert)
             await db.pgi_indicator_scores.update_one(
                 {"id": score_data["id"]},
-                {"$set": prepare_for_mongo(score_data)},
+                {"$set": score_data},
                 upsert=True
             )
     
-    # Calculate total PGI score
-    pgi_result = calculate_total_pgi_score(indicator_data, max_score=1000)
+    # Refresh the materialized breakdown from all stored indicator scores, not only the ones sent
+    calculated_at = utc_now()
+    document = (await materialize_pgi_scores(level, [entity], calculated_at))[0]
+    invalidate_ancestor_scores(level, entity)
+    pgi_result = {
+        "total_score": document["total_score"],
+        "max_score": document["max_score"],
+        "percentage": document["percentage"],
+        "domain_breakdown": {
+            domain["domain_key"]: {
+                "name": domain["domain_name"],
+                "code": domain["domain_code"],
+                "weight": domain["weight"],
+                "score": domain["score"],
+                "max_score": domain["max_score"],
+                "percentage": domain["percentage"]
+            }
+            for domain in document["domains"]
+        }
+    }
     
-    # Update entity with new PGI score
+    # Update entity with the same score as its materialized breakdown
     update_data = {
-        "total_score": pgi_result["total_score"],
-        "percentage": pgi_result["percentage"],
-        "last_calculated": datetime.now(timezone.utc).isoformat()
+        "total_score": document["total_score"],
+        "percentage": document["percentage"],
+        "last_calculated": calculated_at
     }
     
-    if level == "state":
-        await db.states.update_one({"id": entity_id}, {"$set": update_data})
-    elif level == "district":
-        await db.districts.update_one({"id": entity_id}, {"$set": update_data})
-    elif level == "block":
-        await db.blocks.update_one({"id": entity_id}, {"$set": update_data})
-    elif level == "school":
-        await db.schools.update_one({"id": entity_id}, {"$set": update_data})
+    await get_level_collection(level).update_one({"id": entity_id}, {"$set": update_data})
+    entities_changed(level, [entity])
+    
+    # Append this calculation to the entity's history instead of only overwriting it
+    await record_score_history(level, [(
+        entity_id,
+        {key: value for key, value in indicator_data.items() if key in PGI_INDICATORS},
+        document
+    )], calculated_at)
+    
+    # Re-aggregate only the ancestors of this entity
+    rolled_up = await rollup_ancestors(level, entity, weighted) if rollup else []
     
     return {
         "message": "PGI score calculated and stored successfully",
         "entity_id": entity_id,
         "level": level,
-        "pgi_result": pgi_result
+        "pgi_result": pgi_result,
+        "rolled_up": rolled_up
+    }
+
+@app.post("/api/rollup")
+async def rollup_all_levels(weighted: bool = True):
+    """Re-aggregate block, district and state indicator scores bottom-up from schools"""
+    summary = {}
+    await HIERARCHY.ensure_loaded(db)
+    for level in ("block", "district", "state"):
+        parents = HIERARCHY.entities(level)
+        rolled_up = await rollup_entities(level, parents, weighted)
+        summary[level] = len(rolled_up)
+    
+    return {"message": "Roll-up completed", "weighted": weighted, "entities_updated": summary}
+
+@app.post("/api/rollup/{level}/{entity_id}")
+async def rollup_entity(level: str, entity_id: str, weighted: bool = True):
+    """Re-aggregate an entity from its children, then refresh its ancestor chain"""
+    if level not in CHILD_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Level cannot be rolled up: {level}")
+    
+    entity = await HIERARCHY.get(db, level, entity_id)
+    if not entity:
+        raise HTTPException(status_code=404, detail=f"Entity not found: {entity_id}")
+    
+    rolled_up = await rollup_entities(level, [entity], weighted)
+    if not rolled_up:
+        raise HTTPException(status_code=404, detail=f"No scored children found for: {entity_id}")
+    
+    return {
+        "message": "Roll-up completed",
+        "level": level,
+        "entity_id": entity_id,
+        "rolled_up": [{"level": level, "entity_id": entity_id}] + await rollup_ancestors(level, entity, weighted)
     }
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss/eviction counts of the PGI score cache"""
+    return PGI_SCORE_CACHE.stats()
+
 @app.get("/api/pgi-comparison/{level}")
-async def get_pgi_comparison(level: str, limit: int = 10):
-    """Get top performing entities at a given level based on PGI score"""
+async def get_pgi_comparison(level: str, limit: int = 10, cursor: Optional[str] = None, fields: Optional[str] = None):
+    """
+    Get top performing entities at a given level based on PGI score
     
-    collection = None
-    if level == "state":
-        collection = db.states
-    elif level == "district":
-        collection = db.districts
-    elif level == "block":
-        collection = db.blocks
-    elif level == "school":
-        collection = db.schools
-    else:
+    Pass the X-Next-Cursor of a response as cursor for the next page of limit entities.
+    limit is clamped to 1..PAGE_SIZE_MAX, as this endpoint accepted any limit before it was paged.
+    """
+    collection_name = LEVEL_COLLECTIONS.get(level)
+    if collection_name is None:
         raise HTTPException(status_code=400, detail="Invalid level")
     
     # Get top entities by percentage
-    top_entities = await collection.find().sort("percentage", -1).limit(limit).to_list(length=limit)
+    limit = min(max(limit, 1), PAGE_SIZE_MAX)
+    top_entities, next_cursor = await find_page(db, collection_name, {}, limit, cursor, "percentage", fields)
     
-    return {
+    return FastJSONResponse({
         "level": level,
-        "top_performers": [parse_from_mongo(entity) for entity in top_entities],
+        "top_performers": top_entities,
         "count": len(top_entities)
-    }
+    }, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
 
 
 @app.post("/api/indicator-drilldown")
@@ -1191,6 +1635,7 @@ async def indicator_drilldown(request: IndicatorDrilldownRequest):
             "districts_needing_improvement": [],
             "blocks_needing_improvement": [],
             "schools_needing_improvement": [],
+            "coverage": {},
             "insights": ""
         }
         
@@ -1212,188 +1657,58 @@ async def indicator_drilldown(request: IndicatorDrilldownRequest):
             raise HTTPException(status_code=404, detail="Indicator not found")
         
         indicator_target = target_indicator.get("target", 100)
+        indicator_key = target_indicator["indicator_key"]
+        indicator_unit = target_indicator.get("unit")
+        # Entries ranked below the target's ranking value miss it, whichever way the indicator points
+        target_ranking_value = ranking_value(indicator_unit, indicator_target)
         
-        # State level: drill down to districts, blocks, and schools
-        if level == "state":
-            # Get all districts
-            all_districts = await db.districts.find({}, {"_id": 0}).to_list(length=None)
-            
-            district_analysis = []
-            for district in all_districts[:10]:  # Limit to first 10 for performance
-                try:
-                    dist_pgi = await get_pgi_score("district", district["id"])
-                    dist_domain = next((d for d in dist_pgi.get("domains", []) if d.get("domain_name") == domain_name), None)
-                    if dist_domain:
-                        dist_indicator = next((i for i in dist_domain.get("indicators", []) if i.get("indicator_code") == indicator_code), None)
-                        if dist_indicator:
-                            achievement = dist_indicator.get("achieved_percentage", 0)
-                            gap = indicator_target - achievement
-                            if gap > 0:  # Only include if gap > 5%
-                                district_analysis.append({
-                                    "id": district["id"],
-                                    "name": district["name"],
-                                    "achievement": round(achievement, 2),
-                                    "target": indicator_target,
-                                    "gap": round(gap, 2)
-                                })
-                except Exception as e:
-                    continue
-            
-            # Sort by gap (descending) and take bottom 5
-            district_analysis.sort(key=lambda x: x["gap"], reverse=True)
-            result["districts_needing_improvement"] = district_analysis[:5]
-            
-            # Get blocks from bottom 3 districts
-            blocks_to_analyze = []
-            for district in result["districts_needing_improvement"][:3]:
-                blocks = await db.blocks.find({"district_id": district["id"]}, {"_id": 0}).to_list(length=None)
-                blocks_to_analyze.extend(blocks)
-            
-            block_analysis = []
-            for block in blocks_to_analyze:
-                try:
-                    block_pgi = await get_pgi_score("block", block["id"])
-                    block_domain = next((d for d in block_pgi.get("domains", []) if d.get("domain_name") == domain_name), None)
-                    if block_domain:
-                        block_indicator = next((i for i in block_domain.get("indicators", []) if i.get("indicator_code") == indicator_code), None)
-                        if block_indicator:
-                            achievement = block_indicator.get("achieved_percentage", 0)
-                            gap = indicator_target - achievement
-                            if gap > 0:
-                                block_analysis.append({
-                                    "id": block["id"],
-                                    "name": block["name"],
-                                    "district_name": block["district_name"],
-                                    "achievement": round(achievement, 2),
-                                    "target": indicator_target,
-                                    "gap": round(gap, 2)
-                                })
-                except Exception as e:
-                    continue
-            
-            block_analysis.sort(key=lambda x: x["gap"], reverse=True)
-            result["blocks_needing_improvement"] = block_analysis[:5]
-            
-            # Get schools from bottom 3 blocks
-            schools_to_analyze = []
-            for block in result["blocks_needing_improvement"][:3]:
-                schools = await db.schools.find({"block_id": block["id"]}, {"_id": 0}).to_list(length=5)
-                schools_to_analyze.extend(schools)
-            
-            school_analysis = []
-            for school in schools_to_analyze:
-                try:
-                    school_pgi = await get_pgi_score("school", school["id"])
-                    school_domain = next((d for d in school_pgi.get("domains", []) if d.get("domain_name") == domain_name), None)
-                    if school_domain:
-                        school_indicator = next((i for i in school_domain.get("indicators", []) if i.get("indicator_code") == indicator_code), None)
-                        if school_indicator:
-                            achievement = school_indicator.get("achieved_percentage", 0)
-                            gap = indicator_target - achievement
-                            if gap > 0:
-                                school_analysis.append({
-                                    "id": school["id"],
-                                    "name": school["name"],
-                                    "block_name": school["block_name"],
-                                    "district_name": school.get("district_name", ""),
-                                    "achievement": round(achievement, 2),
-                                    "target": indicator_target,
-                                    "gap": round(gap, 2)
-                                })
-                except Exception as e:
-                    continue
-            
-            school_analysis.sort(key=lambda x: x["gap"], reverse=True)
-            result["schools_needing_improvement"] = school_analysis[:5]
-        
-        # District level: drill down to blocks and schools
-        elif level == "district":
-            # Get all blocks in this district
-            all_blocks = await db.blocks.find({"district_id": entity_id}, {"_id": 0}).to_list(length=None)
-            
-            block_analysis = []
-            for block in all_blocks:
-                try:
-                    block_pgi = await get_pgi_score("block", block["id"])
-                    block_domain = next((d for d in block_pgi.get("domains", []) if d.get("domain_name") == domain_name), None)
-                    if block_domain:
-                        block_indicator = next((i for i in block_domain.get("indicators", []) if i.get("indicator_code") == indicator_code), None)
-                        if block_indicator:
-                            achievement = block_indicator.get("achieved_percentage", 0)
-                            gap = indicator_target - achievement
-                            if gap > 0:
-                                block_analysis.append({
-                                    "id": block["id"],
-                                    "name": block["name"],
-                                    "achievement": round(achievement, 2),
-                                    "target": indicator_target,
-                                    "gap": round(gap, 2)
-                                })
-                except Exception as e:
-                    continue
-            
-            block_analysis.sort(key=lambda x: x["gap"], reverse=True)
-            result["blocks_needing_improvement"] = block_analysis[:5]
-            
-            # Get schools from bottom 3 blocks
-            schools_to_analyze = []
-            for block in result["blocks_needing_improvement"][:3]:
-                schools = await db.schools.find({"block_id": block["id"]}, {"_id": 0}).to_list(length=5)
-                schools_to_analyze.extend(schools)
-            
-            school_analysis = []
-            for school in schools_to_analyze:
-                try:
-                    school_pgi = await get_pgi_score("school", school["id"])
-                    school_domain = next((d for d in school_pgi.get("domains", []) if d.get("domain_name") == domain_name), None)
-                    if school_domain:
-                        school_indicator = next((i for i in school_domain.get("indicators", []) if i.get("indicator_code") == indicator_code), None)
-                        if school_indicator:
-                            achievement = school_indicator.get("achieved_percentage", 0)
-                            gap = indicator_target - achievement
-                            if gap > 0:
-                                school_analysis.append({
-                                    "id": school["id"],
-                                    "name": school["name"],
-                                    "block_name": school["block_name"],
-                                    "achievement": round(achievement, 2),
-                                    "target": indicator_target,
-                                    "gap": round(gap, 2)
-                                })
-                except Exception as e:
-                    continue
-            
-            school_analysis.sort(key=lambda x: x["gap"], reverse=True)
-            result["schools_needing_improvement"] = school_analysis[:5]
+        def gap_entry(entry, **names):
+            achievement = entry["achieved"]
+            return {
+                "id": entry["entity_id"],
+                "name": entry["entity_name"],
+                **names,
+                "achievement": round(achievement, 2),
+                "target": indicator_target,
+                "gap": round(indicator_gap(indicator_unit, achievement, indicator_target), 2)
+            }
         
-        # Block level: drill down to schools only
-        elif level == "block":
-            # Get all schools in this block
-            all_schools = await db.schools.find({"block_id": entity_id}, {"_id": 0}).to_list(length=None)
-            
-            school_analysis = []
-            for school in all_schools:
-                try:
-                    school_pgi = await get_pgi_score("school", school["id"])
-                    school_domain = next((d for d in school_pgi.get("domains", []) if d.get("domain_name") == domain_name), None)
-                    if school_domain:
-                        school_indicator = next((i for i in school_domain.get("indicators", []) if i.get("indicator_code") == indicator_code), None)
-                        if school_indicator:
-                            achievement = school_indicator.get("achieved_percentage", 0)
-                            gap = indicator_target - achievement
-                            if gap > 0:
-                                school_analysis.append({
-                                    "id": school["id"],
-                                    "name": school["name"],
-                                    "achievement": round(achievement, 2),
-                                    "target": indicator_target,
-                                    "gap": round(gap, 2)
-                                })
-                except Exception as e:
-                    continue
+        # Every entity of every level below the selected one is evaluated from the indicator's
+        # pgi_rankings column: the five largest gaps anywhere in scope plus how many were evaluated
+        # and how many miss the target. Entries come largest gap first.
+        child_level = level
+        while child_level in CHILD_LEVELS:
+            child_level = CHILD_LEVELS[child_level][0]
+            if level == "state":
+                await ensure_materialized(child_level)
+            else:
+                await ensure_materialized(child_level, level, [entity_id])
+            entries, evaluated, below_target = await asyncio.gather(
+                get_worst_k(child_level, indicator_key, 5, [entity_id], below=target_ranking_value),
+                count_rankings(child_level, indicator_key, entity_id),
+                count_rankings(child_level, indicator_key, entity_id, below=target_ranking_value)
+            )
+            result["coverage"][child_level] = {"evaluated": evaluated, "below_target": below_target}
             
-            school_analysis.sort(key=lambda x: x["gap"], reverse=True)
-            result["schools_needing_improvement"] = school_analysis[:5]
+            # Name the ancestors between the selected entity and each entry (scope_ids: [state_id, district_id, block_id])
+            ancestor_levels = []
+            ancestor_level = PARENT_LEVELS[child_level][0]
+            while ancestor_level != level:
+                ancestor_levels.append(ancestor_level)
+                ancestor_level = PARENT_LEVELS[ancestor_level][0]
+            ancestor_names = {
+                ancestor_level: await get_entity_names(
+                    ancestor_level, [entry["scope_ids"][LEVELS.index(ancestor_level)] for entry in entries]
+                )
+                for ancestor_level in ancestor_levels
+            }
+            result[f"{child_level}s_needing_improvement"] = [
+                gap_entry(entry, **{
+                    f"{ancestor_level}_name": names.get(entry["scope_ids"][LEVELS.index(ancestor_level)], "")
+                    for ancestor_level, names in ancestor_names.items()
+                })
+                for entry in entries
+            ]
         
         # Generate AI insights
         insights_prompt = f"""Analyze the following indicator performance data and provide actionable insights:
@@ -1432,21 +1747,22 @@ Current Achievement: {target_indicator.get('achieved_percentage', 0):.1f}%
 **Current Status:**
 - Achievement: {target_indicator.get('achieved_percentage', 0):.1f}%
 - Target: {indicator_target}%
-- Gap to Target: {indicator_target - target_indicator.get('achieved_percentage', 0):.1f}%
+- Gap to Target: {indicator_gap(indicator_unit, target_indicator.get('achieved_percentage', 0), indicator_target):.1f}%
 
 **Key Findings:**
 """
             
+            coverage = result["coverage"]
             if result["districts_needing_improvement"]:
-                fallback_insights += f"\n• {len(result['districts_needing_improvement'])} districts identified requiring immediate attention\n"
+                fallback_insights += f"\n• {coverage['district']['below_target']} of {coverage['district']['evaluated']} districts are below target\n"
                 fallback_insights += f"• Lowest performing district: {result['districts_needing_improvement'][0]['name']} at {result['districts_needing_improvement'][0]['achievement']}%\n"
             
             if result["blocks_needing_improvement"]:
-                fallback_insights += f"• {len(result['blocks_needing_improvement'])} blocks need targeted interventions\n"
+                fallback_insights += f"• {coverage['block']['below_target']} of {coverage['block']['evaluated']} blocks need targeted interventions\n"
                 fallback_insights += f"• Average gap across identified blocks: {sum(b['gap'] for b in result['blocks_needing_improvement'][:5]) / min(5, len(result['blocks_needing_improvement'])):.1f}%\n"
             
             if result["schools_needing_improvement"]:
-                fallback_insights += f"• {len(result['schools_needing_improvement'])} schools require immediate support\n"
+                fallback_insights += f"• {coverage['school']['below_target']} of {coverage['school']['evaluated']} schools require immediate support\n"
             
             fallback_insights += """
 **Recommended Actions:**
@@ -1480,9 +1796,10 @@ Focused interventions on identified entities could improve overall indicator ach
             "current_achievement": round(target_indicator.get("achieved_percentage", 0), 2),
             "target": indicator_target,
             "gap": round(indicator_target - target_indicator.get("achieved_percentage", 0), 2),
-            "districts_analyzed": len(result["districts_needing_improvement"]),
-            "blocks_analyzed": len(result["blocks_needing_improvement"]),
-            "schools_analyzed": len(result["schools_needing_improvement"])
+            "districts_analyzed": result["coverage"].get("district", {}).get("evaluated", 0),
+            "blocks_analyzed": result["coverage"].get("block", {}).get("evaluated", 0),
+            "schools_analyzed": result["coverage"].get("school", {}).get("evaluated", 0),
+            "below_target": sum(level_coverage["below_target"] for level_coverage in result["coverage"].values())
         }
         
         return result
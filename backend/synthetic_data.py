@@ -0,0 +1,271 @@
+"""
+Synthetic Maharashtra-scale dataset generator
+Builds a production-like hierarchy (36 districts, ~335 blocks, ~110k schools at
+scale 1.0) from the sample district list, with metrics for every entity and
+full PGI indicator coverage at every level.
+
+Usage:
+    python synthetic_data.py --scale 1.0 --seed 42                 # write into MONGO_URL/DB_NAME
+    python synthetic_data.py --scale 0.1 --seed 42 --ndjson ./out  # write <collection>.ndjson files
+"""
+
+import os
+import asyncio
+import argparse
+from datetime import datetime
+
+import numpy as np
+from bson import json_util
+from dotenv import load_dotenv
+
+from cache import mark_dataset_changed
+from pgi_framework import LEVELS, PGI_INDICATORS, get_indicators_for_level
+from pgi_engine import LOWER_IS_BETTER_UNITS
+from score_history import HISTORY_COLLECTION
+from seed_data import (
+    DISTRICTS,
+    METRIC_DOMAINS,
+    SEED_BATCH_SIZE,
+    STATE_ID,
+    STATE_INDICATOR_SCORES,
+    TRENDS,
+    indicator_score_document,
+    metric_document,
+    seed_collections,
+    state_document,
+    utc_now
+)
+
+# Average schools per block at scale 1.0 (~110k schools over the district block counts)
+SCHOOLS_PER_BLOCK = 330
+
+# Spread of performance between siblings, relative to their parent
+BLOCK_SPREAD = 0.06
+SCHOOL_SPREAD = 0.10
+# Noise applied to each individual indicator / metric value
+VALUE_SPREAD = 0.08
+
+# Independent random streams, so output does not depend on write interleaving
+HIERARCHY_STREAM, METRICS_STREAM, INDICATOR_STREAM, SCHOOL_STREAM = range(4)
+
+def random_stream(seed: int, stream: int):
+    """Random generator for one output stream"""
+    return np.random.default_rng([seed, stream])
+
+def build_hierarchy(scale: float, seed: int) -> dict:
+    """
+    Lay out districts, blocks and schools with a performance factor for each entity.
+    District factors follow the tier scores of DISTRICTS; blocks and schools vary around their parent.
+    """
+    rng = random_stream(seed, HIERARCHY_STREAM)
+    mean_score = sum(district["score"] for district in DISTRICTS) / len(DISTRICTS)
+
+    districts, blocks = [], []
+    school_total = 0
+    for i, district in enumerate(DISTRICTS):
+        district_id = f"dist_{i+1:03d}"
+        district_factor = district["score"] / mean_score
+        districts.append({"id": district_id, "name": district["name"], "factor": district_factor,
+                          "source": district})
+
+        for j in range(district["blocks"]):
+            schools_count = max(1, int(round(SCHOOLS_PER_BLOCK * scale * rng.uniform(0.7, 1.3))))
+            blocks.append({
+                "id": f"block_{i+1:03d}_{j+1:03d}",
+                "name": f"{district['name']} Block {j+1}",
+                "district_id": district_id,
+                "district_name": district["name"],
+                "district_index": i,
+                "block_index": j,
+                "factor": district_factor * (1 + rng.normal(0, BLOCK_SPREAD)),
+                "schools_count": schools_count,
+                "school_offset": school_total
+            })
+            school_total += schools_count
+
+    block_factors = np.repeat([block["factor"] for block in blocks], [block["schools_count"] for block in blocks])
+    school_factors = block_factors * (1 + rng.normal(0, SCHOOL_SPREAD, school_total))
+    return {"districts": districts, "blocks": blocks, "school_factors": school_factors, "school_count": school_total}
+
+def iter_entities(hierarchy: dict):
+    """Yield (level, entity_id, entity_name, factor, position) for every entity, state first"""
+    yield "state", STATE_ID, "Maharashtra", 1.0, 0
+    for position, district in enumerate(hierarchy["districts"]):
+        yield "district", district["id"], district["name"], district["factor"], position
+    for position, block in enumerate(hierarchy["blocks"]):
+        yield "block", block["id"], block["name"], block["factor"], block["block_index"]
+    school_factors = hierarchy["school_factors"]
+    for block in hierarchy["blocks"]:
+        for k in range(block["schools_count"]):
+            school_id = f"school_{block['district_index']+1:03d}_{block['block_index']+1:03d}_{k+1:03d}"
+            yield ("school", school_id, f"{block['district_name']} School {k+1}",
+                   float(school_factors[block["school_offset"] + k]), k)
+
+def iter_districts(hierarchy: dict, timestamp: datetime):
+    """Yield the district documents"""
+    for district in hierarchy["districts"]:
+        source = district["source"]
+        yield {
+            "id": district["id"],
+            "name": district["name"],
+            "state_id": STATE_ID,
+            "total_score": source["score"],
+            "max_score": 600,
+            "percentage": (source["score"] / 600) * 100,
+            "rank": source["rank"],
+            "blocks_count": source["blocks"],
+            "created_at": timestamp
+        }
+
+def iter_blocks(hierarchy: dict, timestamp: datetime):
+    """Yield the block documents"""
+    for block in hierarchy["blocks"]:
+        yield {
+            "id": block["id"],
+            "name": block["name"],
+            "district_id": block["district_id"],
+            "state_id": STATE_ID,
+            "schools_count": block["schools_count"],
+            "performance_score": round(70 * block["factor"], 2),
+            "created_at": timestamp
+        }
+
+def iter_schools(hierarchy: dict, seed: int, timestamp: datetime):
+    """Yield the school documents"""
+    rng = random_stream(seed, SCHOOL_STREAM)
+    school_factors = hierarchy["school_factors"]
+    for block in hierarchy["blocks"]:
+        student_counts = rng.integers(80, 1200, block["schools_count"])
+        for k in range(block["schools_count"]):
+            factor = float(school_factors[block["school_offset"] + k])
+            student_count = int(student_counts[k])
+            yield {
+                "id": f"school_{block['district_index']+1:03d}_{block['block_index']+1:03d}_{k+1:03d}",
+                "name": f"{block['district_name']} School {k+1}",
+                "block_id": block["id"],
+                "district_id": block["district_id"],
+                "state_id": STATE_ID,
+                "student_count": student_count,
+                "teacher_count": max(1, student_count // 30),
+                "infrastructure_score": round(min(100.0, 65 * factor), 2),
+                "created_at": timestamp
+            }
+
+def iter_metrics(hierarchy: dict, seed: int, timestamp: datetime):
+    """Yield the metrics documents for every entity at every level"""
+    rng = random_stream(seed, METRICS_STREAM)
+    metric_specs = [
+        (domain, domain.lower().replace(' ', '_'), idx, metric, data["state_values"][idx], data["max_values"][idx])
+        for domain, data in METRIC_DOMAINS.items()
+        for idx, metric in enumerate(data["metrics"])
+    ]
+    state_values = np.array([spec[4] for spec in metric_specs])
+
+    for level, entity_id, entity_name, factor, position in iter_entities(hierarchy):
+        if level == "state":
+            values = state_values
+        else:
+            values = state_values * factor * (1 + rng.normal(0, VALUE_SPREAD, len(metric_specs)))
+        values = np.maximum(values, 0).tolist()
+        for (domain, domain_slug, idx, metric, _, max_value), value in zip(metric_specs, values):
+            yield metric_document(
+                f"metric_{entity_id}_{domain_slug}_{idx}", metric, level, entity_id, entity_name,
+                round(value, 2), max_value, TRENDS[(idx + position) % 3], domain, timestamp
+            )
+
+def iter_indicator_scores(hierarchy: dict, seed: int, timestamp: datetime):
+    """Yield PGI indicator score documents for every indicator applicable to every entity"""
+    rng = random_stream(seed, INDICATOR_STREAM)
+    level_specs = {}
+    for level in LEVELS:
+        keys = list(get_indicators_for_level(level).keys())
+        level_specs[level] = (
+            keys,
+            np.array([STATE_INDICATOR_SCORES[key] for key in keys]),
+            np.array([PGI_INDICATORS[key].get("unit") in LOWER_IS_BETTER_UNITS for key in keys])
+        )
+
+    for level, entity_id, entity_name, factor, position in iter_entities(hierarchy):
+        keys, state_values, lower_is_better = level_specs[level]
+        if level == "state":
+            values = state_values
+        else:
+            noise = 1 + rng.normal(0, VALUE_SPREAD, len(keys))
+            # Better performers have higher achievement and smaller gaps / delays
+            values = np.where(lower_is_better, state_values / factor * noise, state_values * factor * noise)
+            values = np.where(lower_is_better, np.maximum(values, 0), np.clip(values, 0, 100))
+        for key, value in zip(keys, values.tolist()):
+            yield indicator_score_document(level, entity_id, key, round(value, 2), timestamp)
+
+def synthetic_streams(hierarchy: dict, seed: int, timestamp: datetime) -> dict:
+    """Document streams of the synthetic dataset, by collection name"""
+    return {
+        "states": iter([state_document(timestamp)]),
+        "districts": iter_districts(hierarchy, timestamp),
+        "blocks": iter_blocks(hierarchy, timestamp),
+        "schools": iter_schools(hierarchy, seed, timestamp),
+        "metrics": iter_metrics(hierarchy, seed, timestamp),
+        "pgi_indicator_scores": iter_indicator_scores(hierarchy, seed, timestamp)
+    }
+
+def write_ndjson(streams: dict, output_dir: str) -> dict:
+    """
+    Write each stream to <output_dir>/<collection>.ndjson; returns rows per file.
+    Dates are written as Extended JSON ({"$date": ...}) so mongoimport restores them as BSON dates.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rows = {}
+    for collection_name, documents in streams.items():
+        path = os.path.join(output_dir, f"{collection_name}.ndjson")
+        count = 0
+        with open(path, "w") as output:
+            for document in documents:
+                output.write(json_util.dumps(document, json_options=json_util.RELAXED_JSON_OPTIONS))
+                output.write("\n")
+                count += 1
+        rows[collection_name] = count
+        print(f"Wrote {count} rows to {path}")
+    return rows
+
+async def write_mongo(streams: dict, batch_size: int, drop: bool) -> dict:
+    """Write the streams into MONGO_URL/DB_NAME; the state document goes last as the completion marker"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("DB_NAME", "maharashtra_education")]
+    if drop:
+        # Derived data and bookkeeping of the old dataset go too: the regenerated entities reuse its ids
+        for collection_name in list(streams) + ["pgi_scores", "pgi_rankings", "insights", "checkpoints", "migrations"]:
+            await db[collection_name].drop()
+        # Emptied rather than dropped, so it stays a time-series collection for running servers
+        await db[HISTORY_COLLECTION].delete_many({})
+
+    state_stream = streams.pop("states")
+    stats = await seed_collections(db, streams, batch_size)
+    await db.states.insert_many(list(state_stream))
+    await mark_dataset_changed(db)
+    return stats
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Generate a synthetic Maharashtra-scale education dataset")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="schools per block relative to production size (1.0 = ~110k schools)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed; same seed and scale give the same data")
+    parser.add_argument("--ndjson", metavar="DIR", help="write NDJSON files to DIR instead of MongoDB")
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE, help="documents per insert_many batch")
+    parser.add_argument("--drop", action="store_true", help="drop the dataset collections and the data derived from them before writing to MongoDB")
+    args = parser.parse_args()
+
+    hierarchy = build_hierarchy(args.scale, args.seed)
+    print(f"Generating {len(hierarchy['districts'])} districts, {len(hierarchy['blocks'])} blocks, "
+          f"{hierarchy['school_count']} schools (scale {args.scale}, seed {args.seed})")
+    streams = synthetic_streams(hierarchy, args.seed, utc_now())
+
+    if args.ndjson:
+        write_ndjson(streams, args.ndjson)
+    else:
+        asyncio.run(write_mongo(streams, args.batch_size, args.drop))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The backend modules are imported flat, as the server runs them from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,22 @@
+"""
+CSV export cells must use the same timestamp format as the JSON and NDJSON exports.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from serialization import dumps
+from server import csv_cell
+
+@pytest.mark.parametrize("value", [
+    datetime(2026, 10, 17, 7, 6, 16, 77000, tzinfo=timezone.utc),
+    datetime(2026, 10, 17, 7, 6, 16, tzinfo=timezone.utc),
+    datetime(2026, 10, 17, 7, 6, 16),
+])
+def test_datetimes_are_written_like_the_json_export(value):
+    document = {"created_at": value, "meta": {"generated_at": value}}
+
+    expected = dumps(value).decode().strip('"')
+    assert csv_cell(document, "created_at") == expected
+    assert csv_cell(document, "meta.generated_at") == expected
@@ -0,0 +1,50 @@
+"""
+Conditional GETs: ETags are weak, since gzip and identity responses share them, and
+differ between query strings of the same data, such as pages of one list.
+"""
+
+import asyncio
+
+from starlette.requests import Request
+
+from server import conditional_get
+
+SCOPE = ("entities", "block", "dist_test_etags")
+
+def get(query_string: str = "", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    request = Request({"type": "http", "method": "GET", "path": "/", "query_string": query_string.encode(), "headers": headers})
+    loads = []
+
+    async def load():
+        loads.append(query_string)
+        return []
+
+    response = asyncio.run(conditional_get(request, SCOPE, load))
+    return response, loads
+
+def test_etag_is_weak():
+    response, _ = get()
+    assert response.headers["etag"].startswith('W/"')
+
+def test_etag_covers_the_normalized_query_string():
+    first_page, _ = get("limit=5")
+    second_page, _ = get("limit=5&cursor=abc")
+    projected, _ = get("limit=5&fields=id,name")
+    reordered, _ = get("cursor=abc&limit=5")
+
+    tags = {first_page.headers["etag"], second_page.headers["etag"], projected.headers["etag"]}
+    assert len(tags) == 3
+    assert reordered.headers["etag"] == second_page.headers["etag"]
+
+def test_matching_tag_gets_304_without_loading():
+    etag = get("limit=5")[0].headers["etag"]
+
+    for if_none_match in (etag, etag.removeprefix("W/")):
+        response, loads = get("limit=5", if_none_match)
+        assert response.status_code == 304
+        assert not loads
+
+    response, loads = get("limit=6", etag)
+    assert response.status_code == 200
+    assert loads == ["limit=6"]
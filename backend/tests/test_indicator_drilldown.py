@@ -0,0 +1,29 @@
+"""
+Indicator drill-down must list only entities that miss the target in the indicator's
+direction: above it for "lower is better" units, below it otherwise.
+"""
+
+import pytest
+
+from pgi_framework import PGI_INDICATORS
+from server import indicator_gap, ranking_value
+
+READINGS = [0.0, 2.5, 4.08, 5.0, 5.01, 9.0, 15.0, 22.0, 40.0, 80.0, 100.0]
+
+@pytest.mark.parametrize("key", ["lo_language_class3", "eq_sc_lang_class3", "gp_state_fund_release"])
+def test_below_target_ranking_value_selects_missed_targets(key):
+    indicator = PGI_INDICATORS[key]
+    threshold = ranking_value(indicator["unit"], indicator["target"])
+
+    # get_worst_k / count_rankings keep values strictly below the threshold
+    listed = [reading for reading in READINGS if ranking_value(indicator["unit"], reading) < threshold]
+    assert listed == [reading for reading in READINGS if indicator_gap(indicator["unit"], reading, indicator["target"]) > 0]
+
+def test_lower_is_better_reading_within_target_is_not_listed():
+    # EQ-SC-L3: a 4.08 point social category gap against a 5.0 target meets it
+    indicator = PGI_INDICATORS["eq_sc_lang_class3"]
+    assert indicator["unit"] == "percentage_point_difference"
+
+    assert not ranking_value(indicator["unit"], 4.08) < ranking_value(indicator["unit"], indicator["target"])
+    assert indicator_gap(indicator["unit"], 4.08, indicator["target"]) == pytest.approx(-0.92)
+    assert indicator_gap(indicator["unit"], 9.0, indicator["target"]) == pytest.approx(4.0)
@@ -0,0 +1,81 @@
+"""
+PGIScoringEngine must score exactly like the per-entity framework functions
+calculate_domain_score / calculate_total_pgi_score, including missing indicators
+and "lower is better" units.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from pgi_engine import LOWER_IS_BETTER_UNITS, PGI_ENGINE
+from pgi_framework import PGI_DOMAINS, PGI_INDICATORS, calculate_domain_score, calculate_total_pgi_score
+
+LOWER_IS_BETTER_KEYS = [key for key, indicator in PGI_INDICATORS.items() if indicator["unit"] in LOWER_IS_BETTER_UNITS]
+
+def random_scores(rng: random.Random, missing_rate: float) -> dict:
+    """{indicator_key: achieved} with some indicators left out"""
+    scores = {}
+    for key, indicator in PGI_INDICATORS.items():
+        if rng.random() < missing_rate:
+            continue
+        if key in LOWER_IS_BETTER_KEYS:
+            # Below, at and far above the target, so both branches and the clamp at 0 are hit
+            scores[key] = rng.choice([indicator["target"], rng.uniform(0, 3 * indicator["target"])])
+        else:
+            scores[key] = rng.uniform(0, 100)
+    return scores
+
+def per_entity_scores(scores: dict, max_score: float):
+    """Domain contributions and unrounded total as the framework functions compute them"""
+    domain_scores = [calculate_domain_score(domain_key, scores, max_score) for domain_key in PGI_DOMAINS]
+    total = 0.0
+    for domain_score in domain_scores:
+        total += domain_score
+    return domain_scores, total
+
+def test_framework_has_lower_is_better_indicators():
+    assert LOWER_IS_BETTER_KEYS
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("missing_rate", [0.0, 0.3, 0.9])
+@pytest.mark.parametrize("max_score", [1000, 600])
+def test_score_matrix_matches_per_entity_functions(seed, missing_rate, max_score):
+    rng = random.Random(seed)
+    score_dicts = [random_scores(rng, missing_rate) for _ in range(50)] + [{}]
+
+    domain_scores, total_scores = PGI_ENGINE.score_matrix(PGI_ENGINE.to_matrix(score_dicts), max_score)
+
+    for row, scores in enumerate(score_dicts):
+        expected_domains, expected_total = per_entity_scores(scores, max_score)
+        assert domain_scores[row].tolist() == expected_domains
+        assert total_scores[row] == expected_total
+
+def test_score_many_matches_calculate_total_pgi_score():
+    rng = random.Random(42)
+    score_dicts = [random_scores(rng, 0.2) for _ in range(100)]
+
+    assert PGI_ENGINE.score_many(score_dicts) == [calculate_total_pgi_score(scores) for scores in score_dicts]
+
+def test_nan_scores_like_a_missing_indicator():
+    rng = random.Random(7)
+    scores = random_scores(rng, 0.0)
+    missing = rng.sample(sorted(scores), 10) + LOWER_IS_BETTER_KEYS[:1]
+
+    values = PGI_ENGINE.to_matrix([scores])
+    for key in missing:
+        values[0, PGI_ENGINE.column_index[key]] = np.nan
+    domain_scores, total_scores = PGI_ENGINE.score_matrix(values)
+
+    expected_domains, expected_total = per_entity_scores(
+        {key: value for key, value in scores.items() if key not in missing}, 1000
+    )
+    assert domain_scores[0].tolist() == expected_domains
+    assert total_scores[0] == expected_total
+
+def test_unknown_indicator_keys_are_ignored():
+    scores = random_scores(random.Random(3), 0.0)
+    with_unknown = {**scores, "not_an_indicator": 55.0}
+
+    assert PGI_ENGINE.score_many([with_unknown]) == PGI_ENGINE.score_many([scores])
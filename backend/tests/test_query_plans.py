@@ -0,0 +1,37 @@
+"""
+Hot API queries must be answered from an index
+Runs against the MongoDB at MONGO_URL, in a throwaway database; skipped when none is reachable.
+"""
+
+import os
+import asyncio
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+from check_query_plans import explain_in_scratch_database
+from db_indexes import HOT_QUERIES
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+
+async def explain_hot_queries_or_skip():
+    client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError as e:
+        pytest.skip(f"no MongoDB reachable at {MONGO_URL}: {e}")
+    try:
+        return await explain_in_scratch_database(client)
+    finally:
+        client.close()
+
+def test_hot_queries_use_an_index():
+    results = asyncio.run(explain_hot_queries_or_skip())
+    
+    assert len(results) == len(HOT_QUERIES)
+    collscans = [
+        f"{result['collection']} {result['filter']} sort={result['sort']}: {' <- '.join(result['stages'])}"
+        for result in results if result["collscan"]
+    ]
+    assert not collscans, "collection scans:\n" + "\n".join(collscans)
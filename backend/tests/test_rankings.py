@@ -0,0 +1,34 @@
+"""
+pgi_rankings entries must rank the worst entity lowest for every key, including
+indicators in "lower is better" units, while keeping the reading itself.
+"""
+
+import pytest
+
+from pgi_engine import LOWER_IS_BETTER_UNITS, PGI_ENGINE
+from pgi_framework import PGI_INDICATORS
+from server import build_pgi_response, ranking_entries, ranking_value
+
+def district_entries(entity_id: str, scores: dict) -> dict:
+    """{key: pgi_rankings entry} of a district with the given indicator readings"""
+    entity = {"id": entity_id, "name": entity_id, "state_id": "mh_001"}
+    document = build_pgi_response("district", entity_id, entity_id, scores, PGI_ENGINE.score_many([scores])[0])
+    return {entry["key"]: entry for entry in ranking_entries("district", entity, document)}
+
+def test_ranking_value_negates_lower_is_better_units():
+    assert ranking_value("percentage", 40.0) == 40.0
+    for unit in LOWER_IS_BETTER_UNITS:
+        assert ranking_value(unit, 12.0) == -12.0
+
+@pytest.mark.parametrize("key, lower_is_better, better, worse", [
+    ("lo_language_class3", False, 80.0, 40.0),
+    # Social category gap, target 5 percentage points
+    ("eq_sc_lang_class3", True, 2.0, 12.0),
+])
+def test_worst_entity_has_the_lowest_value(key, lower_is_better, better, worse):
+    assert (PGI_INDICATORS[key]["unit"] in LOWER_IS_BETTER_UNITS) == lower_is_better
+    good = district_entries("dist_good", {key: better})[key]
+    bad = district_entries("dist_bad", {key: worse})[key]
+
+    assert bad["value"] < good["value"]
+    assert (good["achieved"], bad["achieved"]) == (better, worse)
@@ -130,29 +130,27 @@ const DomainDashboard = () => {
         if (blocksRes.ok) {
           const blocks = await blocksRes.json();
           
-          const blockPromises = blocks.map(async (block) => {
-            try {
-              const pgiRes = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/pgi-score/block/${block.id}`);
-              if (!pgiRes.ok) return null;
-              
-              const pgiData = await pgiRes.json();
-              const blockDomain = pgiData.domains?.find(d => d.domain_name === currentDomain.name);
-              
-              if (!blockDomain) return null;
-              
-              return {
-                id: block.id,
-                name: block.name,
-                score: blockDomain.score,
-                maxScore: blockDomain.max_score,
-                percentage: blockDomain.percentage
-              };
-            } catch (err) {
-              return null;
-            }
+          // Score every block in one batch request
+          const pgiRes = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/pgi-score/batch`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ level: 'block', entity_ids: blocks.map((block) => block.id) })
           });
+          const pgiBatch = pgiRes.ok ? await pgiRes.json() : { results: [] };
           
-          const blockData = await Promise.all(blockPromises);
+          const blockData = pgiBatch.results.map((pgiData) => {
+            const blockDomain = pgiData.domains?.find(d => d.domain_name === currentDomain.name);
+            
+            if (!blockDomain) return null;
+            
+            return {
+              id: pgiData.entity_id,
+              name: pgiData.entity_name,
+              score: blockDomain.score,
+              maxScore: blockDomain.max_score,
+              percentage: blockDomain.percentage
+            };
+          });
           const validBlocks = blockData.filter(b => b !== null);
           validBlocks.sort((a, b) => b.percentage - a.percentage);
           
@@ -164,29 +162,27 @@ const DomainDashboard = () => {
         if (schoolsRes.ok) {
           const schools = await schoolsRes.json();
           
-          const schoolPromises = schools.map(async (school) => {
-            try {
-              const pgiRes = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/pgi-score/school/${school.id}`);
-              if (!pgiRes.ok) return null;
-              
-              const pgiData = await pgiRes.json();
-              const schoolDomain = pgiData.domains?.find(d => d.domain_name === currentDomain.name);
-              
-              if (!schoolDomain) return null;
-              
-              return {
-                id: school.id,
-                name: school.name,
-                score: schoolDomain.score,
-                maxScore: schoolDomain.max_score,
-                percentage: schoolDomain.percentage
-              };
-            } catch (err) {
-              return null;
-            }
+          // Score every school in one batch request
+          const pgiRes = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/pgi-score/batch`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ level: 'school', entity_ids: schools.map((school) => school.id) })
           });
+          const pgiBatch = pgiRes.ok ? await pgiRes.json() : { results: [] };
           
-          const schoolData = await Promise.all(schoolPromises);
+          const schoolData = pgiBatch.results.map((pgiData) => {
+            const schoolDomain = pgiData.domains?.find(d => d.domain_name === currentDomain.name);
+            
+            if (!schoolDomain) return null;
+            
+            return {
+              id: pgiData.entity_id,
+              name: pgiData.entity_name,
+              score: schoolDomain.score,
+              maxScore: schoolDomain.max_score,
+              percentage: schoolDomain.percentage
+            };
+          });
           const validSchools = schoolData.filter(s => s !== null);
           validSchools.sort((a, b) => b.percentage - a.percentage);
           
@@ -138,6 +138,9 @@ const IndicatorDrilldownModal = ({
                   <div className="text-2xl font-bold text-purple-900">
                     {data.summary.districts_analyzed + data.summary.blocks_analyzed + data.summary.schools_analyzed}
                   </div>
+                  <div className="text-xs text-purple-600 mt-1">
+                    {data.summary.below_target} below target
+                  </div>
                 </div>
               </div>
 
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useParams } from 'react-router-dom';
 import PGIDomainBreakdown from './PGIDomainBreakdown';
+import { waitForJob } from '../lib/jobs';
 
 const StateDashboard = () => {
   const { stateId } = useParams();
@@ -70,8 +71,9 @@ const StateDashboard = () => {
       });
       
       if (response.ok) {
-        // Wait for insights to be generated (backend processes in background)
-        await new Promise(resolve => setTimeout(resolve, 15000)); // Wait 15 seconds
+        // Wait for the background insight generation job to finish
+        const job = await response.json();
+        await waitForJob(job.job_id);
         
         // Refresh insights after generation
         const insightsRes = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/insights/state/${stateId}`);
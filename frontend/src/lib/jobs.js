@@ -0,0 +1,19 @@
+// Poll a background job until it finishes; resolves with the final job status
+export async function waitForJob(jobId, { interval = 500, timeout = 60000 } = {}) {
+  const deadline = Date.now() + timeout;
+  while (Date.now() < deadline) {
+    const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/jobs/${jobId}`);
+    if (!response.ok) {
+      throw new Error(`Failed to fetch job status: ${response.status}`);
+    }
+    const job = await response.json();
+    if (job.status === 'completed') {
+      return job;
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Job failed');
+    }
+    await new Promise(resolve => setTimeout(resolve, interval));
+  }
+  throw new Error('Timed out waiting for job');
+}